@@ -1,5 +1,10 @@
 from .client import *
 from .utils import *
 from .types import *
+from .compact_types import *
+from .client_pool import *
+from .rpc_metrics import *
+from .rpc_recording import *
+from .async_client import *
 
 __version__ = "1.8.1"
@@ -0,0 +1,260 @@
+from __future__ import print_function
+
+import asyncio
+
+from .client import MultirotorClient
+from .client_pool import MultiplexedConnection
+from .rpc_metrics import instrument_connection
+from .rpc_recording import get_replay_connection, record_connection
+from .types import *
+
+
+class AsyncMultirotorClient:
+    """
+    asyncio facade of `MultirotorClient`
+
+    Every method is a coroutine backed by a `MultiplexedConnection`, so the missions and monitors of many
+    drones can share one event loop instead of one OS thread each. Query methods return the same decoded
+    types as `MultirotorClient`; the `...Async` movement commands complete when the simulator finishes
+    the command, awaiting them is the equivalent of `MultirotorClient.METHOD().join()`.
+
+    Example:
+        client = AsyncMultirotorClient()
+        await asyncio.gather(*[client.moveToPositionAsync(0, 0, -10, 5, vehicle_name=name) for name in names])
+    """
+
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, connection = None):
+        """
+        Args:
+            ip (str, optional): Simulator address
+            port (int, optional): Simulator RPC port
+            timeout_value (int, optional): RPC timeout in seconds
+            connection (MultiplexedConnection, optional): Connection to share, a new one is opened if None
+        """
+        if (ip == ""):
+            ip = "host.docker.internal"
+        replay = get_replay_connection()
+        if replay is not None:
+            connection = replay
+        elif connection is None:
+            connection = MultiplexedConnection(ip, port, timeout_value)
+        self.client = instrument_connection(record_connection(connection))
+
+    async def call(self, method, *args):
+        """
+        Send one raw RPC request
+
+        Returns:
+            Raw (undecoded) result of the RPC
+        """
+        return await asyncio.wrap_future(self.client.call_async(method, *args).as_concurrent_future())
+
+    async def callBatch(self, requests):
+        """
+        Send many raw RPC requests concurrently
+
+        Args:
+            requests (list[tuple]): (method_name, args) pairs
+
+        Returns:
+            list: Raw results in the order of `requests`
+        """
+        return await asyncio.gather(*[self.call(method, *args) for method, args in requests])
+
+    async def getBatchSnapshot(self, vehicle_names, fields = ('kinematics', 'pose', 'collision', 'gps')):
+        """
+        Asynchronous `MultirotorClient.getBatchSnapshot()`
+
+        Returns:
+            dict: vehicle name -> {field name -> decoded response}
+        """
+        snapshot_fields = MultirotorClient._snapshot_fields
+        unknown = [field for field in fields if field not in snapshot_fields]
+        if unknown:
+            raise ValueError('unsupported snapshot field(s): %s' % ', '.join(unknown))
+        requests = [(snapshot_fields[field][0], snapshot_fields[field][1](vehicle_name))
+                    for vehicle_name in vehicle_names for field in fields]
+        results = iter(await self.callBatch(requests))
+        return {vehicle_name: {field: snapshot_fields[field][2].from_msgpack(next(results)) for field in fields}
+                for vehicle_name in vehicle_names}
+
+    def close(self):
+        self.client.close()
+
+#----------------------------------- Common vehicle APIs ---------------------------------------------
+    async def reset(self):
+        await self.call('reset')
+
+    async def ping(self):
+        return await self.call('ping')
+
+    async def getServerVersion(self):
+        return await self.call('getServerVersion')
+
+    async def enableApiControl(self, is_enabled, vehicle_name = ''):
+        await self.call('enableApiControl', is_enabled, vehicle_name)
+
+    async def isApiControlEnabled(self, vehicle_name = ''):
+        return await self.call('isApiControlEnabled', vehicle_name)
+
+    async def armDisarm(self, arm, vehicle_name = ''):
+        return await self.call('armDisarm', arm, vehicle_name)
+
+    async def simPause(self, is_paused):
+        await self.call('simPause', is_paused)
+
+    async def simIsPause(self):
+        return await self.call('simIsPaused')
+
+    async def simContinueForTime(self, seconds):
+        await self.call('simContinueForTime', seconds)
+
+    async def simContinueForFrames(self, frames):
+        await self.call('simContinueForFrames', frames)
+
+    async def getHomeGeoPoint(self, vehicle_name = ''):
+        return GeoPoint.from_msgpack(await self.call('getHomeGeoPoint', vehicle_name))
+
+    async def simSetWind(self, wind):
+        await self.call('simSetWind', wind)
+
+    async def listVehicles(self):
+        return await self.call('listVehicles')
+
+    async def getSettingsString(self):
+        return await self.call('getSettingsString')
+
+    async def cancelLastTask(self, vehicle_name = ''):
+        await self.call('cancelLastTask', vehicle_name)
+
+#camera control
+    async def simGetImage(self, camera_name, image_type, vehicle_name = '', external = False):
+        """
+        Returns:
+            Binary string literal of compressed png image, None if the simulator returned nothing
+        """
+        result = await self.call('simGetImage', str(camera_name), image_type, vehicle_name, external)
+        if (result == "" or result == "\0"):
+            return None
+        return result
+
+    async def simGetImages(self, requests, vehicle_name = '', external = False):
+        """
+        Returns:
+            list[ImageResponse]:
+        """
+        responses_raw = await self.call('simGetImages', requests, vehicle_name, external)
+        return [ImageResponse.from_msgpack(response_raw) for response_raw in responses_raw]
+
+    async def simGetCameraInfo(self, camera_name, vehicle_name = '', external = False):
+        return CameraInfo.from_msgpack(await self.call('simGetCameraInfo', str(camera_name), vehicle_name, external))
+
+    async def simSetCameraPose(self, camera_name, pose, vehicle_name = '', external = False):
+        await self.call('simSetCameraPose', str(camera_name), pose, vehicle_name, external)
+
+#scene and object queries
+    async def simGetCollisionInfo(self, vehicle_name = ''):
+        return CollisionInfo.from_msgpack(await self.call('simGetCollisionInfo', vehicle_name))
+
+    async def simSetVehiclePose(self, pose, ignore_collision, vehicle_name = ''):
+        await self.call('simSetVehiclePose', pose, ignore_collision, vehicle_name)
+
+    async def simGetVehiclePose(self, vehicle_name = ''):
+        return Pose.from_msgpack(await self.call('simGetVehiclePose', vehicle_name))
+
+    async def simGetObjectPose(self, object_name):
+        return Pose.from_msgpack(await self.call('simGetObjectPose', object_name))
+
+    async def simGetObjectPoses(self, object_names):
+        responses_raw = await self.callBatch([('simGetObjectPose', (name,)) for name in object_names])
+        return [Pose.from_msgpack(pose) for pose in responses_raw]
+
+    async def simSetObjectPose(self, object_name, pose, teleport = True):
+        return await self.call('simSetObjectPose', object_name, pose, teleport)
+
+    async def simListSceneObjects(self, name_regex = '.*'):
+        return await self.call('simListSceneObjects', name_regex)
+
+    async def simGetGroundTruthKinematics(self, vehicle_name = ''):
+        return KinematicsState.from_msgpack(await self.call('simGetGroundTruthKinematics', vehicle_name))
+
+    async def simSetKinematics(self, state, ignore_collision, vehicle_name = ''):
+        await self.call('simSetKinematics', state, ignore_collision, vehicle_name)
+
+    async def simGetGroundTruthEnvironment(self, vehicle_name = ''):
+        return EnvironmentState.from_msgpack(await self.call('simGetGroundTruthEnvironment', vehicle_name))
+
+#sensor APIs
+    async def getImuData(self, imu_name = '', vehicle_name = ''):
+        return ImuData.from_msgpack(await self.call('getImuData', imu_name, vehicle_name))
+
+    async def getBarometerData(self, barometer_name = '', vehicle_name = ''):
+        return BarometerData.from_msgpack(await self.call('getBarometerData', barometer_name, vehicle_name))
+
+    async def getMagnetometerData(self, magnetometer_name = '', vehicle_name = ''):
+        return MagnetometerData.from_msgpack(await self.call('getMagnetometerData', magnetometer_name, vehicle_name))
+
+    async def getGpsData(self, gps_name = '', vehicle_name = ''):
+        return GpsData.from_msgpack(await self.call('getGpsData', gps_name, vehicle_name))
+
+    async def getDistanceSensorData(self, distance_sensor_name = '', vehicle_name = ''):
+        return DistanceSensorData.from_msgpack(await self.call('getDistanceSensorData', distance_sensor_name, vehicle_name))
+
+    async def getLidarData(self, lidar_name = '', vehicle_name = ''):
+        return LidarData.from_msgpack(await self.call('getLidarData', lidar_name, vehicle_name))
+
+#----------------------------------- Multirotor APIs ---------------------------------------------
+    async def takeoffAsync(self, timeout_sec = 20, vehicle_name = ''):
+        return await self.call('takeoff', timeout_sec, vehicle_name)
+
+    async def landAsync(self, timeout_sec = 60, vehicle_name = ''):
+        return await self.call('land', timeout_sec, vehicle_name)
+
+    async def goHomeAsync(self, timeout_sec = 3e+38, vehicle_name = ''):
+        return await self.call('goHome', timeout_sec, vehicle_name)
+
+    async def hoverAsync(self, vehicle_name = ''):
+        return await self.call('hover', vehicle_name)
+
+    async def moveByVelocityAsync(self, vx, vy, vz, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        return await self.call('moveByVelocity', vx, vy, vz, duration, drivetrain, yaw_mode, vehicle_name)
+
+    async def moveByVelocityZAsync(self, vx, vy, z, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        return await self.call('moveByVelocityZ', vx, vy, z, duration, drivetrain, yaw_mode, vehicle_name)
+
+    async def moveByVelocityBodyFrameAsync(self, vx, vy, vz, duration, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(), vehicle_name = ''):
+        return await self.call('moveByVelocityBodyFrame', vx, vy, vz, duration, drivetrain, yaw_mode, vehicle_name)
+
+    async def moveOnPathAsync(self, path, velocity, timeout_sec = 3e+38, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(),
+        lookahead = -1, adaptive_lookahead = 1, vehicle_name = ''):
+        return await self.call('moveOnPath', path, velocity, timeout_sec, drivetrain, yaw_mode, lookahead, adaptive_lookahead, vehicle_name)
+
+    async def moveToPositionAsync(self, x, y, z, velocity, timeout_sec = 3e+38, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(),
+        lookahead = -1, adaptive_lookahead = 1, vehicle_name = ''):
+        return await self.call('moveToPosition', x, y, z, velocity, timeout_sec, drivetrain, yaw_mode, lookahead, adaptive_lookahead, vehicle_name)
+
+    async def moveToGPSAsync(self, latitude, longitude, altitude, velocity, timeout_sec = 3e+38, drivetrain = DrivetrainType.MaxDegreeOfFreedom, yaw_mode = YawMode(),
+        lookahead = -1, adaptive_lookahead = 1, vehicle_name = ''):
+        return await self.call('moveToGPS', latitude, longitude, altitude, velocity, timeout_sec, drivetrain, yaw_mode, lookahead, adaptive_lookahead, vehicle_name)
+
+    async def moveToZAsync(self, z, velocity, timeout_sec = 3e+38, yaw_mode = YawMode(), lookahead = -1, adaptive_lookahead = 1, vehicle_name = ''):
+        return await self.call('moveToZ', z, velocity, timeout_sec, yaw_mode, lookahead, adaptive_lookahead, vehicle_name)
+
+    async def rotateToYawAsync(self, yaw, timeout_sec = 3e+38, margin = 5, vehicle_name = ''):
+        return await self.call('rotateToYaw', yaw, timeout_sec, margin, vehicle_name)
+
+    async def rotateByYawRateAsync(self, yaw_rate, duration, vehicle_name = ''):
+        return await self.call('rotateByYawRate', yaw_rate, duration, vehicle_name)
+
+    async def getMultirotorState(self, vehicle_name = ''):
+        return MultirotorState.from_msgpack(await self.call('getMultirotorState', vehicle_name))
+
+    async def getMultirotorStates(self, vehicle_names):
+        responses_raw = await self.callBatch([('getMultirotorState', (name,)) for name in vehicle_names])
+        return [MultirotorState.from_msgpack(state) for state in responses_raw]
+
+    async def getRotorStates(self, vehicle_name = ''):
+        return RotorStates.from_msgpack(await self.call('getRotorStates', vehicle_name))
+
+    async def getTripStats(self, vehicle_name = ''):
+        return TripStats.from_msgpack(await self.call('getTripStats', vehicle_name))
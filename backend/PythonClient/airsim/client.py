@@ -2,6 +2,9 @@ from __future__ import print_function
 
 from .utils import *
 from .types import *
+from .compact_types import *
+from .rpc_metrics import instrument_connection
+from .rpc_recording import get_replay_connection, record_connection
 
 import msgpackrpc #install as admin: pip install msgpack-rpc-python
 import numpy as np #pip install numpy
@@ -11,10 +14,25 @@ import math
 import logging
 
 class VehicleClient:
-    def __init__(self, ip = "", port = 41451, timeout_value = 3600):
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, connection = None):
+        """
+        Args:
+            ip (str, optional): Simulator address
+            port (int, optional): Simulator RPC port
+            timeout_value (int, optional): RPC timeout in seconds
+            connection (optional): Shared connection with msgpackrpc.Client's `call`/`call_async` interface,
+                such as the ones handed out by `ClientPool`. A dedicated connection is opened if None
+        """
         if (ip == ""):
             ip = "host.docker.internal"
-        self.client = msgpackrpc.Client(msgpackrpc.Address(ip, port), timeout = timeout_value, pack_encoding = 'utf-8', unpack_encoding = 'utf-8')
+        replay = get_replay_connection()
+        if replay is not None:
+            self.client = replay
+        elif connection is not None:
+            self.client = connection
+        else:
+            self.client = msgpackrpc.Client(msgpackrpc.Address(ip, port), timeout = timeout_value, pack_encoding = 'utf-8', unpack_encoding = 'utf-8')
+        self.client = instrument_connection(record_connection(self.client))
 
 #----------------------------------- Common vehicle APIs ---------------------------------------------
     def reset(self):
@@ -1113,10 +1131,100 @@ class VehicleClient:
         """
         return self.client.call('getSettingsString')
 
+#batched calls
+#field name -> (rpc method, argument builder taking the vehicle name, response type)
+    _snapshot_fields = {
+        'pose': ('simGetObjectPose', lambda vehicle_name: (vehicle_name,), Pose),
+        'vehicle_pose': ('simGetVehiclePose', lambda vehicle_name: (vehicle_name,), Pose),
+        'kinematics': ('simGetGroundTruthKinematics', lambda vehicle_name: (vehicle_name,), KinematicsState),
+        'environment': ('simGetGroundTruthEnvironment', lambda vehicle_name: (vehicle_name,), EnvironmentState),
+        'collision': ('simGetCollisionInfo', lambda vehicle_name: (vehicle_name,), CollisionInfo),
+        'gps': ('getGpsData', lambda vehicle_name: ('', vehicle_name), GpsData),
+        'imu': ('getImuData', lambda vehicle_name: ('', vehicle_name), ImuData),
+        'barometer': ('getBarometerData', lambda vehicle_name: ('', vehicle_name), BarometerData),
+        'magnetometer': ('getMagnetometerData', lambda vehicle_name: ('', vehicle_name), MagnetometerData),
+    }
+
+    def callBatch(self, requests):
+        """
+        Pipelines many RPC requests: all of them are sent before waiting for the first response,
+        so the whole batch costs about one round trip of latency instead of one per request
+
+        Args:
+            requests (list[tuple]): (method_name, args) pairs, args being the positional arguments of the RPC
+
+        Returns:
+            list: Raw (undecoded) results in the order of `requests`
+        """
+        futures = [self.client.call_async(method, *args) for method, args in requests]
+        return [future.get() for future in futures]
+
+    def getBatchSnapshot(self, vehicle_names, fields = ('kinematics', 'pose', 'collision', 'gps')):
+        """
+        Snapshot several fields of several vehicles with one pipelined batch of requests
+
+        Args:
+            vehicle_names (list[str]): Vehicles to snapshot
+            fields (list[str], optional): Fields to fetch for every vehicle, see `getBatchSnapshotFields()`
+
+        Returns:
+            dict: vehicle name -> {field name -> decoded response}
+        """
+        unknown = [field for field in fields if field not in self._snapshot_fields]
+        if unknown:
+            raise ValueError('unsupported snapshot field(s): %s' % ', '.join(unknown))
+        requests = []
+        for vehicle_name in vehicle_names:
+            for field in fields:
+                method, make_args, _ = self._snapshot_fields[field]
+                requests.append((method, make_args(vehicle_name)))
+        results = iter(self.callBatch(requests))
+        snapshot = {}
+        for vehicle_name in vehicle_names:
+            snapshot[vehicle_name] = {field: self._snapshot_fields[field][2].from_msgpack(next(results)) for field in fields}
+        return snapshot
+
+    def getBatchSnapshotFields(self):
+        """
+        Returns:
+            list[str]: Field names accepted by `getBatchSnapshot()`
+        """
+        return list(self._snapshot_fields.keys())
+
+    def simGetObjectPoses(self, object_names):
+        """
+        Pipelined version of `simGetObjectPose()` for many objects
+
+        Args:
+            object_names (list[str]): Objects to get the Pose of
+
+        Returns:
+            list[Pose]: World frame poses in the order of `object_names`
+        """
+        return [Pose.from_msgpack(pose) for pose in self.callBatch([('simGetObjectPose', (name,)) for name in object_names])]
+
+    def simGetObjectPosesArray(self, object_names):
+        """
+        Same as `simGetObjectPoses()`, decoded straight into a NumPy structured array
+
+        Args:
+            object_names (list[str]): Objects to get the Pose of
+
+        Returns:
+            numpy.ndarray: Array of POSE_DTYPE in the order of `object_names`
+        """
+        return decode_poses_array(self.callBatch([('simGetObjectPose', (name,)) for name in object_names]))
+
 #----------------------------------- Multirotor APIs ---------------------------------------------
 class MultirotorClient(VehicleClient, object):
-    def __init__(self, ip = "", port = 41451, timeout_value = 3600):
-        super(MultirotorClient, self).__init__(ip, port, timeout_value)
+    _snapshot_fields = dict(VehicleClient._snapshot_fields, **{
+        'state': ('getMultirotorState', lambda vehicle_name: (vehicle_name,), MultirotorState),
+        'rotors': ('getRotorStates', lambda vehicle_name: (vehicle_name,), RotorStates),
+        'trip_stats': ('getTripStats', lambda vehicle_name: (vehicle_name,), TripStats),
+    })
+
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, connection = None):
+        super(MultirotorClient, self).__init__(ip, port, timeout_value, connection)
 
     def takeoffAsync(self, timeout_sec = 20, vehicle_name = ''):
         """
@@ -1569,6 +1677,42 @@ class MultirotorClient(VehicleClient, object):
         """
         return MultirotorState.from_msgpack(self.client.call('getMultirotorState', vehicle_name))
     getMultirotorState.__annotations__ = {'return': MultirotorState}
+
+    def getMultirotorStates(self, vehicle_names):
+        """
+        Pipelined version of `getMultirotorState()` for many vehicles
+
+        Args:
+            vehicle_names (list[str]): Vehicles to get the state of
+
+        Returns:
+            list[MultirotorState]: States in the order of `vehicle_names`
+        """
+        return [MultirotorState.from_msgpack(state) for state in self.callBatch([('getMultirotorState', (name,)) for name in vehicle_names])]
+
+    def getMultirotorStatesArray(self, vehicle_names):
+        """
+        Same as `getMultirotorStates()`, decoded straight into a NumPy structured array
+
+        Args:
+            vehicle_names (list[str]): Vehicles to get the state of
+
+        Returns:
+            numpy.ndarray: Array of MULTIROTOR_STATE_DTYPE in the order of `vehicle_names`
+        """
+        return decode_multirotor_states_array(self.callBatch([('getMultirotorState', (name,)) for name in vehicle_names]))
+
+    def getCompactMultirotorState(self, vehicle_name = ''):
+        """
+        Same as `getMultirotorState()`, decoded into the __slots__ based CompactMultirotorState
+
+        Args:
+            vehicle_name (str, optional): Vehicle to get the state of
+
+        Returns:
+            CompactMultirotorState:
+        """
+        return CompactMultirotorState.from_msgpack(self.client.call('getMultirotorState', vehicle_name))
 #query rotor states
     def getRotorStates(self, vehicle_name = ''):
         """
@@ -1586,8 +1730,8 @@ class MultirotorClient(VehicleClient, object):
 
 #----------------------------------- Car APIs ---------------------------------------------
 class CarClient(VehicleClient, object):
-    def __init__(self, ip = "", port = 41451, timeout_value = 3600):
-        super(CarClient, self).__init__(ip, port, timeout_value)
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, connection = None):
+        super(CarClient, self).__init__(ip, port, timeout_value, connection)
 
     def setCarControls(self, controls, vehicle_name = ''):
         """
@@ -0,0 +1,307 @@
+from __future__ import print_function
+
+import concurrent.futures
+import os
+import threading
+
+import msgpackrpc #install as admin: pip install msgpack-rpc-python
+from msgpackrpc.error import RPCError
+
+from .client import MultirotorClient
+
+DEFAULT_POOL_SIZE = 4
+
+
+class PooledFuture:
+    """
+    Result of `MultiplexedConnection.call_async()`
+
+    Same `join()`/`get()` interface as msgpackrpc.future.Future, but any thread can wait on it
+    because the connection's event loop runs on its own thread
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self._future = concurrent.futures.Future()
+
+    def join(self):
+        """
+        Wait for the request to finish, errors are only raised by `get()`
+        """
+        concurrent.futures.wait([self._future])
+
+    def get(self):
+        """
+        Wait for the request to finish
+
+        Returns:
+            Raw result of the RPC, raises RPCError if the request failed
+        """
+        return self._future.result()
+
+    def done(self):
+        return self._future.done()
+
+    @property
+    def result(self):
+        if self._future.done() and self._future.exception() is None:
+            return self._future.result()
+        return None
+
+    @property
+    def error(self):
+        if self._future.done():
+            return self._future.exception()
+        return None
+
+    def attach_callback(self, callback):
+        """
+        Call `callback(future)` once the request finished, on the connection thread or immediately if already done
+        """
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def as_concurrent_future(self):
+        return self._future
+
+    def set_result(self, result):
+        self._future.set_result(result)
+
+    def set_error(self, error):
+        if not isinstance(error, RPCError):
+            error = RPCError(error)
+        self._future.set_exception(error)
+
+
+class MultiCallbackFuture:
+    """
+    Wraps a msgpackrpc.future.Future, whose `attach_callback()` holds a single callback that the next one
+    replaces, so that several wrappers (RPC metrics, recording) and the caller can each attach their own
+    """
+
+    def __init__(self, future):
+        self.future = future
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._done = False
+        existing = getattr(future, '_callback', None)
+        if existing is not None:
+            self._callbacks.append(lambda _: existing(future))
+        future.attach_callback(self._on_done)
+
+    def _on_done(self, _):
+        with self._lock:
+            self._done = True
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(self)
+
+    def attach_callback(self, callback):
+        """
+        Call `callback(future)` once the request finished, in addition to the callbacks already attached
+        """
+        with self._lock:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def join(self):
+        self.future.join()
+
+    def get(self):
+        return self.future.get()
+
+    @property
+    def result(self):
+        return self.future.result
+
+    @property
+    def error(self):
+        return self.future.error
+
+    def __getattr__(self, name):
+        return getattr(self.future, name)
+
+
+def with_callbacks(future):
+    """
+    Returns:
+        `future` itself if it accepts several callbacks, else `future` wrapped in a MultiCallbackFuture
+    """
+    if isinstance(future, (PooledFuture, MultiCallbackFuture)):
+        return future
+    return MultiCallbackFuture(future)
+
+
+class MultiplexedConnection:
+    """
+    One msgpack-rpc TCP connection shared by any number of threads
+
+    The tornado loop of the connection is owned by a dedicated thread, other threads only hand requests
+    over to it, so concurrent callers never touch the (not thread safe) msgpack-rpc session directly.
+    Requests of all callers are in flight on the socket at the same time and matched by message id.
+    Exposes `call()` and `call_async()` like msgpackrpc.Client so it can back any VehicleClient.
+    """
+
+    def __init__(self, ip, port = 41451, timeout_value = 3600):
+        self.address = msgpackrpc.Address(ip, port)
+        self.timeout_value = timeout_value
+        self._loop = None
+        self._session = None
+        self._closed = False
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="airsim-connection-%s:%d" % (ip, port))
+        self._thread.start()
+        self._ready.wait()
+
+    def call(self, method, *args):
+        return self.call_async(method, *args).get()
+
+    def call_async(self, method, *args):
+        if self._closed:
+            raise RPCError("connection to %s:%d is closed" % self.address.unpack())
+        future = PooledFuture(method)
+        self._loop._ioloop.add_callback(self._send, method, args, future)
+        return future
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._loop._ioloop.add_callback(self._shutdown)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        self._loop = msgpackrpc.Loop()
+        self._ready.set()
+        while not self._closed:
+            # msgpack-rpc stops the loop after every response, keep it spinning until closed
+            self._loop.start()
+
+    def _shutdown(self):
+        self._discard_session()
+        self._loop.stop()
+
+    def _discard_session(self):
+        # runs on the connection thread, drops the socket and the step_timeout callback the session attached
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+            self._loop.dettach_periodic_callback()
+
+    def _get_session(self):
+        # runs on the connection thread
+        if self._session is not None and self._session.failed:
+            self._discard_session()
+        if self._session is None:
+            self._session = _PooledSession(self.address, timeout=self.timeout_value, loop=self._loop,
+                                           pack_encoding='utf-8', unpack_encoding='utf-8')
+        return self._session
+
+    def _send(self, method, args, future):
+        # runs on the connection thread
+        try:
+            rpc_future = self._get_session().send_request(method, args)
+        except Exception as e:
+            future.set_error(e)
+            return
+        rpc_future.attach_callback(lambda done: self._complete(done, future))
+
+    @staticmethod
+    def _complete(rpc_future, future):
+        if rpc_future.error is not None:
+            future.set_error(rpc_future.error)
+        else:
+            future.set_result(rpc_future.result)
+
+
+class _PooledSession(msgpackrpc.Client):
+    """
+    msgpack-rpc session that remembers a failed connect so the next request opens a fresh one
+    """
+
+    failed = False
+
+    def on_connect_failed(self, reason):
+        self.failed = True
+        super(_PooledSession, self).on_connect_failed(reason)
+
+
+class ClientPool:
+    """
+    Process wide, bounded set of simulator connections
+
+    `get_client()` hands out lightweight MultirotorClient objects bound round robin to one of at most
+    `size` shared connections. A client keeps its connection for life, so calls of one client are
+    sent in order exactly as with a dedicated connection.
+    """
+
+    def __init__(self, ip = "", port = 41451, timeout_value = 3600, size = None):
+        if (ip == ""):
+            # AIRSIM_HOST points the backend at another simulator, e.g. the local mock_simulator
+            ip = os.getenv('AIRSIM_HOST', "host.docker.internal")
+        if size is None:
+            size = int(os.getenv('AIRSIM_CLIENT_POOL_SIZE', DEFAULT_POOL_SIZE))
+        if size < 1:
+            raise ValueError('client pool size must be at least 1')
+        self.ip = ip
+        self.port = port
+        self.timeout_value = timeout_value
+        self.size = size
+        self._connections = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        """
+        Returns:
+            MultiplexedConnection: next connection in round robin order, opened lazily
+        """
+        with self._lock:
+            if len(self._connections) < self.size:
+                connection = MultiplexedConnection(self.ip, self.port, self.timeout_value)
+                self._connections.append(connection)
+                return connection
+            connection = self._connections[self._next % len(self._connections)]
+            self._next += 1
+            return connection
+
+    def get_client(self):
+        """
+        Returns:
+            MultirotorClient: client multiplexed over the pool's connections
+        """
+        return MultirotorClient(self.ip, self.port, self.timeout_value, connection=self.get_connection())
+
+    def close(self):
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            connection.close()
+
+
+_client_pool = None
+_client_pool_lock = threading.Lock()
+
+
+def get_client_pool():
+    """
+    Returns:
+        ClientPool: the process wide pool, created on first use
+    """
+    global _client_pool
+    if _client_pool is None:
+        with _client_pool_lock:
+            if _client_pool is None:
+                _client_pool = ClientPool()
+    return _client_pool
+
+
+def close_client_pool():
+    global _client_pool
+    with _client_pool_lock:
+        pool, _client_pool = _client_pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,239 @@
+from __future__ import print_function
+import numpy as np #pip install numpy
+
+from .types import CollisionInfo, RCData
+
+# Fast path decoders for the high rate responses (poses, kinematics, multirotor states).
+# The compact types expose the same attribute names as their `types.py` counterparts so they can be
+# read by the same code, but use __slots__ and decode the msgpack dict directly instead of building
+# the object through `MsgpackMixin.from_msgpack`.
+
+class CompactVector3r:
+    __slots__ = ('x_val', 'y_val', 'z_val')
+
+    def __init__(self, x_val = 0.0, y_val = 0.0, z_val = 0.0):
+        self.x_val = x_val
+        self.y_val = y_val
+        self.z_val = z_val
+
+    @classmethod
+    def from_msgpack(cls, encoded):
+        return cls(encoded['x_val'], encoded['y_val'], encoded['z_val'])
+
+    def to_msgpack(self, *args, **kwargs):
+        return {'x_val': self.x_val, 'y_val': self.y_val, 'z_val': self.z_val}
+
+    def get_length(self):
+        return ( self.x_val**2 + self.y_val**2 + self.z_val**2 )**0.5
+
+    def distance_to(self, other):
+        return ( (self.x_val-other.x_val)**2 + (self.y_val-other.y_val)**2 + (self.z_val-other.z_val)**2 )**0.5
+
+    def to_numpy_array(self):
+        return np.array([self.x_val, self.y_val, self.z_val], dtype=np.float32)
+
+    def __iter__(self):
+        return iter((self.x_val, self.y_val, self.z_val))
+
+    def __repr__(self):
+        return "<CompactVector3r> (%r, %r, %r)" % (self.x_val, self.y_val, self.z_val)
+
+class CompactQuaternionr:
+    __slots__ = ('x_val', 'y_val', 'z_val', 'w_val')
+
+    def __init__(self, x_val = 0.0, y_val = 0.0, z_val = 0.0, w_val = 1.0):
+        self.x_val = x_val
+        self.y_val = y_val
+        self.z_val = z_val
+        self.w_val = w_val
+
+    @classmethod
+    def from_msgpack(cls, encoded):
+        return cls(encoded['x_val'], encoded['y_val'], encoded['z_val'], encoded['w_val'])
+
+    def to_msgpack(self, *args, **kwargs):
+        return {'w_val': self.w_val, 'x_val': self.x_val, 'y_val': self.y_val, 'z_val': self.z_val}
+
+    def to_numpy_array(self):
+        return np.array([self.x_val, self.y_val, self.z_val, self.w_val], dtype=np.float32)
+
+    def __iter__(self):
+        return iter((self.x_val, self.y_val, self.z_val, self.w_val))
+
+    def __repr__(self):
+        return "<CompactQuaternionr> (%r, %r, %r, %r)" % (self.x_val, self.y_val, self.z_val, self.w_val)
+
+class CompactGeoPoint:
+    __slots__ = ('latitude', 'longitude', 'altitude')
+
+    def __init__(self, latitude = 0.0, longitude = 0.0, altitude = 0.0):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.altitude = altitude
+
+    @classmethod
+    def from_msgpack(cls, encoded):
+        return cls(encoded['latitude'], encoded['longitude'], encoded['altitude'])
+
+    def to_msgpack(self, *args, **kwargs):
+        return {'latitude': self.latitude, 'longitude': self.longitude, 'altitude': self.altitude}
+
+    def __repr__(self):
+        return "<CompactGeoPoint> (%r, %r, %r)" % (self.latitude, self.longitude, self.altitude)
+
+class CompactPose:
+    __slots__ = ('position', 'orientation')
+
+    def __init__(self, position_val = None, orientation_val = None):
+        self.position = position_val if position_val is not None else CompactVector3r()
+        self.orientation = orientation_val if orientation_val is not None else CompactQuaternionr()
+
+    @classmethod
+    def from_msgpack(cls, encoded):
+        return cls(CompactVector3r.from_msgpack(encoded['position']), CompactQuaternionr.from_msgpack(encoded['orientation']))
+
+    def to_msgpack(self, *args, **kwargs):
+        return {'position': self.position.to_msgpack(), 'orientation': self.orientation.to_msgpack()}
+
+    def __repr__(self):
+        return "<CompactPose> position=%r orientation=%r" % (self.position, self.orientation)
+
+class CompactKinematicsState:
+    __slots__ = ('position', 'orientation', 'linear_velocity', 'angular_velocity', 'linear_acceleration', 'angular_acceleration')
+
+    @classmethod
+    def from_msgpack(cls, encoded):
+        obj = cls()
+        obj.position = CompactVector3r.from_msgpack(encoded['position'])
+        obj.orientation = CompactQuaternionr.from_msgpack(encoded['orientation'])
+        obj.linear_velocity = CompactVector3r.from_msgpack(encoded['linear_velocity'])
+        obj.angular_velocity = CompactVector3r.from_msgpack(encoded['angular_velocity'])
+        obj.linear_acceleration = CompactVector3r.from_msgpack(encoded['linear_acceleration'])
+        obj.angular_acceleration = CompactVector3r.from_msgpack(encoded['angular_acceleration'])
+        return obj
+
+    def __repr__(self):
+        return "<CompactKinematicsState> position=%r linear_velocity=%r" % (self.position, self.linear_velocity)
+
+class CompactMultirotorState:
+    """
+    `MultirotorState` with compact kinematics and geo point
+
+    The rarely read `collision` and `rc_data` members are kept as their msgpack dicts and only decoded
+    into `CollisionInfo`/`RCData` on first access.
+    """
+    __slots__ = ('kinematics_estimated', 'gps_location', 'timestamp', 'landed_state', 'ready', 'ready_message', 'can_arm',
+                 '_collision', '_rc_data')
+
+    @classmethod
+    def from_msgpack(cls, encoded):
+        obj = cls()
+        obj.kinematics_estimated = CompactKinematicsState.from_msgpack(encoded['kinematics_estimated'])
+        obj.gps_location = CompactGeoPoint.from_msgpack(encoded['gps_location'])
+        obj.timestamp = encoded['timestamp']
+        obj.landed_state = encoded['landed_state']
+        obj.ready = encoded.get('ready', False)
+        obj.ready_message = encoded.get('ready_message', "")
+        obj.can_arm = encoded.get('can_arm', False)
+        obj._collision = encoded.get('collision')
+        obj._rc_data = encoded.get('rc_data')
+        return obj
+
+    @property
+    def collision(self):
+        if isinstance(self._collision, dict):
+            self._collision = CollisionInfo.from_msgpack(self._collision)
+        return self._collision
+
+    @property
+    def rc_data(self):
+        if isinstance(self._rc_data, dict):
+            self._rc_data = RCData.from_msgpack(self._rc_data)
+        return self._rc_data
+
+    def __repr__(self):
+        return "<CompactMultirotorState> timestamp=%r landed_state=%r kinematics_estimated=%r" % (
+            self.timestamp, self.landed_state, self.kinematics_estimated)
+
+#----------------------------------- NumPy structured arrays ---------------------------------------------
+# Vectors are stored as (x, y, z), quaternions as (x, y, z, w), the order of `to_numpy_array()`
+
+POSE_DTYPE = np.dtype([
+    ('position', np.float64, (3,)),
+    ('orientation', np.float64, (4,)),
+])
+
+KINEMATICS_DTYPE = np.dtype([
+    ('position', np.float64, (3,)),
+    ('orientation', np.float64, (4,)),
+    ('linear_velocity', np.float64, (3,)),
+    ('angular_velocity', np.float64, (3,)),
+    ('linear_acceleration', np.float64, (3,)),
+    ('angular_acceleration', np.float64, (3,)),
+    ('timestamp', np.uint64),
+])
+
+MULTIROTOR_STATE_DTYPE = np.dtype(KINEMATICS_DTYPE.descr + [
+    ('gps_location', np.float64, (3,)),
+    ('landed_state', np.int8),
+    ('has_collided', np.bool_),
+])
+
+def _vector3r_values(encoded):
+    return (encoded['x_val'], encoded['y_val'], encoded['z_val'])
+
+def _quaternionr_values(encoded):
+    return (encoded['x_val'], encoded['y_val'], encoded['z_val'], encoded['w_val'])
+
+def _kinematics_values(encoded, timestamp):
+    return (_vector3r_values(encoded['position']), _quaternionr_values(encoded['orientation']),
+            _vector3r_values(encoded['linear_velocity']), _vector3r_values(encoded['angular_velocity']),
+            _vector3r_values(encoded['linear_acceleration']), _vector3r_values(encoded['angular_acceleration']),
+            timestamp)
+
+def decode_poses_array(encoded_poses):
+    """
+    Decode a batch of msgpack encoded `Pose` responses
+
+    Args:
+        encoded_poses (list[dict]): Raw responses, e.g. of `VehicleClient.callBatch()`
+
+    Returns:
+        numpy.ndarray: Array of POSE_DTYPE, one row per response
+    """
+    return np.array([(_vector3r_values(pose['position']), _quaternionr_values(pose['orientation'])) for pose in encoded_poses],
+                    dtype=POSE_DTYPE)
+
+def decode_kinematics_array(encoded_kinematics, timestamps = None):
+    """
+    Decode a batch of msgpack encoded `KinematicsState` responses
+
+    Args:
+        encoded_kinematics (list[dict]): Raw responses
+        timestamps (list[int], optional): Timestamp of each response in nanoseconds, 0 if not given
+
+    Returns:
+        numpy.ndarray: Array of KINEMATICS_DTYPE, one row per response
+    """
+    if timestamps is None:
+        timestamps = [0] * len(encoded_kinematics)
+    return np.array([_kinematics_values(kinematics, timestamp) for kinematics, timestamp in zip(encoded_kinematics, timestamps)],
+                    dtype=KINEMATICS_DTYPE)
+
+def decode_multirotor_states_array(encoded_states):
+    """
+    Decode a batch of msgpack encoded `MultirotorState` responses
+
+    Args:
+        encoded_states (list[dict]): Raw responses
+
+    Returns:
+        numpy.ndarray: Array of MULTIROTOR_STATE_DTYPE, one row per response
+    """
+    rows = []
+    for state in encoded_states:
+        gps = state['gps_location']
+        collision = state.get('collision') or {}
+        rows.append(_kinematics_values(state['kinematics_estimated'], state['timestamp']) +
+                    ((gps['latitude'], gps['longitude'], gps['altitude']), state['landed_state'], collision.get('has_collided', False)))
+    return np.array(rows, dtype=MULTIROTOR_STATE_DTYPE)
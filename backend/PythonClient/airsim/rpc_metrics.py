@@ -0,0 +1,239 @@
+from __future__ import print_function
+
+import bisect
+import os
+import threading
+import time
+
+from msgpackrpc import error as rpc_error
+
+# latency histogram buckets: 1.25x geometric steps from 10 us to ~200 s, percentiles are accurate to one step
+_BUCKET_BOUNDS = []
+_bound = 1e-5
+while _bound < 200:
+    _BUCKET_BOUNDS.append(_bound)
+    _bound *= 1.25
+del _bound
+
+
+def _encoded_size(value):
+    """
+    Approximate msgpack encoded size of an RPC argument list or result, without serializing it again.
+    str and bin payloads, which carry images and other bulk data, are counted exactly, numbers at their
+    9 byte maximum and container headers not at all
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (int, float)):
+            # flat numeric lists (point clouds, depth planes) are sized without walking them
+            return 9 * len(value)
+        return sum(_encoded_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_encoded_size(key) + _encoded_size(item) for key, item in value.items())
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 9
+    # MsgpackMixin types are sent as their attribute dict
+    return _encoded_size(getattr(value, '__dict__', None) or {})
+
+
+class RpcMethodStats:
+    """
+    Counters and latency histogram of one RPC method
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+
+    def record(self, latency, bytes_out, bytes_in, error=None):
+        self.count += 1
+        if error is not None:
+            if isinstance(error, (rpc_error.TimeoutError, TimeoutError)):
+                self.timeouts += 1
+            else:
+                self.errors += 1
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.buckets[bisect.bisect_left(_BUCKET_BOUNDS, latency)] += 1
+
+    def copy(self):
+        stats = RpcMethodStats()
+        stats.__dict__.update(self.__dict__)
+        stats.buckets = list(self.buckets)
+        return stats
+
+    def minus(self, baseline):
+        """
+        Returns:
+            RpcMethodStats: calls recorded since `baseline` was copied, max latency is not windowed
+        """
+        stats = self.copy()
+        if baseline is None:
+            return stats
+        for name in ('count', 'errors', 'timeouts', 'bytes_out', 'bytes_in', 'total_latency'):
+            setattr(stats, name, getattr(self, name) - getattr(baseline, name))
+        stats.buckets = [a - b for a, b in zip(self.buckets, baseline.buckets)]
+        return stats
+
+    def percentile(self, q):
+        """
+        Args:
+            q (float): Percentile in [0, 100]
+
+        Returns:
+            float: Upper bound of the histogram bucket holding the percentile, in seconds
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(_BUCKET_BOUNDS[index], self.max_latency) if index < len(_BUCKET_BOUNDS) else self.max_latency
+        return self.max_latency
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'bytes_out': self.bytes_out,
+            'bytes_in': self.bytes_in,
+            'mean_ms': 1000.0 * self.total_latency / self.count if self.count else 0.0,
+            'p50_ms': 1000.0 * self.percentile(50),
+            'p95_ms': 1000.0 * self.percentile(95),
+            'p99_ms': 1000.0 * self.percentile(99),
+            'max_ms': 1000.0 * self.max_latency,
+        }
+
+
+class RpcMetrics:
+    """
+    Process wide per-method RPC statistics
+
+    Only clients created while metrics are enabled are instrumented, disabled metrics cost nothing on the
+    call path because connections are then used unwrapped.
+    """
+
+    def __init__(self, enabled = False):
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def record(self, method, latency, bytes_out, bytes_in, error=None):
+        with self._lock:
+            stats = self._stats.get(method)
+            if stats is None:
+                stats = self._stats[method] = RpcMethodStats()
+            stats.record(latency, bytes_out, bytes_in, error)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: method name -> copy of its RpcMethodStats, usable as `baseline` of `summary()`
+        """
+        with self._lock:
+            return {method: stats.copy() for method, stats in self._stats.items()}
+
+    def summary(self, baseline = None):
+        """
+        Args:
+            baseline (dict, optional): Earlier `snapshot()`, only calls made since then are summarized
+
+        Returns:
+            dict: JSON serializable per-method counters and latency percentiles plus totals
+        """
+        baseline = baseline or {}
+        methods = {}
+        for method, stats in self.snapshot().items():
+            window = stats.minus(baseline.get(method))
+            if window.count:
+                methods[method] = window.to_dict()
+        return {
+            'enabled': self.enabled,
+            'uptime_s': time.time() - self._started,
+            'total_calls': sum(stats['count'] for stats in methods.values()),
+            'total_errors': sum(stats['errors'] + stats['timeouts'] for stats in methods.values()),
+            'methods': methods,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+            self._started = time.time()
+
+
+class InstrumentedConnection:
+    """
+    Wraps a msgpackrpc.Client or MultiplexedConnection and records every call into RpcMetrics
+    """
+
+    def __init__(self, connection, metrics):
+        self.connection = connection
+        self.metrics = metrics
+
+    def call(self, method, *args):
+        start = time.perf_counter()
+        try:
+            result = self.connection.call(method, *args)
+        except Exception as e:
+            self.metrics.record(method, time.perf_counter() - start, _encoded_size(args), 0, e)
+            raise
+        latency = time.perf_counter() - start
+        self.metrics.record(method, latency, _encoded_size(args), _encoded_size(result))
+        return result
+
+    def call_async(self, method, *args):
+        start = time.perf_counter()
+        from .client_pool import with_callbacks
+        future = with_callbacks(self.connection.call_async(method, *args))
+
+        def on_done(done):
+            # sizes are taken after the latency so they never count towards it
+            latency = time.perf_counter() - start
+            error = done.error
+            bytes_in = 0 if error is not None else _encoded_size(done.result)
+            self.metrics.record(method, latency, _encoded_size(args), bytes_in, error)
+        future.attach_callback(on_done)
+        return future
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+_rpc_metrics = RpcMetrics(os.getenv('AIRSIM_RPC_METRICS', 'false').strip().lower() == 'true')
+
+
+def get_rpc_metrics():
+    """
+    Returns:
+        RpcMetrics: the process wide metrics, enabled by AIRSIM_RPC_METRICS=true or `enable_rpc_metrics()`
+    """
+    return _rpc_metrics
+
+
+def enable_rpc_metrics(enabled = True):
+    _rpc_metrics.enabled = enabled
+
+
+def instrument_connection(connection):
+    """
+    Returns:
+        `connection` wrapped in an InstrumentedConnection if metrics are enabled, else `connection` itself
+    """
+    if not _rpc_metrics.enabled or isinstance(connection, InstrumentedConnection):
+        return connection
+    return InstrumentedConnection(connection, _rpc_metrics)
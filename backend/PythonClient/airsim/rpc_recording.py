@@ -0,0 +1,274 @@
+from __future__ import print_function
+
+import gzip
+import os
+import threading
+import time
+from collections import deque
+
+import msgpack
+from msgpackrpc import error as rpc_error
+
+RECORDING_VERSION = 1
+
+
+def _pack(value):
+    return msgpack.packb(value, use_bin_type=True, default=lambda x: x.to_msgpack())
+
+
+class RpcRecorder:
+    """
+    Appends every request/response pair to a gzip compressed msgpack stream
+
+    The file starts with a header map followed by one array per call:
+    [start offset in s, latency in s, method, args, error class or None, error message or None, result]
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self._started = time.time()
+        self._clock = time.perf_counter()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = gzip.open(path, 'wb')
+        self._file.write(_pack({'version': RECORDING_VERSION, 'started': self._started}))
+
+    def now(self):
+        return time.perf_counter() - self._clock
+
+    def record(self, method, args, start, end, result=None, error=None):
+        error_class = None
+        if error is not None:
+            # msgpack-rpc futures may hold the raw error sent by the server instead of an exception
+            error_class = type(error).__name__ if isinstance(error, rpc_error.RPCError) else 'RPCError'
+        entry = [start, end - start, method, args, error_class, None if error is None else str(error), result]
+        try:
+            data = _pack(entry)
+        except Exception as e:
+            # keep the call in the recording, an unserializable result replays as an error
+            data = _pack([start, end - start, method, args, 'RPCError', 'result not recordable: %s' % e, None])
+        with self._lock:
+            if self._file is not None:
+                self._file.write(data)
+                self.calls += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RecordingConnection:
+    """
+    Wraps a msgpackrpc.Client or MultiplexedConnection and logs its calls into the active RpcRecorder
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def call(self, method, *args):
+        recorder = _rpc_recorder
+        if recorder is None:
+            return self.connection.call(method, *args)
+        start = recorder.now()
+        try:
+            result = self.connection.call(method, *args)
+        except Exception as e:
+            recorder.record(method, args, start, recorder.now(), error=e)
+            raise
+        recorder.record(method, args, start, recorder.now(), result)
+        return result
+
+    def call_async(self, method, *args):
+        from .client_pool import with_callbacks
+        recorder = _rpc_recorder
+        # taken before the request is sent, like call(), so paced replays don't understate the latency
+        start = recorder.now() if recorder is not None else None
+        future = self.connection.call_async(method, *args)
+        if recorder is not None:
+            # a plain msgpackrpc future keeps one callback, later ones (metrics, missions) must not replace ours
+            future = with_callbacks(future)
+            future.attach_callback(lambda done: recorder.record(method, args, start, recorder.now(), done.result, done.error))
+        return future
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+class ReplayConnection:
+    """
+    Serves the responses of a recording instead of talking to a simulator
+
+    Responses are matched to requests by method and encoded arguments and handed out in recorded order,
+    so each drone's telemetry replays in the same sequence whatever the thread interleaving. Requests whose
+    arguments are not in the recording (e.g. edited mission waypoints) get the recorded responses of the same
+    method in order instead. Once the responses of a request are used up its last response is repeated.
+    """
+
+    def __init__(self, path, pace = False):
+        """
+        Args:
+            path (str): Recording written by RpcRecorder
+            pace (bool, optional): Wait the recorded latency before every response, for benchmarks
+        """
+        self.path = path
+        self.pace = pace
+        self.misses = 0
+        self._responses = []
+        self._by_request = {}  # (method, encoded args) -> ids of its responses in recorded order
+        self._by_method = {}  # method -> ids of its responses in recorded order
+        self._consumed = set()  # ids handed out through either queue
+        self._last = {}
+        self._lock = threading.Lock()
+        with gzip.open(path, 'rb') as f:
+            unpacker = msgpack.Unpacker(f, encoding='utf-8')
+            header = next(unpacker)
+            if header.get('version') != RECORDING_VERSION:
+                raise ValueError('unsupported RPC recording version %s' % header.get('version'))
+            for entry in unpacker:
+                start, latency, method, args = entry[0], entry[1], entry[2], entry[3]
+                response_id = len(self._responses)
+                self._responses.append((latency, entry[4], entry[5], entry[6]))
+                self._by_request.setdefault((method, _pack(args)), deque()).append(response_id)
+                self._by_method.setdefault(method, deque()).append(response_id)
+
+    def _next_response(self, method, args):
+        key = (method, _pack(args))
+        with self._lock:
+            responses = self._by_request.get(key)
+            if responses is None:
+                # request not in the recording, replay the method's responses in recorded order instead
+                self.misses += 1
+                key = method
+                responses = self._by_method.get(method)
+            # a response used through one queue is still queued in the other, skip it
+            while responses and responses[0] in self._consumed:
+                responses.popleft()
+            if responses:
+                response_id = responses.popleft()
+                self._consumed.add(response_id)
+                self._last[key] = self._responses[response_id]
+            if key in self._last:
+                return self._last[key]
+        raise rpc_error.RPCError("no recorded response for '%s'" % method)
+
+    @staticmethod
+    def _result(response):
+        latency, error_class, error_message, result = response
+        if error_class is not None:
+            error_type = getattr(rpc_error, error_class, rpc_error.RPCError)
+            raise error_type(error_message)
+        return result
+
+    def call(self, method, *args):
+        response = self._next_response(method, args)
+        if self.pace:
+            time.sleep(response[0])
+        return self._result(response)
+
+    def call_async(self, method, *args):
+        from .client_pool import PooledFuture
+        future = PooledFuture(method)
+
+        def resolve(response):
+            try:
+                future.set_result(self._result(response))
+            except Exception as e:
+                future.set_error(e)
+
+        try:
+            response = self._next_response(method, args)
+        except Exception as e:
+            future.set_error(e)
+            return future
+        if self.pace and response[0] > 0:
+            # resolve after the recorded latency without blocking the caller, like a real async command
+            timer = threading.Timer(response[0], resolve, (response,))
+            timer.daemon = True
+            timer.start()
+        else:
+            resolve(response)
+        return future
+
+    def close(self):
+        pass
+
+
+_rpc_recorder = None
+_rpc_recording_enabled = os.getenv('AIRSIM_RPC_RECORD', 'false').strip().lower() == 'true'
+_rpc_replay = None
+_rpc_replay_lock = threading.Lock()
+
+
+def is_rpc_recording_enabled():
+    return _rpc_recording_enabled
+
+
+def start_rpc_recording(path):
+    """
+    Record the calls of every client created from now on into `path` until `stop_rpc_recording()`
+
+    Returns:
+        RpcRecorder:
+    """
+    global _rpc_recorder, _rpc_recording_enabled
+    stop_rpc_recording()
+    _rpc_recording_enabled = True
+    _rpc_recorder = RpcRecorder(path)
+    return _rpc_recorder
+
+
+def stop_rpc_recording():
+    """
+    Returns:
+        RpcRecorder: the closed recorder, None if nothing was recorded
+    """
+    global _rpc_recorder
+    recorder, _rpc_recorder = _rpc_recorder, None
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+
+def record_connection(connection):
+    """
+    Returns:
+        `connection` wrapped in a RecordingConnection if recording is enabled, else `connection` itself
+    """
+    if not _rpc_recording_enabled or isinstance(connection, (RecordingConnection, ReplayConnection)):
+        return connection
+    return RecordingConnection(connection)
+
+
+def start_rpc_replay(path, pace = False):
+    """
+    Make every client created from now on replay `path` instead of connecting to the simulator
+    """
+    global _rpc_replay
+    with _rpc_replay_lock:
+        _rpc_replay = ReplayConnection(path, pace)
+    return _rpc_replay
+
+
+def stop_rpc_replay():
+    global _rpc_replay
+    with _rpc_replay_lock:
+        _rpc_replay = None
+
+
+def get_replay_connection():
+    """
+    Returns:
+        ReplayConnection: the active replay, loaded from AIRSIM_RPC_REPLAY on first use, None if not replaying
+    """
+    global _rpc_replay
+    if _rpc_replay is None and os.getenv('AIRSIM_RPC_REPLAY'):
+        with _rpc_replay_lock:
+            if _rpc_replay is None:
+                _rpc_replay = ReplayConnection(os.getenv('AIRSIM_RPC_REPLAY'),
+                                               os.getenv('AIRSIM_RPC_REPLAY_PACE', 'false').strip().lower() == 'true')
+    return _rpc_replay
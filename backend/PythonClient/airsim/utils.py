@@ -12,17 +12,42 @@ from .types import *
 
 
 def string_to_uint8_array(bstr):
-    return np.fromstring(bstr, np.uint8)
+    # read-only view on the response buffer, copy it before writing into it
+    return np.frombuffer(bstr, np.uint8)
     
 def string_to_float_array(bstr):
-    return np.fromstring(bstr, np.float32)
+    return np.frombuffer(bstr, np.float32)
     
 def list_to_2d_float_array(flst, width, height):
-    return np.reshape(np.asarray(flst, np.float32), (height, width))
+    return np.reshape(np.fromiter(flst, np.float32, count=len(flst)), (height, width))
     
 def get_pfm_array(response):
     return list_to_2d_float_array(response.image_data_float, response.width, response.height)
 
+def image_response_to_ndarray(response):
+    """
+    Convert one ImageResponse of `simGetImages()` to a NumPy array
+
+    Uncompressed uint8 images are returned as a read-only (H, W, C) view on the received buffer, float
+    images as a (H, W) float32 array. Compressed images can't be reshaped and are returned as a 1D uint8
+    view of the encoded bytes, e.g. for `cv2.imdecode()`.
+    """
+    if response.pixels_as_float:
+        return get_pfm_array(response)
+    data = string_to_uint8_array(response.image_data_uint8)
+    if response.compress or response.width * response.height == 0:
+        return data
+    return data.reshape(response.height, response.width, data.size // (response.height * response.width))
+
+def image_responses_to_ndarrays(responses):
+    """
+    Convert every ImageResponse of one `simGetImages()` call with `image_response_to_ndarray()`
+
+    Returns:
+        list[numpy.ndarray]: in the order of `responses`
+    """
+    return [image_response_to_ndarray(response) for response in responses]
+
     
 def get_public_fields(obj):
     return [attr for attr in dir(obj)
@@ -124,16 +149,13 @@ def wait_key(message = ''):
     return result
 
     
-def read_pfm(file):
-    """ Read a pfm file """
-    file = open(file, 'rb')
-
-    color = None
-    width = None
-    height = None
-    scale = None
-    endian = None
+def read_pfm_header(file):
+    """
+    Parse the header of an open pfm file, leaves the file positioned at the first pixel
 
+    Returns:
+        tuple: (color, width, height, scale, endian)
+    """
     header = file.readline().rstrip()
     header = str(bytes.decode(header, encoding='utf-8'))
     if header == 'PF':
@@ -143,8 +165,13 @@ def read_pfm(file):
     else:
         raise Exception('Not a PFM file.')
 
+    pattern = r'^(\d+)\s(\d+)\s$'
     temp_str = str(bytes.decode(file.readline(), encoding='utf-8'))
-    dim_match = re.match(r'^(\d+)\s(\d+)\s$', temp_str)
+    dim_match = re.match(pattern, temp_str)
+    if not dim_match:
+        # some writers put width and height on separate lines
+        temp_str += str(bytes.decode(file.readline(), encoding='utf-8'))
+        dim_match = re.match(pattern, temp_str)
     if dim_match:
         width, height = map(int, dim_match.groups())
     else:
@@ -156,23 +183,98 @@ def read_pfm(file):
         scale = -scale
     else:
         endian = '>' # big-endian
+    return color, width, height, scale, endian
 
-    data = np.fromfile(file, endian + 'f')
-    shape = (height, width, 3) if color else (height, width)
+def read_pfm(file, mmap_mode=None):
+    """
+    Read a pfm file
 
-    data = np.reshape(data, shape)
-    # DEY: I don't know why this was there.
-    file.close()
-    
-    return data, scale
+    Args:
+        file (str): Path of the pfm file
+        mmap_mode (str, optional): np.memmap mode ('r', 'r+', 'c') to map the pixels lazily instead of loading them
+
+    Returns:
+        tuple: (image array, scale)
+    """
+    with open(file, 'rb') as f:
+        color, width, height, scale, endian = read_pfm_header(f)
+        shape = (height, width, 3) if color else (height, width)
+        if mmap_mode is not None:
+            offset = f.tell()
+        else:
+            data = np.fromfile(f, endian + 'f', count=int(np.prod(shape)))
+            return np.reshape(data, shape), scale
+    return np.memmap(file, dtype=endian + 'f', mode=mmap_mode, offset=offset, shape=shape), scale
+
+def read_pfm_memmap(file):
+    """
+    Read-only memory mapped view of a pfm file, pages are only loaded when accessed
+
+    Returns:
+        tuple: (np.memmap, scale)
+    """
+    return read_pfm(file, mmap_mode='r')
 
     
-def write_pfm(file, image, scale=1):
-    """ Write a pfm file """
-    file = open(file, 'wb')
+class PfmWriter:
+    """
+    Streams a pfm file to disk row block by row block, without holding the whole image in memory
+
+    Example:
+        with PfmWriter('depth.pfm', width, height) as writer:
+            writer.write(response.image_data_float)
+    """
 
-    color = None
+    def __init__(self, file, width, height, color=False, scale=1):
+        self.width = width
+        self.height = height
+        self.channels = 3 if color else 1
+        self.expected = width * height * self.channels
+        self.written = 0
+        self._file = open(file, 'wb')
+        self._file.write('PF\n'.encode('utf-8') if color else 'Pf\n'.encode('utf-8'))
+        self._file.write(('%d %d\n' % (width, height)).encode('utf-8'))
+        # float32 values are written in native byte order, the sign of the scale carries the endianness
+        self._file.write(('%f\n' % (-scale if sys.byteorder == 'little' else scale)).encode('utf-8'))
+
+    def write(self, values):
+        """
+        Append pixel values in row major order
+
+        Args:
+            values: float32 array, or any buffer or sequence of floats (e.g. ImageResponse.image_data_float)
+        """
+        if isinstance(values, np.ndarray):
+            values = values.astype(np.float32, copy=False)
+        elif isinstance(values, (bytes, bytearray, memoryview)):
+            values = np.frombuffer(values, np.float32)
+        else:
+            values = np.fromiter(values, np.float32, count=len(values))
+        if self.written + values.size > self.expected:
+            raise Exception('More pixels than %d x %d written to PFM file.' % (self.width, self.height))
+        values.tofile(self._file)
+        self.written += values.size
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if self.written != self.expected:
+            raise Exception('PFM file closed after %d of %d pixels.' % (self.written, self.expected))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
 
+def write_pfm(file, image, scale=1):
+    """ Write a pfm file """
     if image.dtype.name != 'float32':
         raise Exception('Image dtype must be float32.')
 
@@ -183,19 +285,10 @@ def write_pfm(file, image, scale=1):
     else:
         raise Exception('Image must have H x W x 3, H x W x 1 or H x W dimensions.')
 
-    file.write('PF\n'.encode('utf-8')  if color else 'Pf\n'.encode('utf-8'))
-    temp_str = '%d %d\n' % (image.shape[1], image.shape[0])
-    file.write(temp_str.encode('utf-8'))
-
-    endian = image.dtype.byteorder
-
-    if endian == '<' or endian == '=' and sys.byteorder == 'little':
-        scale = -scale
-
-    temp_str = '%f\n' % scale
-    file.write(temp_str.encode('utf-8'))
-
-    image.tofile(file)
+    with PfmWriter(file, image.shape[1], image.shape[0], color, scale) as writer:
+        # row by row so non contiguous views are not copied as a whole
+        for row in image:
+            writer.write(np.ascontiguousarray(row, dtype=np.float32).ravel())
 
     
 def write_png(filename, image):
@@ -1,11 +1,12 @@
-import json
-import math
 import os
 import time
 from abc import abstractmethod
 
 from PythonClient import airsim
+from PythonClient.multirotor.control.lockstep_clock import get_simulation_time
 from PythonClient.multirotor.storage.storage_config import get_storage_service
+from PythonClient.multirotor.util.config.airsim_config_cache import get_config_cache
+from PythonClient.multirotor.util.log.event_log import EventLog
 
 class AirSimApplication:
     # Parent class for all airsim client side mission and monitors
@@ -16,13 +17,17 @@ class AirSimApplication:
         self.circular_mission_names = {"FlyInCircle"}
         self.polygon_mission_names = {"FlyToPoints", "FlyToPointsGeo"}
         self.point_mission_names = {"FlyStraight"}
-        self.client = airsim.MultirotorClient()
+        self.client = airsim.get_client_pool().get_client()  # shares a bounded set of simulator connections
         # self.client.confirmConnection()
+        # parsed once per configuration and shared by all missions and monitors, treat as read-only
         self.setting_file = self.load_airsim_setting()
         self.drone_number = len(self.setting_file['Vehicles'])  # only support name format of Drone1, Drone2...
         self.wind_speed_text = self.get_wind_speed_text()
-        self.all_drone_names = list(self.load_airsim_setting()['Vehicles'].keys())
-        self.log_text = ""
+        self.all_drone_names = get_config_cache().get_drone_names()
+        self.event_log = EventLog(clock=get_simulation_time)  # stamped with simulated time in lockstep mode
+        # seconds between uploads of the report log while running, 0 uploads it only in save_report
+        self.log_flush_interval = float(os.getenv('LOG_FLUSH_INTERVAL', '0'))
+        self.last_log_flush = time.monotonic()
         self.snap_shots = []
         self.video_recordings = []
         self.log_subdir = os.path.join("Debug")  # Default, for debug
@@ -36,27 +41,52 @@ class AirSimApplication:
 
     @staticmethod
     def load_airsim_setting():
-        with open(os.path.join(os.path.expanduser('~'), "Documents", "AirSim") + os.sep + 'settings.json', 'r') as f:
-            setting_json = json.load(f)
-        return setting_json
+        return get_config_cache().get_settings()
 
     @staticmethod
     def load_cesium_setting():
-        with open(os.path.join(os.path.expanduser('~'), "Documents", "AirSim") + os.sep + 'cesium.json', 'r') as f:
-            cesium_json = json.load(f)
-        return cesium_json
+        return get_config_cache().get_cesium_setting()
 
     def set_log_dir(self, dir_name):
         self.log_subdir = dir_name
 
+    @property
+    def log_text(self):
+        return self.event_log.to_text()
+
     def append_info_to_log(self, new_log_string):
-        self.log_text += "INFO;" + self.get_current_time_string() + ";" + new_log_string + "\n"
+        self.event_log.info(new_log_string)
+        self.flush_log_if_due()
 
     def append_fail_to_log(self, new_log_string):
-        self.log_text += "FAIL;" + self.get_current_time_string() + ";" + new_log_string + "\n"
+        self.event_log.fail(new_log_string)
+        self.flush_log_if_due()
 
     def append_pass_to_log(self, new_log_string):
-        self.log_text += "PASS;" + self.get_current_time_string() + ";" + new_log_string + "\n"
+        self.event_log.passed(new_log_string)
+        self.flush_log_if_due()
+
+    def get_log_file_path(self):
+        """
+        Storage path of the report log, None if the application has no log file
+        """
+        return None
+
+    def flush_log(self):
+        """
+        Upload the lines logged since the last upload as the next "<log file>.partNNNN" object, a no-op if
+        nothing was logged. Report listings only read .txt files, save_report still uploads the whole log
+        """
+        file_name = self.get_log_file_path()
+        self.last_log_flush = time.monotonic()
+        if file_name is None:
+            return False
+        return self.event_log.flush(
+            lambda text, part: self.save_report_to_storage(f"{file_name}.part{part:04d}", text))
+
+    def flush_log_if_due(self):
+        if self.log_flush_interval > 0 and time.monotonic() - self.last_log_flush >= self.log_flush_interval:
+            self.flush_log()
 
     @abstractmethod
     def save_report(self):
@@ -80,26 +110,7 @@ class AirSimApplication:
         return time.strftime("%H:%M:%S", time.localtime())
 
     def get_wind_speed_text(self):
-        settings = self.load_airsim_setting()
-        if "Wind" in settings:
-            wind = settings["Wind"]
-            wind_vector = [round(wind["X"], 2), round(wind["Y"], 2), round(wind["Z"], 2)]
-            # given wind_vector is in NED coordinate, return the direction and speed in ENU coordinate
-            magnitude = math.sqrt(wind_vector[0] ** 2 + wind_vector[1] ** 2 + wind_vector[2] ** 2)
-            if magnitude == 0:
-                unit_vector = [0, 0, 0]
-            else:
-                unit_vector = [wind_vector[0] / magnitude, wind_vector[1] / magnitude, wind_vector[2] / magnitude]
-            # calculate angle in degrees between wind and x-axis
-            if magnitude == 0:
-                return "No wind"
-            degree = math.degrees(math.atan2(unit_vector[1], unit_vector[0]))
-            if degree < 0:
-                degree += 360
-
-            return f"{round(degree, 1)} degrees clock wise from north, speed {round(magnitude, 2)} m/s"
-        else:
-            return "No wind"
+        return get_config_cache().get_wind_speed_text()
 
     def set_wind_speed(self, x, y, z):
         """
@@ -109,9 +120,5 @@ class AirSimApplication:
         self.client.simSetWind(airsim.Vector3r(x_val=x, y_val=y, z_val=z))
 
     def get_cesium_origin(self):
-        # read cesium origin from file located at Documents/AirSim/cesium.json
-        data = self.load_cesium_setting()
-        lat = data["latitude"]
-        lon = data["longitude"]
-        height = data["height"]
-        return [lat, lon, height]
\ No newline at end of file
+        # cesium origin from Documents/AirSim/cesium.json
+        return get_config_cache().get_cesium_origin()
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import traceback
+
+from PythonClient import airsim
+
+_active_clock = None
+
+
+class LockstepClock:
+    """
+    Drives the simulation in fixed steps instead of letting it run in real time
+
+    The simulator stays paused, every step the clock samples all subscribed drones once through the
+    MonitorDataDistributor, waits until each monitor due for the step took its snapshot, then advances the
+    simulation by exactly one step. Batches run as fast as the simulator can step and monitor results don't
+    depend on host load.
+    """
+
+    def __init__(self, data_distributor, step=0.05, consume_timeout=1.0):
+        """
+        :param data_distributor: MonitorDataDistributor created with lockstep=True
+        :param step: simulated seconds per step
+        :param consume_timeout: wall clock seconds to wait for slow monitors before stepping anyway
+        """
+        if not data_distributor.lockstep:
+            raise ValueError("LockstepClock needs a MonitorDataDistributor in lockstep mode")
+        self.data_distributor = data_distributor
+        self.step = step
+        self.consume_timeout = consume_timeout
+        self.client = airsim.get_client_pool().get_client()
+        self.steps = 0
+        self.late_steps = 0
+        self.start_time = time.time()
+        self.alive = False
+        self.condition = threading.Condition()  # notified after every step
+        self.thread = threading.Thread(target=self.run, daemon=True, name="LockstepClock")
+
+    @staticmethod
+    def from_env(data_distributor):
+        """
+        :return: LockstepClock configured by SIM_LOCKSTEP_STEP and SIM_LOCKSTEP_CONSUME_TIMEOUT
+        """
+        return LockstepClock(data_distributor,
+                             step=float(os.getenv('SIM_LOCKSTEP_STEP', '0.05')),
+                             consume_timeout=float(os.getenv('SIM_LOCKSTEP_CONSUME_TIMEOUT', '1.0')))
+
+    def now(self):
+        """
+        :return: simulated time as epoch seconds, the start time of the clock plus the simulated seconds since
+        """
+        return self.start_time + self.steps * self.step
+
+    def start(self):
+        global _active_clock
+        self.client.simPause(True)
+        self.start_time = time.time()
+        self.alive = True
+        _active_clock = self
+        self.thread.start()
+
+    def run(self):
+        try:
+            while self.alive:
+                samplers = self.data_distributor.sample_step(self.now())
+                if not self.data_distributor.wait_until_consumed(samplers, self.consume_timeout):
+                    self.late_steps += 1
+                self.client.simContinueForTime(self.step)
+                # simContinueForTime may return before the step is done, the simulator pauses itself after it.
+                # Poll with a growing delay so a slow step doesn't flood the shared pool with simIsPause calls
+                delay = 0.001
+                while self.alive and not self.client.simIsPause():
+                    time.sleep(delay)
+                    delay = min(delay * 2, max(self.step / 4, 0.001))
+                with self.condition:
+                    self.steps += 1
+                    self.condition.notify_all()
+        except Exception as e:
+            print("Lockstep clock stopped stepping the simulation:", e)
+            traceback.print_exc()
+
+    def wait_until(self, simulation_time):
+        """
+        Block until the simulated time reached simulation_time or the clock stopped
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: not self.alive or self.now() >= simulation_time)
+
+    def stop(self):
+        global _active_clock
+        with self.condition:
+            self.alive = False
+            self.condition.notify_all()
+        if self.thread.is_alive():
+            self.thread.join(timeout=5)
+        if _active_clock is self:
+            _active_clock = None
+        self.client.simPause(False)
+        if self.late_steps:
+            print(f"Lockstep clock: {self.late_steps} of {self.steps} steps did not wait for every monitor")
+
+
+def is_lockstep_enabled():
+    return os.getenv('SIM_LOCKSTEP', 'false').strip().lower() == 'true'
+
+
+def get_simulation_time():
+    """
+    :return: epoch seconds, simulated while a LockstepClock runs, host time otherwise
+    """
+    clock = _active_clock
+    return clock.now() if clock is not None else time.time()
+
+
+def sleep_simulated(seconds):
+    """
+    Sleep for simulated seconds while a LockstepClock runs, for host seconds otherwise
+    """
+    clock = _active_clock
+    if clock is None:
+        time.sleep(seconds)
+    else:
+        clock.wait_until(clock.now() + seconds)
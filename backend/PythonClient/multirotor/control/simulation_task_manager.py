@@ -14,7 +14,14 @@ from msgpackrpc.error import TransportError
 from numpy import random
 
 from PythonClient import airsim
+from PythonClient.multirotor.control.lockstep_clock import LockstepClock, is_lockstep_enabled
+from PythonClient.multirotor.control.swarm_mission_executor import SwarmMissionExecutor
+from PythonClient.multirotor.mission.abstract.abstract_mission import GenericMission
+from PythonClient.multirotor.monitor.monitor_data_distributor import MonitorDataDistributor
+from PythonClient.multirotor.monitor.no_fly_zone_monitor import NoFlyZoneMonitor
 from PythonClient.multirotor.socket.stream_manager import StreamManager
+from PythonClient.multirotor.storage.storage_config import get_storage_service
+from PythonClient.multirotor.util.config.airsim_config_cache import get_config_cache
 from PythonClient.multirotor.util.geo.geo_util import GeoUtil
 
 BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
@@ -48,7 +55,7 @@ class SimulationTaskManager:
         self.state = True
         self.__monitor_list = []  # list of tuples
         # [('collision_monitor', []), ('ordered_waypoint_monitor', [10]), ('point_deviation_monitor', [])]
-        self.__global_monitor_names = {"min_sep_dist_monitor"}
+        self.__global_monitor_names = {"min_sep_dist_monitor", "conflict_prediction_monitor"}
 
         self.__drone_mission_pair_list = []  # list of tuples
         # [('fly_to_points', 'Drone1', [[[1, 2, -1], [1, 2, -3]], 3])]
@@ -340,6 +347,7 @@ class SimulationTaskManager:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         with open(output_path, "w") as f:
             json.dump(new_setting_dot_json, f, indent=4)
+        get_config_cache().bump_generation()
 
         print(f"[OK] settings.json written to {output_path}")
 
@@ -348,6 +356,7 @@ class SimulationTaskManager:
         with open(os.path.join(os.path.expanduser('~'), "Documents", "AirSim") + os.sep + 'cesium.json',
                   'w') as outfile:
             json.dump(cesium_setting, outfile, indent=4)
+        get_config_cache().bump_generation()
 
     def stop(self):
         self.state = False
@@ -375,9 +384,20 @@ class SimulationTaskManager:
         :param fuzzy_test_info: Dict of fuzzy test info, None otherwise
         :return: None
         """
-        airsim.MultirotorClient().reset()  # reset scene before each task
+        rpc_metrics = airsim.get_rpc_metrics()
+        rpc_metrics_baseline = rpc_metrics.snapshot() if rpc_metrics.enabled else None
+        if airsim.is_rpc_recording_enabled():
+            airsim.start_rpc_recording(os.path.join(self.__user_directory, "recordings",
+                                                    self.__report_subdir_string, "rpc_recording.msgpack.gz"))
+        airsim.get_client_pool().get_client().reset()  # reset scene before each task
+        GenericMission.reset_swarm_snapshot()  # missions of this batch share one lazily fetched swarm snapshot
+        NoFlyZoneMonitor.reset_geofence_indexes()  # the first monitor of each zone set indexes it for all drones
         mission_threads = []
+        mission_instances = []
         monitor_threads = []
+        lockstep = is_lockstep_enabled()
+        # one telemetry sampler per drone, shared by its monitors
+        data_distributor = MonitorDataDistributor(lockstep=lockstep)
         for drone_mission_pair in drone_mission_pair_list:
             if fuzzy_test_info:
                 thread_and_instance = self.__create_fuzzy_test_mission_thread(drone_mission_pair, fuzzy_test_info)
@@ -385,8 +405,9 @@ class SimulationTaskManager:
                 thread_and_instance = self.__create_mission_thread(drone_mission_pair)
             mission_threads.append(thread_and_instance[0])
             mission_instance = thread_and_instance[1]  # instance reference for monitors
+            mission_instances.append(mission_instance)
 
-            monitors_thread = self.__create_monitors_thread(monitor_list, mission_instance)
+            monitors_thread = self.__create_monitors_thread(monitor_list, mission_instance, data_distributor)
             monitor_threads.extend(monitors_thread)
 
             # TODO: defualt camera is 0, need to change to support multiple cameras
@@ -398,7 +419,13 @@ class SimulationTaskManager:
         # create global monitor threads
         global_monitor_start_threads, global_monitor_stop_threads = self.__create_global_monitor_threads(monitor_list)
 
-        print(len(mission_threads), "Missions and", len(monitor_threads), "monitors")
+        if os.getenv('SWARM_EXECUTOR', 'false').strip().lower() == 'true':
+            # one scheduler thread flies every mission instead of one thread per mission
+            mission_threads = [threading.Thread(target=SwarmMissionExecutor(mission_instances).run)]
+        print(len(mission_instances), "Missions and", len(monitor_threads), "monitors")
+        lockstep_clock = LockstepClock.from_env(data_distributor) if lockstep else None
+        if lockstep_clock is not None:
+            lockstep_clock.start()
         for mission in mission_threads:
             mission.start()
         for monitor in monitor_threads:
@@ -409,14 +436,48 @@ class SimulationTaskManager:
             mission.join()
         for monitor in monitor_threads:
             monitor.join()
+        if lockstep_clock is not None:
+            lockstep_clock.stop()
+        data_distributor.stop()
         for global_monitor in global_monitor_stop_threads:
             global_monitor.start()
         for global_monitor in global_monitor_start_threads:
             global_monitor.join()
+        if rpc_metrics_baseline is not None:
+            self.__save_rpc_metrics(rpc_metrics.summary(rpc_metrics_baseline))
+        self.__save_rpc_recording(airsim.stop_rpc_recording())
         print("All processes finished, server return to idle state")
         mission_threads.clear()
+        mission_instances.clear()
         monitor_threads.clear()
 
+    def __save_rpc_metrics(self, summary):
+        """
+        Store the RPC metrics of one batch next to its reports
+        :param summary: RpcMetrics.summary() of the calls made during the batch
+        :return: None
+        """
+        try:
+            get_storage_service().upload_to_service(f"{self.__report_subdir_string}/RpcMetrics/rpc_metrics.json",
+                                                    json.dumps(summary, indent=4), "application/json")
+        except Exception as e:
+            print("Failed to save RPC metrics", e)
+
+    def __save_rpc_recording(self, recorder):
+        """
+        Store the RPC recording of one batch next to its reports, it can be replayed with AIRSIM_RPC_REPLAY
+        :param recorder: closed RpcRecorder of the batch, None if recording is off
+        :return: None
+        """
+        if recorder is None:
+            return
+        try:
+            with open(recorder.path, "rb") as f:
+                get_storage_service().upload_to_service(f"{self.__report_subdir_string}/RpcRecording/rpc_recording.msgpack.gz",
+                                                        f.read(), "application/gzip")
+        except Exception as e:
+            print("Failed to save RPC recording", e)
+
     def __create_mission_thread(self, drone_mission_pair):
         """
         Create one mission thread and return the thread and mission instance
@@ -436,11 +497,12 @@ class SimulationTaskManager:
             print(mission_file_name, "mission failed to instantiate", e)
             raise e
 
-    def __create_monitors_thread(self, monitor_list, mission_instance):
+    def __create_monitors_thread(self, monitor_list, mission_instance, data_distributor=None):
         """
         Create monitor threads and return the threads
         :param monitor_list: List of all single drone monitors with params
         :param mission_instance: instance of mission
+        :param data_distributor: MonitorDataDistributor shared by all monitors of the batch, None to poll directly
         :return: list of monitor threads
         """
         monitor_threads = []
@@ -454,6 +516,8 @@ class SimulationTaskManager:
                 try:
                     monitor_instance = monitor_class(*params)
                     monitor_instance.set_log_dir(self.__report_subdir_string)
+                    if data_distributor is not None:
+                        monitor_instance.set_data_distributor(data_distributor)
                     monitor_threads.append(threading.Thread(target=monitor_instance.start))
                 except Exception as e:
                     print(monitor_name, "cannot be instantiated", e)
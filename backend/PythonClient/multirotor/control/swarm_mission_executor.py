@@ -0,0 +1,90 @@
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+
+class SwarmMissionExecutor:
+    """
+    Flies every mission of a batch from one scheduler thread
+
+    Each mission's plan() generator issues its async commands and yields their futures, the executor resumes
+    a mission once its future finished or its pause elapsed, so all drones wait on their commands together
+    instead of blocking one thread each in join(). Missions without a plan() fall back to their own thread.
+    """
+
+    def __init__(self, missions):
+        """
+        :param missions: GenericMission instances of the batch
+        """
+        self.missions = list(missions)
+        self.fallback_threads = []
+        self.__futures = {}  # concurrent future -> (mission, plan)
+        self.__timers = []  # heap of (monotonic due time, tie breaker, mission, plan)
+        self.__counter = itertools.count()
+
+    def run(self):
+        """
+        Execute all missions, returns once every mission finished
+        """
+        for mission in self.missions:
+            plan = mission.plan()
+            if plan is None:
+                thread = threading.Thread(target=mission.start)
+                thread.start()
+                self.fallback_threads.append(thread)
+            else:
+                self.__advance(mission, plan)
+
+        while self.__futures or self.__timers:
+            timeout = None
+            if self.__timers:
+                timeout = max(0.0, self.__timers[0][0] - time.monotonic())
+            if self.__futures:
+                done, _ = concurrent.futures.wait(list(self.__futures), timeout=timeout,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+                done = ()
+            for future in done:
+                mission, plan = self.__futures.pop(future)
+                self.__advance(mission, plan)
+            now = time.monotonic()
+            while self.__timers and self.__timers[0][0] <= now:
+                _, _, mission, plan = heapq.heappop(self.__timers)
+                self.__advance(mission, plan)
+
+        for thread in self.fallback_threads:
+            thread.join()
+
+    def __advance(self, mission, plan):
+        try:
+            step = next(plan)
+        except StopIteration:
+            return
+        except Exception as e:
+            self.__fail(mission, e)
+            return
+        if isinstance(step, (int, float)):
+            heapq.heappush(self.__timers, (time.monotonic() + step, next(self.__counter), mission, plan))
+        elif hasattr(step, 'as_concurrent_future'):
+            self.__futures[step.as_concurrent_future()] = (mission, plan)
+        else:
+            # a plain msgpackrpc future only resolves while a thread runs its client's loop in join(),
+            # waiting on it here would take back the thread per mission this executor removes
+            plan.close()
+            self.__fail(mission, TypeError(
+                f"SWARM_EXECUTOR needs pooled clients, plan() yielded a {type(step).__name__} "
+                f"without as_concurrent_future()"))
+
+    @staticmethod
+    def __fail(mission, error):
+        print(mission.__class__.__name__, mission.target_drone, "mission failed:", error)
+        if error.__traceback__ is not None:
+            traceback.print_exception(type(error), error, error.__traceback__)
+        mission.state = mission.State.END
+        # keep the log of the failed drone, like a mission thread ending in stop()
+        mission.append_fail_to_log(f"{mission.target_drone};Mission failed, {type(error).__name__}: {error}")
+        mission.save_report()
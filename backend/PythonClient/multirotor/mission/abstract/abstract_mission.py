@@ -1,12 +1,51 @@
 import datetime
 import os
 import threading
+import time
 from enum import Enum
+
+from PythonClient import airsim
 from PythonClient.multirotor.airsim_application import AirSimApplication
 
 lock = threading.Lock()
 
 
+class SwarmSnapshot:
+    """
+    Poses and states of every drone of a batch, fetched once on first use and shared by all its missions
+    """
+
+    def __init__(self, drone_names):
+        self.drone_names = list(drone_names)
+        self.__objects = None
+        self.__states = None
+        self.__lock = threading.Lock()
+
+    def __fetch(self, client):
+        with self.__lock:
+            if self.__objects is None:
+                # one pipelined round trip for the whole swarm
+                count = len(self.drone_names)
+                results = client.callBatch([('simGetObjectPose', (name,)) for name in self.drone_names] +
+                                           [('getMultirotorState', (name,)) for name in self.drone_names])
+                self.__objects = [airsim.Pose.from_msgpack(pose) for pose in results[:count]]
+                self.__states = [airsim.MultirotorState.from_msgpack(state) for state in results[count:]]
+
+    def get_objects(self, client):
+        """
+        :return: list of world frame Pose, in the order of drone_names
+        """
+        self.__fetch(client)
+        return self.__objects
+
+    def get_states(self, client):
+        """
+        :return: list of MultirotorState, in the order of drone_names
+        """
+        self.__fetch(client)
+        return self.__states
+
+
 class GenericMission(AirSimApplication):
     class State(Enum):
         IDLE = 0
@@ -15,29 +54,130 @@ class GenericMission(AirSimApplication):
 
     def __init__(self, target_drone="Default"):
         self.flight_time_in_seconds = None
+        self.__state = self.State.IDLE
+        self.__state_condition = threading.Condition()
+        self.__state_listeners = []
         super().__init__()
         self.target_drone = target_drone
         self.state = self.State.IDLE
         self.report_dir = os.path.join(os.path.expanduser('~'), "Documents",
                                        "AirSim") + os.sep + datetime.datetime.now().strftime("%Y_%m_%d_%H:%M:%S")
-        self.objects = [self.client.simGetObjectPose(i) for i in self.all_drone_names]
-        self.states = [self.client.getMultirotorState(i) for i in self.all_drone_names]
         self.client.enableApiControl(True, vehicle_name=target_drone)
 
+    swarm_snapshot = None  # shared by every mission of the batch, see reset_swarm_snapshot()
+
+    @classmethod
+    def reset_swarm_snapshot(cls, drone_names=None):
+        """
+        Start a new batch: the next mission reading objects or states fetches a fresh swarm snapshot
+        :param drone_names: drones of the batch, all drones of settings.json if None
+        """
+        cls.swarm_snapshot = SwarmSnapshot(drone_names) if drone_names is not None else None
+
+    def __get_swarm_snapshot(self):
+        snapshot = GenericMission.swarm_snapshot
+        if snapshot is None or snapshot.drone_names != self.all_drone_names:
+            with lock:
+                snapshot = GenericMission.swarm_snapshot
+                if snapshot is None or snapshot.drone_names != self.all_drone_names:
+                    snapshot = GenericMission.swarm_snapshot = SwarmSnapshot(self.all_drone_names)
+        return snapshot
+
+    @property
+    def objects(self):
+        """
+        World frame poses of all drones at the first access in the batch
+        """
+        return self.__get_swarm_snapshot().get_objects(self.client)
+
+    @property
+    def states(self):
+        """
+        Multirotor states of all drones at the first access in the batch
+        """
+        return self.__get_swarm_snapshot().get_states(self.client)
+
+    @property
+    def state(self):
+        return self.__state
+
+    @state.setter
+    def state(self, state):
+        if not isinstance(state, self.State):
+            raise ValueError(f"Mission state must be a GenericMission.State, got {state!r}")
+        with self.__state_condition:
+            if state == self.__state:
+                return
+            self.__state = state
+            self.__state_condition.notify_all()
+            listeners = list(self.__state_listeners)
+        for callback in listeners:
+            callback(self, state)
+
+    def add_state_listener(self, callback):
+        """
+        :param callback: called with (mission, new state) on the thread that changed the state
+        """
+        with self.__state_condition:
+            self.__state_listeners.append(callback)
+
+    def wait_for_state(self, predicate, timeout=None):
+        """
+        Block until predicate(state) holds without spinning
+        :param timeout: seconds to wait at most, None to wait forever
+        :return: True if the predicate holds, False on timeout
+        """
+        with self.__state_condition:
+            return self.__state_condition.wait_for(lambda: predicate(self.__state), timeout)
+
+    def wait_until_started(self, timeout=None):
+        """
+        Block until the mission left IDLE
+        :return: False on timeout
+        """
+        return self.wait_for_state(lambda state: state != self.State.IDLE, timeout)
+
+    def wait_until_ended(self, timeout=None):
+        """
+        Block until the mission reached END, also usable as an interruptible sleep between two samples
+        :return: False on timeout
+        """
+        return self.wait_for_state(lambda state: state == self.State.END, timeout)
+
     def takeoff(self, drone_name):
         self.client.takeoffAsync(vehicle_name=drone_name).join()
 
     def async_fly_to_position(self, drone_name, point, speed):
         self.client.moveToPositionAsync(point[0], point[1], point[2], speed, vehicle_name=drone_name).join()
 
+    def get_log_file_path(self):
+        file_name = self.__class__.__name__ + "_" + self.target_drone + "_log.txt"
+        return f"{self.log_subdir}/{self.__class__.__name__}/{file_name}"
+
+    def plan(self):
+        """
+        Generator form of start() used by SwarmMissionExecutor to fly many missions from one thread.
+        The generator runs the mission and yields the future of every async command it must wait for,
+        or a number of seconds to pause
+        :return: the generator, None if the mission can only run in its own thread with start()
+        """
+        return None
+
+    @staticmethod
+    def run_plan(plan):
+        """
+        Execute the steps of plan() on the calling thread
+        """
+        for step in plan:
+            if isinstance(step, (int, float)):
+                time.sleep(step)
+            else:
+                step.join()
+
     def save_report(self):
         with lock:
-            # Directly create the file name for GCS
-            file_name = self.__class__.__name__ + "_" + self.target_drone + "_log.txt"
-            gcs_path = f"{self.log_subdir}/{self.__class__.__name__}/{file_name}"
-
             # Upload directly to GCS (log_text is uploaded as file content)
-            self.save_report_to_storage(gcs_path, self.log_text)
+            self.save_report_to_storage(self.get_log_file_path(), self.log_text)
 
     def kill_mission(self):
         self.state = self.State.END
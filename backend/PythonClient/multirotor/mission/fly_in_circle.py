@@ -1,6 +1,11 @@
 import PythonClient.airsim as airsim
 import math
+import os
+import threading
 import time
+
+import numpy as np
+
 from PythonClient.multirotor.mission.abstract.abstract_mission import GenericMission
 
 
@@ -9,7 +14,8 @@ class FlyInCircle(GenericMission):
     Fly in a circle in the diameter of the radius parameter.
     """
 
-    def __init__(self, target_drone="Default", radius=15, altitude=30, speed=6, iterations=1, center=(1, 0)):
+    def __init__(self, target_drone="Default", radius=15, altitude=30, speed=6, iterations=1, center=(1, 0),
+                 precomputed_path=None, path_spacing=1.0):
         """
         Default constructor.
         :param target_drone: "Default"
@@ -18,6 +24,9 @@ class FlyInCircle(GenericMission):
         :param speed: 2 speed of the drone
         :param iterations: 1 number of times to repeat the circle
         :param center: (1,0) center of the circle relative to the drone
+        :param precomputed_path: fly all orbits as one moveOnPath along the planned trajectory instead of steering
+            with a velocity command every 0.1 s, None reads env FLY_IN_CIRCLE_PRECOMPUTED_PATH
+        :param path_spacing: 1.0 distance in meters between two points of the precomputed path
         """
         super().__init__(target_drone)
         self.climbed = False
@@ -38,6 +47,12 @@ class FlyInCircle(GenericMission):
         self.z = None
         self.snapshot_index = 0
         self.takeoff = False  # whether we did a take-off
+        if precomputed_path is None:
+            precomputed_path = os.getenv('FLY_IN_CIRCLE_PRECOMPUTED_PATH', 'false').strip().lower() == 'true'
+        self.precomputed_path = precomputed_path
+        self.path_spacing = path_spacing
+        self.progress_poll_interval = 0.25
+        self.planned_trajectory = None
 
         if self.snapshots is not None and self.snapshots > 0:
             self.snapshot_delta = 360 / self.snapshots
@@ -60,11 +75,48 @@ class FlyInCircle(GenericMission):
         self.center = self.original_position
         self.center.x_val += circle_center_x
         self.center.y_val += circle_center_y
+        # the drone starts on the circle, opposite of the center direction
+        self.start_angle_rad = math.atan2(-circle_center_y, -circle_center_x)
 
-    def start(self):
-        self.state = "running"
+    def get_planned_trajectory(self):
+        """
+        Analytic plan of all orbits, sampled every path_spacing meters and computed once
+        :return: (N, 4) array of rows [time in s since the orbits started, x, y, z] in NED
+        """
+        if self.planned_trajectory is None:
+            samples_per_orbit = max(8, int(math.ceil(2 * math.pi * self.radius / self.path_spacing)))
+            angle = np.linspace(0, 2 * math.pi * self.iterations, samples_per_orbit * self.iterations + 1)
+            trajectory = np.empty((angle.size, 4))
+            trajectory[:, 0] = angle * self.radius / self.speed
+            trajectory[:, 1] = self.center.x_val + self.radius * np.cos(self.start_angle_rad + angle)
+            trajectory[:, 2] = self.center.y_val + self.radius * np.sin(self.start_angle_rad + angle)
+            trajectory[:, 3] = -self.altitude
+            self.planned_trajectory = trajectory
+        return self.planned_trajectory
+
+    def get_planned_position(self, elapsed):
+        """
+        :param elapsed: seconds since the orbits started
+        :return: [x, y, z] the drone should be at, the end of the last orbit once finished
+        """
+        angle = min(elapsed * self.speed / self.radius, 2 * math.pi * self.iterations)
+        return [self.center.x_val + self.radius * math.cos(self.start_angle_rad + angle),
+                self.center.y_val + self.radius * math.sin(self.start_angle_rad + angle),
+                -self.altitude]
+
+    def plan(self):
+        # only the precomputed trajectory is made of async commands, the steering loop needs its own thread
+        return self.__planned_mission_steps() if self.precomputed_path else None
+
+    def __planned_mission_steps(self):
+        self.state = self.State.RUNNING
         start_time = time.localtime()
-        # self.client.takeoffAsync().join()
+        yield from self.climb_steps()
+        self.append_info_to_log(self.target_drone + ";flying planned trajectory...")
+        yield from self.planned_trajectory_steps()
+        self.finish(start_time)
+
+    def climb_steps(self):
         start = self.client.getMultirotorState(vehicle_name=self.target_drone).kinematics_estimated.position
         z = -self.altitude
 
@@ -72,10 +124,43 @@ class FlyInCircle(GenericMission):
             self.target_drone + ";climbing to position: {},{},{}".format(round(start.x_val, 2), round(start.y_val, 2),
                                                                          round(z, 2)))
         self.original_position = self.client.getMultirotorState(vehicle_name=self.target_drone).kinematics_estimated.position
-        self.client.moveToPositionAsync(start.x_val, start.y_val, z, self.speed, vehicle_name=self.target_drone).join()
+        yield self.client.moveToPositionAsync(start.x_val, start.y_val, z, self.speed, vehicle_name=self.target_drone)
         self.climbed = True
         self.z = z
 
+    def planned_trajectory_steps(self):
+        """
+        Fly every orbit with a single path command, orbits are counted from polled positions
+        """
+        trajectory = self.get_planned_trajectory()
+        path = [airsim.Vector3r(x, y, z) for x, y, z in trajectory[1:, 1:]]
+        finished = threading.Event()
+        future = self.client.moveOnPathAsync(path, self.speed, lookahead=self.speed, adaptive_lookahead=0,
+                                             vehicle_name=self.target_drone)
+        future.attach_callback(lambda _: finished.set())
+        count = 0
+        while count < self.iterations and not finished.is_set():
+            yield self.progress_poll_interval
+            pos = self.client.simGetVehiclePose(vehicle_name=self.target_drone).position
+            angle_to_center = math.atan2(pos.y_val - self.center.y_val, pos.x_val - self.center.x_val)
+            if self.track_orbits(angle_to_center * 180 / math.pi):
+                count += 1
+                self.append_info_to_log(self.target_drone + ";completed {} orbits".format(count))
+        yield future
+        for orbit in range(count + 1, self.iterations + 1):
+            # the path ended before the last crossings were polled
+            self.append_info_to_log(self.target_drone + ";completed {} orbits".format(orbit))
+
+    def start(self):
+        if self.precomputed_path:
+            self.run_plan(self.plan())
+            return
+        self.state = self.State.RUNNING
+        start_time = time.localtime()
+        # self.client.takeoffAsync().join()
+        self.run_plan(self.climb_steps())
+        z = self.z
+
         self.append_info_to_log(self.target_drone + ";ramping up to speed...")
         count = 0
         # self.next_snapshot = None
@@ -126,6 +211,9 @@ class FlyInCircle(GenericMission):
 
         # self.client.moveToPositionAsync(start.x_val, start.y_val, z, 2).join()
 
+        self.finish(start_time)
+
+    def finish(self, start_time):
         self.state = self.State.END
         end_time = time.localtime()
         # get total flight time in seconds
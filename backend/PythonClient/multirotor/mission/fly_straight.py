@@ -1,6 +1,5 @@
 import threading
 import time
-from time import sleep
 
 from PythonClient.multirotor.mission.abstract.abstract_mission import GenericMission
 
@@ -19,20 +18,27 @@ class FlyStraight(GenericMission):
         self.speed = speed
 
     def start(self):
+        self.run_plan(self.plan())
+
+    def plan(self):
+        return self.__mission_steps()
+
+    def __mission_steps(self):
         # get current local time
         start_time = time.localtime()
 
-        self.state = "running"
+        self.state = self.State.RUNNING
         self.client.armDisarm(True, self.target_drone)
         self.append_info_to_log(self.target_drone + ";taking off")
         # self.takeoff(self.target_drone)
         self.append_info_to_log(self.target_drone + ";heading: " + str(self.point))
-        self.async_fly_to_position(self.target_drone, self.point, self.speed)
+        yield self.client.moveToPositionAsync(self.point[0], self.point[1], self.point[2], self.speed,
+                                              vehicle_name=self.target_drone)
         end_time = time.localtime()
         # get total flight time in seconds
         self.flight_time_in_seconds = round(time.mktime(end_time) - time.mktime(start_time), 2)
         self.append_info_to_log(self.target_drone + ";task over")
-        sleep(self.wait_time)
+        yield self.wait_time
         self.state = self.State.END
         self.save_report()
 
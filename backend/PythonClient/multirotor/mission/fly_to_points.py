@@ -1,10 +1,25 @@
+import math
+import os
 import threading
 
+from PythonClient import airsim
 from PythonClient.multirotor.mission.abstract.abstract_mission import GenericMission
 
 
 class FlyToPoints(GenericMission):
-    def __init__(self, target_drone="Default", speed=4, points=None):
+    def __init__(self, target_drone="Default", speed=4, points=None, continuous_path=None, lookahead=-1,
+                 adaptive_lookahead=1, velocity_profile=None, waypoint_radius=1.0):
+        """
+        :param target_drone: drone flying the mission
+        :param speed: speed in m/s
+        :param points: cartesian waypoints in NED
+        :param continuous_path: fly the waypoints as one moveOnPath instead of stopping at every vertex,
+            None reads env FLY_TO_POINTS_CONTINUOUS_PATH
+        :param lookahead: moveOnPath lookahead distance in meters, -1 lets the simulator choose
+        :param adaptive_lookahead: moveOnPath adaptive lookahead factor
+        :param velocity_profile: speed in m/s towards every waypoint in continuous path mode, speed if None
+        :param waypoint_radius: distance in meters a waypoint counts as reached in continuous path mode
+        """
         super().__init__(target_drone)
         self.report_dir += 'FlyToPoints'
         if points is None:
@@ -21,20 +36,121 @@ class FlyToPoints(GenericMission):
 
         self.target_drone = target_drone
         self.speed = speed
+        if continuous_path is None:
+            continuous_path = os.getenv('FLY_TO_POINTS_CONTINUOUS_PATH', 'false').strip().lower() == 'true'
+        self.continuous_path = continuous_path
+        self.lookahead = lookahead
+        self.adaptive_lookahead = adaptive_lookahead
+        self.velocity_profile = velocity_profile
+        self.waypoint_radius = waypoint_radius
+        self.progress_poll_interval = 0.1
+        self.reached_waypoints = 0
+        self.waypoint_listeners = []
+
+    def add_waypoint_listener(self, callback):
+        """
+        :param callback: called with (drone name, waypoint index, waypoint) every time a waypoint is reached
+        """
+        self.waypoint_listeners.append(callback)
 
     def start(self):
+        self.run_plan(self.plan())
+
+    def plan(self):
+        return self.__mission_steps()
+
+    def __mission_steps(self):
         self.state = self.State.RUNNING
-        self.fly(self.points)
+        yield from self.fly_steps(self.points)
         self.append_info_to_log(self.target_drone + ";task over")
         self.stop()
 
     def fly(self, cartesian_points):
+        self.run_plan(self.fly_steps(cartesian_points))
+
+    def fly_steps(self, cartesian_points):
         self.client.armDisarm(True, self.target_drone)
         self.append_info_to_log(self.target_drone + ";taking off")
         # self.takeoff(self.target_drone)
-        for p in cartesian_points:
+        if self.continuous_path:
+            yield from self.fly_path_steps(cartesian_points)
+            return
+        for index, p in enumerate(cartesian_points):
             self.append_info_to_log(self.target_drone + ";heading: " + str(p))
-            self.async_fly_to_position(self.target_drone, p, self.speed)
+            yield self.client.moveToPositionAsync(p[0], p[1], p[2], self.speed, vehicle_name=self.target_drone)
+            self.on_waypoint_reached(index, p)
+
+    def fly_path_steps(self, cartesian_points):
+        """
+        Fly through all points without stopping at the vertices, one moveOnPath per run of equal speeds
+        """
+        if not cartesian_points:
+            return
+        speeds = self.velocity_profile if self.velocity_profile is not None else [self.speed] * len(cartesian_points)
+        if len(speeds) != len(cartesian_points):
+            raise ValueError(f"velocity_profile has {len(speeds)} speeds for {len(cartesian_points)} points")
+        # corners are cut by up to the lookahead distance, count them as reached within that distance
+        radius = max(self.waypoint_radius, self.lookahead)
+        self.append_info_to_log(self.target_drone + ";heading: " + str(cartesian_points[0]))
+        start = 0
+        while start < len(cartesian_points) and self.state != self.State.END:
+            end = start + 1
+            while end < len(cartesian_points) and speeds[end] == speeds[start]:
+                end += 1
+            yield from self.__fly_path_segment(cartesian_points, start, end, speeds[start], radius)
+            start = end
+
+    def __fly_path_segment(self, points, start, end, speed, radius):
+        finished = threading.Event()
+        path = [airsim.Vector3r(p[0], p[1], p[2]) for p in points[start:end]]
+        future = self.client.moveOnPathAsync(path, speed, lookahead=self.lookahead,
+                                             adaptive_lookahead=self.adaptive_lookahead,
+                                             vehicle_name=self.target_drone)
+        future.attach_callback(lambda _: finished.set())
+        leg_start = self.__get_position()
+        index = start
+        while index < end and not finished.is_set() and self.state != self.State.END:
+            yield self.progress_poll_interval
+            position = self.__get_position()
+            while index < end and self.__passed_waypoint(position, leg_start, points[index], radius):
+                leg_start = points[index]
+                self.__reach_path_waypoint(points, index)
+                index += 1
+        # wait for the path itself: the next segment's moveOnPath would preempt it, and stop() would end the
+        # mission and its monitors while the drone still flies to the last vertex
+        yield future
+        if self.state != self.State.END:
+            # the path is done, so are the waypoints the drone skimmed past between two polls
+            for remaining in range(index, end):
+                self.__reach_path_waypoint(points, remaining)
+
+    def __reach_path_waypoint(self, points, index):
+        self.append_info_to_log(self.target_drone + ";reached waypoint " + str(index) + ": " + str(points[index]))
+        self.on_waypoint_reached(index, points[index])
+        if index + 1 < len(points):
+            self.append_info_to_log(self.target_drone + ";heading: " + str(points[index + 1]))
+
+    def __get_position(self):
+        position = self.client.simGetVehiclePose(vehicle_name=self.target_drone).position
+        return [position.x_val, position.y_val, position.z_val]
+
+    @staticmethod
+    def __passed_waypoint(position, leg_start, waypoint, radius):
+        leg = [waypoint[i] - leg_start[i] for i in range(3)]
+        to_drone = [position[i] - leg_start[i] for i in range(3)]
+        if math.dist(position, waypoint) <= radius:
+            return True
+        leg_length_sq = sum(c * c for c in leg)
+        # projection of the drone onto the leg lies beyond the waypoint
+        return leg_length_sq > 0 and sum(leg[i] * to_drone[i] for i in range(3)) >= leg_length_sq
+
+    def on_waypoint_reached(self, index, point):
+        """
+        Progress event of both modes, notifies the waypoint listeners
+        """
+        self.reached_waypoints = index + 1
+        for callback in self.waypoint_listeners:
+            callback(self.target_drone, index, point)
 
     def stop(self):
         self.state = self.State.END
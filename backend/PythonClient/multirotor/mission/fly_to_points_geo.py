@@ -7,8 +7,11 @@ class FlyToPointsGeo(FlyToPoints):
     Fly to points in geographic coordinates
     """
 
-    def __init__(self, target_drone="Default", speed=2, geo_points=None):
-        super().__init__()
+    def __init__(self, target_drone="Default", speed=2, geo_points=None, **path_options):
+        """
+        :param path_options: continuous path options of FlyToPoints
+        """
+        super().__init__(**path_options)
         self.target_drone = target_drone
         self.speed = speed
         self.cesium_origin = self.get_cesium_origin()
@@ -26,7 +29,7 @@ class FlyToPointsGeo(FlyToPoints):
         self.points = self.get_cartesian_points(self.geo_points)
 
     def start(self):
-        self.state = "running"
+        self.state = self.State.RUNNING
         self.fly(self.points)
         self.append_info_to_log("task over")
         self.stop()
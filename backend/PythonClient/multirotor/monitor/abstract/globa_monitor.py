@@ -26,13 +26,13 @@ class GlobalMonitor(AirSimApplication):
         #     await websocket.send(message)
         #     await asyncio.sleep(10)
 
+    def get_log_file_path(self):
+        file_name = "log.txt"
+        return f"{self.log_subdir}/GlobalMonitors/{self.__class__.__name__}/{file_name}"
+
     def save_report(self):
         with lock:
-            # Directly create the file name for GCS
-            file_name = "log.txt"
-            gcs_path = f"{self.log_subdir}/GlobalMonitors/{self.__class__.__name__}/{file_name}"
-
             # Upload directly to GCS (log_text is uploaded as file content)
-            self.save_report_to_storage(gcs_path, self.log_text)
+            self.save_report_to_storage(self.get_log_file_path(), self.log_text)
 
             # print("DEBUG:" + log_dir)
\ No newline at end of file
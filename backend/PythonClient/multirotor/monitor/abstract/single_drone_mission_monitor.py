@@ -1,7 +1,13 @@
 import math
 import os
 import threading
+import time
+
+import numpy as np
+
 from PythonClient.multirotor.airsim_application import AirSimApplication
+from PythonClient.multirotor.monitor.monitor_data_distributor import TelemetrySnapshot
+from PythonClient.multirotor.util.trajectory.trajectory_store import TrajectoryStore
 
 lock = threading.Lock()
 
@@ -13,7 +19,66 @@ class SingleDroneMissionMonitor(AirSimApplication):
         self.mission = mission
         self.time_sensitive = False
         self.target_drone = mission.target_drone
+        self.data_distributor = None
+        self.telemetry_subscription = None
+        self.last_direct_sample_time = None
+        self.trajectory = None
+
+    def set_data_distributor(self, data_distributor):
+        self.data_distributor = data_distributor
+
+    def next_telemetry(self, dt, fields=("state", "pose")):
+        """
+        Get the next telemetry snapshot of the target drone, at most one every dt seconds.
+        Uses the shared MonitorDataDistributor when the task manager attached one, polls the simulator otherwise
+        :param dt: seconds between two samples
+        :param fields: telemetry fields read by the monitor, see MonitorDataDistributor.SUPPORTED_FIELDS
+        :return: TelemetrySnapshot
+        """
+        if self.data_distributor is not None:
+            if self.telemetry_subscription is None:
+                self.telemetry_subscription = self.data_distributor.subscribe(self.target_drone, dt, fields)
+            snapshot = self.telemetry_subscription.next_snapshot()
+            if snapshot is not None:
+                return snapshot
+        elif self.last_direct_sample_time is not None:
+            delay = self.last_direct_sample_time + dt - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.last_direct_sample_time = time.monotonic()
+        data = self.client.getBatchSnapshot([self.target_drone], list(fields))[self.target_drone]
+        return TelemetrySnapshot(self.target_drone, 0, time.time(), fields=fields, **data)
+
+    def record_trajectory(self, snapshot):
+        """
+        Append a telemetry snapshot to the trajectory of the target drone, created on first use
+        """
+        if self.trajectory is None:
+            self.trajectory = TrajectoryStore(self.target_drone)
+        self.trajectory.append_snapshot(snapshot)
 
+    @property
+    def est_position_array(self):
+        """
+        (N, 3) estimated positions recorded with record_trajectory()
+        """
+        if self.trajectory is None:
+            return np.empty((0, 3), dtype=np.float32)
+        return self.trajectory.get_positions()
+
+    @property
+    def obj_position_array(self):
+        """
+        (N, 3) ground truth positions recorded with record_trajectory()
+        """
+        if self.trajectory is None:
+            return np.empty((0, 3), dtype=np.float32)
+        return self.trajectory.get_positions(ground_truth=True)
+
+    def release_telemetry(self):
+        if self.telemetry_subscription is not None:
+            self.telemetry_subscription.close()
+            self.telemetry_subscription = None
 
     def start_websocket(self):
         # alert_server = websockets.serve("localhost", 8765)
@@ -35,11 +100,12 @@ class SingleDroneMissionMonitor(AirSimApplication):
         return os.path.join(self.dir_path,
                             self.log_subdir) + os.sep + self.mission.__class__.__name__ + os.sep + self.__class__.__name__
 
+    def get_log_file_path(self):
+        file_name = self.mission.target_drone + "_log.txt"
+        return f"{self.log_subdir}/{self.mission.__class__.__name__}/{self.__class__.__name__}/{file_name}"
+
     def save_report(self):
+        self.release_telemetry()
         with lock:
-            # Directly create the file name for GCS
-            file_name = self.mission.target_drone + "_log.txt"
-            gcs_path = f"{self.log_subdir}/{self.mission.__class__.__name__}/{self.__class__.__name__}/{file_name}"
-
             # Upload directly to GCS (log_text is uploaded as file content)
-            self.save_report_to_storage(gcs_path, self.log_text)
\ No newline at end of file
+            self.save_report_to_storage(self.get_log_file_path(), self.log_text)
\ No newline at end of file
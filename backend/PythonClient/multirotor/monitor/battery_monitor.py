@@ -2,8 +2,9 @@ from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor impor
 
 
 class BatteryMonitor(SingleDroneMissionMonitor):
-    def __init__(self, mission, min_battery_percentage=15):
+    def __init__(self, mission, min_battery_percentage=15, dt=0.5):
         super().__init__(mission)
+        self.dt = dt
         self.min_battery_percentage = min_battery_percentage
         self.passed = True
         self.mission = mission
@@ -11,11 +12,14 @@ class BatteryMonitor(SingleDroneMissionMonitor):
 
     def start(self):
         self.append_info_to_log(f"{self.target_drone};speed {self.mission.speed} m/s with wind {self.wind_speed_text}")
-        while self.mission.state == self.mission.IDLE:
-            pass
-        while self.mission.state != self.mission.END:
-            charge = self.client.getTripStats().state_of_charge
-            if charge < self.min_battery_percentage:
+        self.mission.wait_until_started()
+        # check every dt seconds, the wait returns as soon as the mission ends
+        while not self.mission.wait_until_ended(self.dt):
+            charge = getattr(self.client.getTripStats(vehicle_name=self.target_drone), 'state_of_charge', None)
+            if charge is None:
+                self.append_info_to_log(f"{self.target_drone};Simulator does not report the battery state of charge")
+                break
+            if charge < self.min_battery_percentage and self.passed:
                 self.passed = False
                 self.append_fail_to_log(f"{self.target_drone};Battery is below {self.min_battery_percentage}%")
 
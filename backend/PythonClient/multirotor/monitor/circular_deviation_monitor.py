@@ -1,7 +1,5 @@
 # sUAS shall not deviate from their planned routes by more than [10%] of the total distance.
 import math
-from time import sleep
-import numpy as np
 
 from PythonClient.multirotor.util.geo.geo_util import GeoUtil
 from PythonClient.multirotor.util.graph.three_dimensional_grapher import ThreeDimensionalGrapher
@@ -16,8 +14,6 @@ class CircularDeviationMonitor(SingleDroneMissionMonitor):
         self.breach_flag = False
         self.total_distance_diff = None
         self.passed = False
-        self.obj_position_array = None
-        self.est_position_array = None
         self.actual_distance = None
         self.optimal_distance = None
         self.mission = mission
@@ -34,8 +30,7 @@ class CircularDeviationMonitor(SingleDroneMissionMonitor):
         # only show 2 decimal places
         self.append_info_to_log(f"{self.target_drone};"
                                 f"optimal distance: {str(round(self.optimal_distance, 2))} meters")
-        while self.mission.state == self.mission.State.IDLE:
-            pass
+        self.mission.wait_until_started()
         self.update_position()
         self.stop()
 
@@ -78,27 +73,19 @@ class CircularDeviationMonitor(SingleDroneMissionMonitor):
 
     def update_position(self):
         dt = 0.01
-        self.est_position_array = []
-        self.obj_position_array = []
         while self.mission.state != self.mission.State.END:
-            estimated_position = self.client.getMultirotorState(
-                vehicle_name=self.target_drone).kinematics_estimated.position
-            object_position = self.client.simGetObjectPose(object_name=self.target_drone).position
+            snapshot = self.next_telemetry(dt)
+            estimated_position = snapshot.state.kinematics_estimated.position
             x = estimated_position.x_val
             y = estimated_position.y_val
             z = estimated_position.z_val
-            ox = object_position.x_val
-            oy = object_position.y_val
-            oz = object_position.z_val
             if self.mission.climbed and not self.check_breach(x, y, z):
                 if not self.reported_breach:
                     self.reported_breach = True
                     self.append_fail_to_log(f"{self.target_drone};First breach: deviated more than "
                                             f"{self.deviation_percentage} meter from the planned route")
                 self.breach_flag = True
-            self.est_position_array.append([x, y, z])
-            self.obj_position_array.append([ox, oy, oz])
-            sleep(dt)
+            self.record_trajectory(snapshot)
 
         # print(self.position_array)
 
@@ -111,10 +98,7 @@ class CircularDeviationMonitor(SingleDroneMissionMonitor):
                                                 self.deviation_percentage)
 
     def calculate_actual_distance(self):
-        distance = 0.0
-        for i in range(1, len(self.est_position_array)):
-            distance += self.get_distance_btw_points(self.est_position_array[i - 1], self.est_position_array[i])
-        return distance
+        return 0.0 if self.trajectory is None else self.trajectory.get_path_length()
 
     @staticmethod
     def get_distance_btw_points(point_arr_1, point_arr_2):
@@ -127,21 +111,14 @@ class CircularDeviationMonitor(SingleDroneMissionMonitor):
         folder_path = f"{self.log_subdir}/{self.mission.__class__.__name__}/{self.__class__.__name__}/"
         est_actual = self.est_position_array
         # obj_actual = self.obj_position_array
-        radius = self.mission.radius
-        height = self.mission.altitude
 
         if not self.breach_flag:
             title = f"{self.target_drone} Planned vs. Actual\nDrone speed: {self.mission.speed} m/s\nWind: {self.wind_speed_text}"
         else:
             title = f"(FAILED) {self.target_drone} Planned vs. Actual\nDrone speed: {self.mission.speed} m/s\nWind: {self.wind_speed_text}"
 
-        center = [self.mission.center.x_val, self.mission.center.y_val, height]
-        theta = np.linspace(0, 2 * np.pi, 100)
-        x = center[0] + radius * np.cos(theta)
-        y = center[1] + radius * np.sin(theta)
-        z = np.ones(100) * height
-
-        planned = [[x[i], y[i], -z[i]] for i in range(len(x))]
+        # analytic plan of the mission, sampled once by the mission
+        planned = self.mission.get_planned_trajectory()[:, 1:].tolist()
 
         # Use the grapher to draw and upload graphs
         grapher = ThreeDimensionalGrapher(self.storage_service)
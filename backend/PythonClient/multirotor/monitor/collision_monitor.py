@@ -1,7 +1,5 @@
 import threading
 
-from time import sleep
-
 from PythonClient.multirotor.mission.fly_straight import FlyStraight
 from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
 
@@ -17,10 +15,12 @@ class CollisionMonitor(SingleDroneMissionMonitor):
         time_interval = 3.0
         collided = False
         while self.mission.state != self.mission.State.END:
-            collision_info = self.client.simGetCollisionInfo(self.target_drone)
+            # collision and world frame pose come from the drone sampler shared with the other monitors
+            snapshot = self.next_telemetry(time_interval, fields=("collision", "pose"))
+            collision_info = snapshot.collision
             if collision_info.has_collided:
                 if prev_collision is None or prev_collision != collision_info.object_name:
-                    collision_abs_location = self.client.simGetObjectPose(object_name=self.target_drone).position
+                    collision_abs_location = snapshot.pose.position
                     self.append_fail_to_log(
                         f"{self.target_drone};collided with {collision_info.object_name} at absolute position"
                         f"x = {collision_abs_location.x_val} meters, "
@@ -29,7 +29,6 @@ class CollisionMonitor(SingleDroneMissionMonitor):
                     collided = True
                     self.save_image(collision_info.object_name)
                     prev_collision = collision_info.object_name
-            sleep(time_interval)
         if not collided:
             self.append_pass_to_log(f"{self.target_drone};No collision detected")
         else:
@@ -0,0 +1,134 @@
+import numpy as np
+from PythonClient import airsim
+from PythonClient.multirotor.control.lockstep_clock import get_simulation_time, sleep_simulated
+from PythonClient.multirotor.monitor.abstract.globa_monitor import GlobalMonitor
+from PythonClient.multirotor.util.geo.spatial_hash import find_close_pairs
+
+
+class ConflictPredictionMonitor(GlobalMonitor):
+    """
+    Predict losses of horizontal separation from the closest point of approach of every pair of drones,
+    extrapolating the estimated velocities over a lookahead horizon. Between two samples the drones are
+    assumed to move in a straight line, so breaches shorter than the sampling interval are caught too
+    """
+
+    def __init__(self, separation=1, horizon=10, dt=0.5):
+        """
+        :param separation: 1 minimum horizontal distance in meters between two drones
+        :param horizon: 10 seconds to look ahead
+        :param dt: 0.5 seconds between two samples
+        """
+        super().__init__()
+        self.violation_flag = False
+        self.run = True
+        self.separation = separation
+        self.horizon = horizon
+        self.dt = dt
+        self.drone_name_table = list(self.all_drone_names)
+        self.positions = None
+        self.velocities = None
+        self.sample_time = None
+        self.start_time = None
+        self.predicted_pairs = set()
+        self.breaching_pairs = set()
+
+    def start(self):
+        self.append_info_to_log(f"{self.all_drone_names};ConflictPredictionMonitor started, "
+                                f"predicting breach of horizontal: {self.separation} meters "
+                                f"within {self.horizon} seconds, for every {self.dt} seconds")
+        self.start_time = get_simulation_time()
+        while self.run:
+            self.update_conflicts()
+            sleep_simulated(self.dt)
+        if self.violation_flag:
+            self.append_fail_to_log(f"{self.all_drone_names};The minimum separation distance was breached")
+        else:
+            self.append_pass_to_log(f"{self.all_drone_names};The minimum separation distance was not breached")
+        self.save_report()
+
+    def stop(self):
+        self.run = False
+
+    def get_drone_kinematics(self):
+        """
+        :return: (N, 3) world frame positions and (N, 3) estimated velocities in the order of drone_name_table
+        """
+        # poses and states of the whole swarm in one pipelined round trip
+        count = len(self.drone_name_table)
+        results = self.client.callBatch([('simGetObjectPose', (name,)) for name in self.drone_name_table] +
+                                        [('getMultirotorState', (name,)) for name in self.drone_name_table])
+        poses = airsim.decode_poses_array(results[:count])
+        states = airsim.decode_multirotor_states_array(results[count:])
+        return poses['position'], states['linear_velocity']
+
+    @staticmethod
+    def get_closest_approach(relative_positions, relative_velocities, horizon):
+        """
+        Closest point of approach of pairs moving at constant relative velocity, vectorized across pairs
+        :param relative_positions: (P, D) position of the second drone of each pair relative to the first
+        :param relative_velocities: (P, D) velocity of the second drone relative to the first
+        :param horizon: latest time in seconds considered
+        :return: (P,) times in [0, horizon] and (P,) distances at these times
+        """
+        speed_squared = np.einsum('pk,pk->p', relative_velocities, relative_velocities)
+        closing = -np.einsum('pk,pk->p', relative_positions, relative_velocities)
+        times = np.divide(closing, speed_squared, out=np.zeros_like(closing), where=speed_squared > 0)
+        times = np.clip(times, 0, horizon)
+        distances = np.linalg.norm(relative_positions + relative_velocities * times[:, None], axis=1)
+        return times, distances
+
+    def update_conflicts(self):
+        positions, velocities = self.get_drone_kinematics()
+        positions = positions[:, :2]
+        velocities = velocities[:, :2]
+        now = get_simulation_time()
+        previous_positions, interval = self.positions, None
+        if previous_positions is not None:
+            interval = now - self.sample_time
+        self.positions, self.velocities, self.sample_time = positions, velocities, now
+
+        # only pairs that can get within the separation before the horizon, or did since the last sample
+        reach = np.max(np.linalg.norm(velocities, axis=1), initial=0) * self.horizon
+        if previous_positions is not None:
+            reach = max(reach, np.max(np.linalg.norm(positions - previous_positions, axis=1), initial=0))
+        first, second, _ = find_close_pairs(positions, self.separation + 2 * reach)
+        if len(first) == 0:
+            self.predicted_pairs = set()
+            self.breaching_pairs = set()
+            return
+
+        breaching_pairs = set()
+        if previous_positions is not None and interval > 0:
+            # straight line motion between the two samples
+            previous_relative = previous_positions[second] - previous_positions[first]
+            step_velocities = (positions[second] - positions[first] - previous_relative) / interval
+            times, distances = self.get_closest_approach(previous_relative, step_velocities, interval)
+            times = now - interval + times
+        else:
+            # first sample, or no time elapsed since the last one: only the current distances are known
+            distances = np.linalg.norm(positions[second] - positions[first], axis=1)
+            times = np.full(len(first), now)
+        for i, j, at, distance in zip(first.tolist(), second.tolist(), times.tolist(), distances.tolist()):
+            if distance < self.separation:
+                breaching_pairs.add((i, j))
+                if (i, j) not in self.breaching_pairs:
+                    self.violation_flag = True
+                    self.append_fail_to_log(
+                        f"{self.drone_name_table[i]} and {self.drone_name_table[j]};"
+                        f"Horizontal breach at {round(at - self.start_time, 2)} seconds "
+                        f"in the mission: closest horizontal distance: {round(distance, 2)} meters")
+
+        times, distances = self.get_closest_approach(positions[second] - positions[first],
+                                                     velocities[second] - velocities[first], self.horizon)
+        predicted_pairs = set()
+        for i, j, at, distance in zip(first.tolist(), second.tolist(), times.tolist(), distances.tolist()):
+            if distance < self.separation and at > 0 and (i, j) not in breaching_pairs:
+                predicted_pairs.add((i, j))
+                # a conflict is reported once when first predicted, not on every sample until it happens
+                if (i, j) not in self.predicted_pairs:
+                    self.append_info_to_log(
+                        f"{self.drone_name_table[i]} and {self.drone_name_table[j]};"
+                        f"Predicted conflict at {round(now - self.start_time, 2)} seconds in the mission: "
+                        f"horizontal distance of {round(distance, 2)} meters in {round(at, 2)} seconds")
+        self.predicted_pairs = predicted_pairs
+        self.breaching_pairs = breaching_pairs
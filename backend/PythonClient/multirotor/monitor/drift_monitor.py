@@ -1,5 +1,4 @@
 import threading
-from time import sleep
 
 from PythonClient import airsim
 from PythonClient.multirotor.util.graph.three_dimensional_grapher import ThreeDimensionalGrapher
@@ -13,7 +12,6 @@ class DriftMonitor(SingleDroneMissionMonitor):
         super().__init__(mission)
         self.closest = None
         self.reached = None
-        self.est_position_array = None
         self.mission = mission
         self.target_drone = mission.target_drone
         self.threshold = threshold
@@ -31,21 +29,19 @@ class DriftMonitor(SingleDroneMissionMonitor):
         dt = self.dt
         closest = float('inf')  # Maximum distance
         self.reached = False
-        self.est_position_array = []
         while self.mission.state != self.mission.State.END:
-            current_position = self.client.getMultirotorState(
-                vehicle_name=self.target_drone).kinematics_estimated.position
+            snapshot = self.next_telemetry(dt, fields=("state",))
+            self.record_trajectory(snapshot)
+            current_position = snapshot.state.kinematics_estimated.position
             x = current_position.x_val
             y = current_position.y_val
             z = current_position.z_val
-            self.est_position_array.append([x, y, z])
             distance = self.get_distance_btw_points([x, y, z], self.mission.point)
             closest = min(closest, distance)
             self.closest = closest
             if distance < self.threshold or self.reached:
                 if not self.reached:
                     self.reached = True
-            sleep(dt)
         if not self.reached:
             self.append_fail_to_log(f"{self.target_drone};Did NOT reach target location {self.mission.point} "
                                     f"within {round(self.threshold, 2)} meters. Closest distance: {round(closest, 2)} meters")
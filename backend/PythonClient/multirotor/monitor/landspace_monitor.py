@@ -1,6 +1,4 @@
 # sUAS shall only land at their home coordinates or another predefined landing space.
-from time import sleep
-
 from PythonClient import airsim
 from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
 from PythonClient.multirotor.util.geo.geo_util import GeoUtil
@@ -36,12 +34,12 @@ class LandspaceMonitor(SingleDroneMissionMonitor):
 
     def monitor_land_space(self):
         violation = False
-        while self.mission.state == self.mission.State.IDLE:
-            # ignore landing space violation during idle
-            pass
+        # ignore landing space violation during idle
+        self.mission.wait_until_started()
         while self.mission.state != self.mission.State.END:
-            drone_object = self.client.simGetObjectPose(self.target_drone)
-            landed_state = self.client.getMultirotorState(self.target_drone).landed_state
+            snapshot = self.next_telemetry(1)
+            drone_object = snapshot.pose
+            landed_state = snapshot.state.landed_state
             if landed_state == airsim.LandedState.Landed:
                 x = drone_object.position.x_val
                 y = drone_object.position.y_val
@@ -58,6 +56,5 @@ class LandspaceMonitor(SingleDroneMissionMonitor):
                     self.append_fail_to_log(f"{self.target_drone};landed outside designated landing space. "
                                             f"Drone abs position: [x={round(x, 2)}, y={round(y, 2)}, z={round(z, 2)}] meters")
                     violation = True
-            sleep(1)
         if not violation:
             self.append_pass_to_log(f"{self.target_drone};No landing violations detected")
@@ -1,15 +1,314 @@
 # One main monitor that fetches the data for multi-monitor performance
-from PythonClient.multirotor.airsim_application import AirSimApplication
+import threading
+import time
+import traceback
 
+from PythonClient import airsim
 
-class MonitorDataDistributor(AirSimApplication):
-	def __init__(self,):
-		super().__init__()
-		self.alive = True
 
-	def update(self):
-		pass
+class TelemetrySnapshot:
+    """
+    Timestamped telemetry of one drone, shared read-only by every monitor subscribed to that drone
+    """
+
+    def __init__(self, drone_name, sequence, timestamp, state=None, pose=None, gps=None, collision=None, fields=None):
+        """
+        :param drone_name: name of the sampled drone
+        :param sequence: increasing sample number of the drone sampler
+        :param timestamp: host time.time() of the sample in seconds, simulated time in lockstep mode
+        :param state: MultirotorState, None if no subscriber asked for it
+        :param pose: world frame Pose from simGetObjectPose, None if no subscriber asked for it
+        :param gps: GpsData, None if no subscriber asked for it
+        :param collision: CollisionInfo, None if no subscriber asked for it
+        :param fields: names of the sampled fields, the fields given as not None if None
+        """
+        self.drone_name = drone_name
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.state = state
+        self.pose = pose
+        self.gps = gps
+        self.collision = collision
+        if fields is None:
+            fields = (name for name, value in (("state", state), ("pose", pose), ("gps", gps), ("collision", collision))
+                      if value is not None)
+        self.fields = frozenset(fields)
+
+    @property
+    def sim_timestamp(self):
+        # simulator timestamp in nanoseconds, only known when the state was sampled
+        return None if self.state is None else self.state.timestamp
+
+
+class TelemetrySubscription:
+    """
+    Handle of one monitor on a drone sampler, hands out snapshots at the rate the monitor asked for
+    """
+
+    def __init__(self, sampler, period, fields):
+        self.sampler = sampler
+        self.period = period
+        self.fields = frozenset(fields)
+        self.last_timestamp = None
+        self.closed = False
+
+    def next_snapshot(self, timeout=None):
+        """
+        Block until a snapshot at least one period newer than the last consumed one is published
+        :param timeout: seconds to wait, defaults to a few periods of this subscription
+        :return: TelemetrySnapshot holding at least the fields of this subscription,
+            None if the sampler stopped or timed out before sampling them
+        """
+        if timeout is None:
+            timeout = max(1.0, 5 * self.period)
+        return self.sampler.wait_for_snapshot(self, timeout)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.sampler.remove_subscription(self)
+
+
+class DroneTelemetrySampler:
+    """
+    Polls the simulator for one drone at the highest rate any of its subscribers asks for
+    """
+
+    IDLE_WAIT = 1.0  # seconds, how long the sampler thread sleeps when nobody is subscribed
+
+    def __init__(self, drone_name):
+        self.drone_name = drone_name
+        self.client = airsim.get_client_pool().get_client()
+        self.subscriptions = []
+        self.latest = None
+        self.sequence = 0
+        self.alive = True
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name=f"TelemetrySampler-{drone_name}")
+
+    @property
+    def period(self):
+        # caller holds self.condition
+        if not self.subscriptions:
+            return None
+        return min(subscription.period for subscription in self.subscriptions)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.alive = False
+            self.condition.notify_all()
+
+    def join(self, timeout=None):
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+
+    def add_subscription(self, subscription):
+        with self.condition:
+            self.subscriptions.append(subscription)
+            self.condition.notify_all()
+
+    def remove_subscription(self, subscription):
+        with self.condition:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+            self.condition.notify_all()
+
+    def wait_for_snapshot(self, subscription, timeout):
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.alive:
+                if self.latest is not None and self.is_due(subscription, self.latest):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            if self.latest is None or not self.is_due(subscription, self.latest):
+                # timed out or stopped without a new snapshot holding its fields, e.g. the sampler keeps failing:
+                # the caller samples directly instead of processing a stale one again
+                return None
+            subscription.last_timestamp = self.latest.timestamp
+            # a lockstep clock waits for every due subscriber before stepping the simulation
+            self.condition.notify_all()
+            return self.latest
+
+    def publish(self, snapshot):
+        with self.condition:
+            self.sequence += 1
+            snapshot.sequence = self.sequence
+            self.latest = snapshot
+            self.condition.notify_all()
+
+    def wait_until_consumed(self, deadline):
+        """
+        Block until every subscriber due for the latest snapshot took it, or until the monotonic deadline
+        :return: False if the deadline passed first
+        """
+        with self.condition:
+            while self.alive and self.latest is not None:
+                if not any(self.is_due(subscription, self.latest) for subscription in self.subscriptions):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            return True
+
+    def is_due(self, subscription, snapshot):
+        if not subscription.fields <= snapshot.fields:
+            # taken before the fields of this subscriber joined the sampled union, wait for the next tick
+            return False
+        if subscription.last_timestamp is None:
+            return True
+        # allow half a sampler tick of jitter so a subscriber at the sampler rate never skips a sample
+        slack = (self.period or subscription.period) / 2
+        return snapshot.timestamp >= subscription.last_timestamp + subscription.period - slack
+
+    def run(self):
+        next_tick = time.monotonic()
+        while True:
+            with self.condition:
+                while self.alive and not self.subscriptions:
+                    self.condition.wait(self.IDLE_WAIT)
+                    next_tick = time.monotonic()
+                if not self.alive:
+                    return
+                period = self.period
+                fields = frozenset().union(*(subscription.fields for subscription in self.subscriptions))
+
+            try:
+                snapshot = self.sample(fields)
+            except Exception as e:
+                print(f"Telemetry sampler for {self.drone_name} failed to sample:", e)
+                traceback.print_exc()
+                snapshot = None
+
+            with self.condition:
+                if snapshot is not None:
+                    # numbered under the condition like publish(), the lockstep thread shares the counter
+                    self.sequence += 1
+                    snapshot.sequence = self.sequence
+                    self.latest = snapshot
+                self.condition.notify_all()
+
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                with self.condition:
+                    if self.alive:
+                        self.condition.wait(delay)
+            else:
+                # fell behind the requested rate, resynchronize instead of bursting
+                next_tick = time.monotonic()
+
+    def sample(self, fields):
+        # all fields are requested in one pipelined round trip
+        data = self.client.getBatchSnapshot([self.drone_name], sorted(fields))[self.drone_name]
+        return TelemetrySnapshot(self.drone_name, 0, time.time(), fields=fields, **data)
+
+
+class MonitorDataDistributor:
+    """
+    Batch scoped telemetry hub: one sampler per drone polls the simulator and publishes timestamped snapshots
+    to every monitor subscribed to that drone, so RPC load grows with drones instead of drones x monitors
+    """
+
+    SUPPORTED_FIELDS = frozenset({"state", "pose", "gps", "collision"})
+
+    def __init__(self, lockstep=False):
+        """
+        :param lockstep: samplers don't poll on their own, a LockstepClock samples every drone once per
+            simulation step with sample_step()
+        """
+        self.alive = True
+        self.lockstep = lockstep
+        self.samplers = {}
+        self.lock = threading.Lock()
+        self.client = None
+
+    def subscribe(self, drone_name, period, fields=("state", "pose")):
+        """
+        Register a monitor on a drone
+        :param drone_name: drone to sample
+        :param period: seconds between two snapshots handed to this subscriber
+        :param fields: subset of SUPPORTED_FIELDS the subscriber reads
+        :return: TelemetrySubscription
+        """
+        unknown = set(fields) - self.SUPPORTED_FIELDS
+        if unknown:
+            raise ValueError(f"Unsupported telemetry fields {unknown}")
+        if period <= 0:
+            raise ValueError("Telemetry period must be positive")
+        with self.lock:
+            if not self.alive:
+                raise RuntimeError("MonitorDataDistributor already stopped")
+            sampler = self.samplers.get(drone_name)
+            if sampler is None:
+                sampler = DroneTelemetrySampler(drone_name)
+                self.samplers[drone_name] = sampler
+                if not self.lockstep:
+                    sampler.start()
+        subscription = TelemetrySubscription(sampler, period, fields)
+        sampler.add_subscription(subscription)
+        return subscription
+
+    def sample_step(self, timestamp):
+        """
+        Lockstep mode: sample every subscribed drone in one round trip and publish the snapshots
+        :param timestamp: simulated time of the step
+        :return: list of samplers that published a snapshot
+        """
+        with self.lock:
+            samplers = list(self.samplers.values())
+        samplers = [sampler for sampler in samplers if sampler.subscriptions]
+        if not samplers:
+            return []
+        fields = frozenset().union(*(subscription.fields for sampler in samplers
+                                     for subscription in list(sampler.subscriptions)))
+        if self.client is None:
+            self.client = airsim.get_client_pool().get_client()
+        data = self.client.getBatchSnapshot([sampler.drone_name for sampler in samplers], sorted(fields))
+        for sampler in samplers:
+            sampler.publish(TelemetrySnapshot(sampler.drone_name, 0, timestamp, fields=fields,
+                                              **data[sampler.drone_name]))
+        return samplers
+
+    def wait_until_consumed(self, samplers, timeout):
+        """
+        Lockstep mode: wait until the monitors due for the published snapshots took them
+        :param samplers: samplers returned by sample_step()
+        :param timeout: seconds to wait at most, a busy or finished monitor must not stall the simulation
+        :return: False if some subscriber did not take its snapshot in time
+        """
+        deadline = time.monotonic() + timeout
+        return all([sampler.wait_until_consumed(deadline) for sampler in samplers])
+
+    def update(self):
+        """
+        Latest snapshot of every sampled drone
+        :return: dict of drone name to TelemetrySnapshot
+        """
+        with self.lock:
+            samplers = list(self.samplers.values())
+        return {sampler.drone_name: sampler.latest for sampler in samplers}
+
+    def stop(self):
+        with self.lock:
+            self.alive = False
+            samplers = list(self.samplers.values())
+        for sampler in samplers:
+            sampler.stop()
+        for sampler in samplers:
+            sampler.join(timeout=5)
 
 
 if __name__ == "__main__":
-	pass
+    distributor = MonitorDataDistributor()
+    subscription = distributor.subscribe("Drone1", 0.1)
+    for _ in range(10):
+        print(subscription.next_snapshot().state.kinematics_estimated.position)
+    distributor.stop()
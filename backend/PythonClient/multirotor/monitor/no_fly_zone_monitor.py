@@ -1,27 +1,68 @@
-from time import sleep
-import numpy
-from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
-from numpy import concatenate
-from scipy.spatial import ConvexHull
+import json
+import threading
 
+from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
 from PythonClient.multirotor.util.geo.geo_util import GeoUtil
+from PythonClient.multirotor.util.geo.geofence_index import GeofenceIndex
+
+geofence_lock = threading.Lock()
 
 
 class NoFlyZoneMonitor(SingleDroneMissionMonitor):
-    def __init__(self, mission, zone_polyhedra=None):
+    def __init__(self, mission, zone_polyhedra=None, dt=1, tolerance=0.0):
+        """
+        :param mission: monitored mission
+        :param zone_polyhedra: list of zones, each a list of [lat, long, alt] corners, default zones if None
+        :param dt: 1 seconds between two position checks
+        :param tolerance: 0.0 meters outside a zone still counted as inside it
+        """
         super().__init__(mission)
-        if zone_polyhedra is None:
-            self.zone_polyhedra_cartesian = self.default_cartesian_zones()
-        else:
+        self.dt = dt
+        self.tolerance = tolerance
+        self.entered_zones = set()
+        self.zone_polyhedra_geo = None
+        if zone_polyhedra is not None:
             if self.input_zone_polyhedra_is_valid(zone_polyhedra):
                 print("DEBUG input zone polyhedra is valid")
-                self.zone_polyhedra_cartesian = self.convert_to_cartesian(zone_polyhedra)
                 self.zone_polyhedra_geo = zone_polyhedra
             else:
                 print("Invalid zone polyhedra input, using default zones")
-                self.zone_polyhedra_cartesian = self.default_cartesian_zones()
                 self.append_fail_to_log(f"{self.target_drone};Invalid zone polyhedra input, using default zones")
-        self.zone_polyhedra_hulls = self.make_poly_hulls()
+        self.zones = self.make_zones()
+        self.zone_polyhedra_cartesian = self.zones.zone_polyhedra
+
+    geofence_indexes = {}  # GeofenceIndex or ValueError per zone set, shared by every monitor of the batch
+
+    @classmethod
+    def reset_geofence_indexes(cls):
+        """
+        Start a new batch: zones are converted and indexed again on first use, e.g. for a new cesium origin
+        """
+        with geofence_lock:
+            cls.geofence_indexes = {}
+
+    @classmethod
+    def get_geofence_index(cls, zone_polyhedra_geo, tolerance, cesium_origin):
+        """
+        Index of the zones, built once per batch and shared read-only by the monitors of all drones
+        :param zone_polyhedra_geo: list of zones of [lat, long, alt] corners, default cartesian zones if None
+        :raise ValueError: a zone is not a 3D convex volume
+        """
+        key = (json.dumps(zone_polyhedra_geo), tolerance, tuple(cesium_origin))
+        with geofence_lock:
+            if key not in cls.geofence_indexes:
+                if zone_polyhedra_geo is None:
+                    zone_polyhedra = cls.default_cartesian_zones()
+                else:
+                    zone_polyhedra = cls.convert_to_cartesian(zone_polyhedra_geo, cesium_origin)
+                try:
+                    cls.geofence_indexes[key] = GeofenceIndex(zone_polyhedra, tolerance)
+                except ValueError as e:
+                    cls.geofence_indexes[key] = e
+            index = cls.geofence_indexes[key]
+        if isinstance(index, ValueError):
+            raise index
+        return index
 
     @staticmethod
     def default_cartesian_zones():
@@ -48,19 +89,21 @@ class NoFlyZoneMonitor(SingleDroneMissionMonitor):
             ]
         ]
 
-    def convert_to_cartesian(self, zone_polyhedra):
+    @staticmethod
+    def convert_to_cartesian(zone_polyhedra, cesium_origin):
         """
         Convert a list of geo points to cartesian points based on the origin of the simulation
         :param zone_polyhedra: list of geo points
+        :param cesium_origin: origin of the simulation in geographic coordinates
         :return: list of cartesian points
         """
         geo_zone = []
         for zone in zone_polyhedra:
             geo_point = []
             for point in zone:
-                geo_point.append(GeoUtil.geo_to_cartesian_coordinates(point[0], point[1], point[2], self.cesium_origin))
+                geo_point.append(GeoUtil.geo_to_cartesian_coordinates(point[0], point[1], point[2], cesium_origin))
             geo_zone.append(geo_point)
-        print("Debug: NoFlyZoneMonitor: cartesian zone = ", geo_zone)
+        print("Debug: NoFlyZoneMonitor: cartesian zones =", len(geo_zone))
         return geo_zone
 
     def start(self):
@@ -70,9 +113,10 @@ class NoFlyZoneMonitor(SingleDroneMissionMonitor):
             # point = self.get_current_abs_point()
             geo_point = self.get_current_geo_point()
             # print(f"DEBUG: NoFlyZoneMonitor: current geo position [{geo_point[0]},{geo_point[1]},{geo_point[2]}]")
-            if self.is_in_zone(geo_point):
+            # zones are cartesian, compare in the same frame
+            point = GeoUtil.geo_to_cartesian_coordinates(geo_point[0], geo_point[1], geo_point[2], self.cesium_origin)
+            if self.is_in_zone(point, geo_point):
                 violation_flag = True
-            sleep(1)
         if violation_flag:
             self.append_fail_to_log(f"{self.target_drone};NoFlyZoneMonitor ended with violation")
         else:
@@ -88,34 +132,41 @@ class NoFlyZoneMonitor(SingleDroneMissionMonitor):
         return [x, y, z]
 
     def get_current_geo_point(self):
-        data = self.client.getGpsData(vehicle_name=self.target_drone)
+        data = self.next_telemetry(self.dt, fields=("gps",)).gps
         return [data.gnss.geo_point.latitude, data.gnss.geo_point.longitude, data.gnss.geo_point.altitude]
 
-    def is_in_zone(self, point):
-        for hull in self.zone_polyhedra_hulls:
-            new_hull = ConvexHull(concatenate((hull.points, [point])))
-            if numpy.array_equal(new_hull.vertices, hull.vertices):
-                self.append_fail_to_log(f"{self.target_drone}; entered no-fly zone, "
+    def is_in_zone(self, point, geo_point=None):
+        """
+        Check a cartesian position against all zones at once, each zone entry is logged once
+        :param point: [x, y, z] in the frame of the zones
+        :param geo_point: [lat, long, alt] of point, logged instead of point when given
+        :return: True if point is inside at least one zone
+        """
+        # only the zones whose bounding box holds the point are tested
+        inside = self.zones.zones_containing(point)
+        logged = point if geo_point is None else geo_point
+        for zone_index in inside:
+            if zone_index not in self.entered_zones:
+                self.append_fail_to_log(f"{self.target_drone}; entered no-fly zone {zone_index}, "
                                         f"current geo position "
-                                        f"[{round(point[0], 6)},{round(point[1], 6)},{round(point[2], 6)}]")
-                return True
-        return False
+                                        f"[{round(logged[0], 6)},{round(logged[1], 6)},{round(logged[2], 6)}]")
+        self.entered_zones = set(inside)
+        return len(inside) > 0
 
-    def make_poly_hulls(self):
+    def make_zones(self):
         try:
-            hulls = []
-            for zone in self.zone_polyhedra_cartesian:
-                # invert z axis
-                zone = [[point[0], point[1], point[2]] for point in zone]
-                hulls.append(ConvexHull(points=numpy.array(zone)))
-            self.append_info_to_log(f"{self.target_drone};NoFlyZoneMonitor created no-fly polyhedra zones, "
-                                    f"{self.zone_polyhedra_cartesian}")
-            return hulls
-        except Exception as e:
-            self.append_fail_to_log(f"{self.target_drone};Failed to create no-fly zones, not a valid 3D space,"
-                                    f"{type(e).__name__}, using empty zones")
-            print("Error: NoFlyZoneMonitor failed to create polyhedra hulls: ", type(e).__name__)
-            return []
+            zones = self.get_geofence_index(self.zone_polyhedra_geo, self.tolerance, self.cesium_origin)
+            if len(zones) <= 10:
+                self.append_info_to_log(f"{self.target_drone};NoFlyZoneMonitor created no-fly polyhedra zones, "
+                                        f"{zones.zone_polyhedra}")
+            else:
+                self.append_info_to_log(f"{self.target_drone};NoFlyZoneMonitor created {len(zones)} no-fly "
+                                        f"polyhedra zones")
+            return zones
+        except ValueError as e:
+            self.append_fail_to_log(f"{self.target_drone};Failed to create no-fly zones, {e}, using empty zones")
+            print("Error: NoFlyZoneMonitor failed to create polyhedra hulls: ", e)
+            return GeofenceIndex([])
 
     @staticmethod
     def input_zone_polyhedra_is_valid(zone_polyhedra):
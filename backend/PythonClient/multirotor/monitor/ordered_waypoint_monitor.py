@@ -1,5 +1,3 @@
-from time import sleep
-
 from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
 
 
@@ -22,7 +20,7 @@ class OrderedWaypointMonitor(SingleDroneMissionMonitor):
     def update_queue(self):
         dt = 0.1
         while self.mission.state != self.mission.State.END:
-            position = self.client.getMultirotorState(vehicle_name=self.target_drone).kinematics_estimated.position
+            position = self.next_telemetry(dt, fields=("state",)).state.kinematics_estimated.position
             cur = (position.x_val, position.y_val, position.z_val)
             if (self.get_distance_btw_points(cur, self.queue[0])) <= self.deviation_threshold:
                 self.append_info_to_log(self.target_drone + ";reached " + str(self.queue[0]) + " within " + str(
@@ -30,7 +28,6 @@ class OrderedWaypointMonitor(SingleDroneMissionMonitor):
                 self.queue.pop(0)
             if not self.queue:
                 break
-            sleep(dt)
 
     def stop(self):
         if not self.queue:
@@ -1,6 +1,4 @@
 # sUAS shall not deviate from their planned routes by more than [10%] of the total distance.
-from time import sleep
-
 from PythonClient.multirotor.util.geo.geo_util import GeoUtil
 from PythonClient.multirotor.util.graph.three_dimensional_grapher import ThreeDimensionalGrapher
 from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
@@ -11,12 +9,10 @@ class PointDeviationMonitor(SingleDroneMissionMonitor):
     def __init__(self, mission, deviation_percentage=15):
         super().__init__(mission)
         self.breach_flag = False
-        self.est_position_array = None
         self.actual_deviation_percentage = None
         self.actual_distance = None
         self.passed = False
         self.optimal_distance = None
-        self.obj_position_array = []
         self.mission = mission
         self.target_drone = mission.target_drone
         self.deviation_percentage = deviation_percentage
@@ -81,17 +77,12 @@ class PointDeviationMonitor(SingleDroneMissionMonitor):
 
     def update_position(self):
         self.append_info_to_log(self.target_drone + ";Register drone location every " + str(self.dt) + " seconds")
-        self.est_position_array = []
         while self.mission.state != self.mission.State.END:
-            estimated_position = self.client.getMultirotorState(
-                vehicle_name=self.target_drone).kinematics_estimated.position
-            object_position = self.client.simGetObjectPose(object_name=self.target_drone).position
+            snapshot = self.next_telemetry(self.dt)
+            estimated_position = snapshot.state.kinematics_estimated.position
             x = estimated_position.x_val
             y = estimated_position.y_val
             z = estimated_position.z_val
-            ox = object_position.x_val
-            oy = object_position.y_val
-            oz = object_position.z_val
 
             # first 2 points
             if len(self.point_queue) >= 2:
@@ -111,17 +102,12 @@ class PointDeviationMonitor(SingleDroneMissionMonitor):
                 if GeoUtil.get_distance_btw_3d_points(current_line_b, current_position) < self.deviation_percentage:
                     self.point_queue.pop(0)
 
-            self.est_position_array.append([x, y, z])
-            self.obj_position_array.append([ox, oy, oz])
-            sleep(self.dt)
+            self.record_trajectory(snapshot)
 
         # print(self.position_array)
 
     def calculate_actual_distance(self):
-        distance = 0.0
-        for i in range(1, len(self.est_position_array)):
-            distance += self.get_distance_btw_points(self.est_position_array[i - 1], self.est_position_array[i])
-        return distance
+        return 0.0 if self.trajectory is None else self.trajectory.get_path_length()
 
     def draw_trace_3d(self):
         # Construct the folder path
@@ -1,5 +1,4 @@
 import threading
-from time import sleep
 
 from PythonClient.multirotor.mission.fly_to_points import FlyToPoints
 from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
@@ -16,8 +15,7 @@ class TorqueBatteryMonitor(SingleDroneMissionMonitor):
 
     def start(self):
         self.append_info_to_log(f"{self.target_drone};speed {self.mission.speed} m/s with wind {self.wind_speed_text}")
-        while self.mission.state == self.mission.State.IDLE:
-            pass
+        self.mission.wait_until_started()
         while self.mission.state != self.mission.State.END:
             charge = self.get_current_battery_percentage()
             self.min_charge = min(charge,self.min_charge)
@@ -25,7 +23,7 @@ class TorqueBatteryMonitor(SingleDroneMissionMonitor):
             if charge < self.min_battery_percentage:
                 self.passed = False
                 self.append_fail_to_log(f"{self.target_drone};Battery is below {self.min_battery_percentage}%")
-            sleep(1)
+            self.mission.wait_until_ended(1)
 
         self.stop()
 
@@ -1,4 +1,3 @@
-from time import sleep
 from PythonClient.multirotor.monitor.abstract.single_drone_mission_monitor import SingleDroneMissionMonitor
 
 
@@ -24,14 +23,12 @@ class UnorderedWaypointMonitor(SingleDroneMissionMonitor):
     def update_dict(self):
         dt = 0.1
         while self.mission.state != self.mission.State.END:
-            position = self.client.getMultirotorState(
-                vehicle_name=self.target_drone).kinematics_estimated.position
+            position = self.next_telemetry(dt, fields=("state",)).state.kinematics_estimated.position
             cur = (position.x_val, position.y_val, position.z_val)
             for p in self.mission.points:
                 if (self.get_distance_btw_points(cur, p)) <= self.deviation_threshold and not self.point_dict[p]:
                     self.append_info_to_log(f"{self.target_drone};reached {p} within {self.deviation_threshold} meters")
                     self.point_dict[p] = True
-            sleep(dt)
 
     def stop(self):
         if all(val == True for val in self.point_dict.values()):
@@ -1,5 +1,4 @@
 import cv2
-import numpy as np
 import PythonClient.airsim as airsim
 
 
@@ -15,14 +14,14 @@ class MissionStreamer:
         self.DECODE_EXTENSION = '.jpg'
         self.mission = mission
         self.target_drone = mission.target_drone
-        self.client = airsim.MultirotorClient()  # initialize a new client to prevent mission lag
+        self.client = airsim.get_client_pool().get_client()  # multiplexed, frame requests do not block the mission
 
     def frame_generator(self):
-        while self.mission.state != "end":
+        while self.mission.state != self.mission.State.END:
             response_image = self.client.simGetImage(vehicle_name=self.target_drone,
                                                      camera_name=self.CAMERA_NAME,
                                                      image_type=self.IMAGE_TYPE)
-            np_response_image = np.asarray(bytearray(response_image), dtype="uint8")
+            np_response_image = airsim.string_to_uint8_array(response_image)
             decoded_frame = cv2.imdecode(np_response_image, cv2.IMREAD_COLOR)
             ret, encoded_jpeg = cv2.imencode(self.DECODE_EXTENSION, decoded_frame)
             frame = encoded_jpeg.tobytes()
@@ -8,7 +8,7 @@ class StreamManager:
     """
 
     def __init__(self):
-        self.client = airsim.MultirotorClient()
+        self.client = airsim.get_client_pool().get_client()
         self.streamers = []
 
     def get_stream(self, drone_name, camera_name):
@@ -1,5 +1,8 @@
 from PythonClient.multirotor.storage.abstract.storage_service import StorageServiceInterface
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
+from google.oauth2 import service_account
+from requests.adapters import HTTPAdapter
 import base64
 import os
 import json
@@ -17,15 +20,29 @@ class GCSStorageService(StorageServiceInterface):
         if emulator_host:
             # For fake-gcs-server, use anonymous credentials
             from google.auth.credentials import AnonymousCredentials
-            self.storage_client = storage.Client(
-                credentials=AnonymousCredentials(),
-                project='test-project',
-                client_options={"api_endpoint": emulator_host}
-            )
+            credentials = AnonymousCredentials()
+            project = 'test-project'
+            client_options = {"api_endpoint": emulator_host}
         else:
             # Production: use service account
-            self.storage_client = storage.Client.from_service_account_json(credentials_path)
-        
+            credentials = service_account.Credentials.from_service_account_file(
+                credentials_path, scopes=storage.Client.SCOPE)
+            project = credentials.project_id
+            client_options = None
+
+        # one client is shared by every mission and monitor thread, size its connection pool accordingly
+        pool_size = int(os.getenv('GCS_HTTP_POOL_SIZE', '32'))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = AuthorizedSession(credentials)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self.storage_client = storage.Client(
+            project=project,
+            credentials=credentials,
+            _http=session,
+            client_options=client_options
+        )
+
         self.bucket = self.storage_client.bucket(bucket_name)
 
     def upload_to_service(self, file_name, content, content_type='text/plain'):
@@ -108,6 +125,7 @@ class GCSStorageService(StorageServiceInterface):
                 "OrderedWaypointMonitor": [],
                 "PointDeviationMonitor": [],
                 "MinSepDistMonitor": [],
+                "ConflictPredictionMonitor": [],
                 "NoFlyZoneMonitor": [],
                 "htmlFiles": []
             }
@@ -1,9 +1,14 @@
 from PythonClient.multirotor.storage.abstract.storage_service import StorageServiceInterface
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.http import MediaInMemoryUpload, MediaIoBaseDownload
+from contextlib import contextmanager
 import threading
 import base64
+import httplib2
+import json
 from io import BytesIO
 import logging
 import os
@@ -22,9 +27,48 @@ class GoogleDriveStorageService(StorageServiceInterface):
         credentials_path = os.getenv('GDRIVE_CREDENTIALS_PATH', 'key.json')
         self.credentials = service_account.Credentials.from_service_account_file(
             credentials_path, scopes=SCOPES)
-        self.service = build('drive', 'v3', credentials=self.credentials)
+        # the discovery document is parsed once, httplib2 is not thread safe so every request borrows
+        # a service with its own authorized connection from a bounded pool
+        static_document = get_static_doc('drive', 'v3')
+        self._discovery_document = json.loads(static_document) if static_document else None
+        self._pool_size = max(1, int(os.getenv('GDRIVE_HTTP_POOL_SIZE', '8')))
+        self._idle_services = []
+        self._service_count = 0
+        self._pool_condition = threading.Condition()
+        self._folder_ids = {}  # (parent id, folder name) -> folder id, report folders are looked up once
         self.folder_id = folder_id
 
+    def _build_service(self):
+        """Builds a Drive API service on a new authorized HTTP connection."""
+        http = AuthorizedHttp(self.credentials, http=httplib2.Http())
+        if self._discovery_document is not None:
+            return build_from_document(self._discovery_document, http=http)
+        return build('drive', 'v3', http=http)
+
+    @contextmanager
+    def _checkout_service(self):
+        """Borrows a Drive API service for one request, waiting while all GDRIVE_HTTP_POOL_SIZE are in use."""
+        with self._pool_condition:
+            while not self._idle_services and self._service_count >= self._pool_size:
+                self._pool_condition.wait()
+            service = self._idle_services.pop() if self._idle_services else None
+            if service is None:
+                self._service_count += 1
+        if service is None:
+            try:
+                service = self._build_service()
+            except Exception:
+                with self._pool_condition:
+                    self._service_count -= 1
+                    self._pool_condition.notify()
+                raise
+        try:
+            yield service
+        finally:
+            with self._pool_condition:
+                self._idle_services.append(service)
+                self._pool_condition.notify()
+
     def upload_to_service(self, file_name, content, content_type='text/plain'):
         """Uploads a file to Google Drive, creating folders as necessary."""
         try:
@@ -37,7 +81,11 @@ class GoogleDriveStorageService(StorageServiceInterface):
             path_parts = file_name.strip('/').split('/')
             for folder_name in path_parts[:-1]:  # All parts except the last (which is the file name)
                 with self._lock:  # Acquire lock to prevent race conditions
-                    folder_id = self._get_or_create_folder(folder_name, parent_id)
+                    folder_id = self._folder_ids.get((parent_id, folder_name))
+                    if not folder_id:
+                        folder_id = self._get_or_create_folder(folder_name, parent_id)
+                        if folder_id:
+                            self._folder_ids[(parent_id, folder_name)] = folder_id
                     if not folder_id:
                         logger.error(f"Failed to get or create folder '{folder_name}' under parent ID '{parent_id}'")
                         return
@@ -51,11 +99,12 @@ class GoogleDriveStorageService(StorageServiceInterface):
             media = MediaInMemoryUpload(content, mimetype=content_type)
 
             # Upload the file
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id'
-            ).execute()
+            with self._checkout_service() as service:
+                file = service.files().create(
+                    body=file_metadata,
+                    media_body=media,
+                    fields='id'
+                ).execute()
             logger.info(f"File '{file_name}' uploaded to Google Drive with ID: {file.get('id')}.")
         except Exception as e:
             logger.exception(f"Failed to upload file '{file_name}': {e}")
@@ -72,11 +121,12 @@ class GoogleDriveStorageService(StorageServiceInterface):
                 f"name='{escaped_folder_name}' and "
                 f"'{parent_id}' in parents and trashed=false"
             )
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name)",
-                spaces='drive'
-            ).execute()
+            with self._checkout_service() as service:
+                results = service.files().list(
+                    q=query,
+                    fields="files(id, name)",
+                    spaces='drive'
+                ).execute()
             items = results.get('files', [])
             if items:
                 if len(items) > 1:
@@ -89,10 +139,11 @@ class GoogleDriveStorageService(StorageServiceInterface):
                     'mimeType': 'application/vnd.google-apps.folder',
                     'parents': [parent_id]
                 }
-                folder = self.service.files().create(
-                    body=file_metadata,
-                    fields='id'
-                ).execute()
+                with self._checkout_service() as service:
+                    folder = service.files().create(
+                        body=file_metadata,
+                        fields='id'
+                    ).execute()
                 logger.info(f"Created folder '{folder_name}' with ID: {folder.get('id')}")
                 return folder.get('id')
         except Exception as e:
@@ -168,12 +219,13 @@ class GoogleDriveStorageService(StorageServiceInterface):
         try:
             page_token = None
             while True:
-                response = self.service.files().list(
-                    q=f"'{parent_id}' in parents and trashed=false",
-                    fields="nextPageToken, files(id, name, mimeType, parents)",
-                    spaces='drive',
-                    pageToken=page_token
-                ).execute()
+                with self._checkout_service() as service:
+                    response = service.files().list(
+                        q=f"'{parent_id}' in parents and trashed=false",
+                        fields="nextPageToken, files(id, name, mimeType, parents)",
+                        spaces='drive',
+                        pageToken=page_token
+                    ).execute()
                 files = response.get('files', [])
                 for file in files:
                     file_name = file['name']
@@ -210,11 +262,12 @@ class GoogleDriveStorageService(StorageServiceInterface):
                 f"name='{escaped_folder_name}' and "
                 f"'{self.folder_id}' in parents and trashed=false"
             )
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name)",
-                spaces='drive'
-            ).execute()
+            with self._checkout_service() as service:
+                results = service.files().list(
+                    q=query,
+                    fields="files(id, name)",
+                    spaces='drive'
+                ).execute()
             items = results.get('files', [])
 
             if not items:
@@ -233,6 +286,7 @@ class GoogleDriveStorageService(StorageServiceInterface):
                 "OrderedWaypointMonitor": [],
                 "PointDeviationMonitor": [],
                 "MinSepDistMonitor": [],
+                "ConflictPredictionMonitor": [],
                 "NoFlyZoneMonitor": [],
                 "htmlFiles": []
             }
@@ -379,11 +433,12 @@ class GoogleDriveStorageService(StorageServiceInterface):
                 f"name='{escaped_folder_name}' and "
                 f"'{self.folder_id}' in parents and trashed=false"
             )
-            response = self.service.files().list(
-                q=query,
-                fields="files(id, name)",
-                spaces='drive'
-            ).execute()
+            with self._checkout_service() as service:
+                response = service.files().list(
+                    q=query,
+                    fields="files(id, name)",
+                    spaces='drive'
+                ).execute()
             items = response.get('files', [])
 
             if not items:
@@ -401,11 +456,12 @@ class GoogleDriveStorageService(StorageServiceInterface):
                     f"name='{escaped_part}' and "
                     f"'{parent_id}' in parents and trashed=false"
                 )
-                response = self.service.files().list(
-                    q=query,
-                    fields="files(id, name, mimeType)",
-                    spaces='drive'
-                ).execute()
+                with self._checkout_service() as service:
+                    response = service.files().list(
+                        q=query,
+                        fields="files(id, name, mimeType)",
+                        spaces='drive'
+                    ).execute()
                 items = response.get('files', [])
                 if not items:
                     logger.error(f"File or folder '{part}' not found under parent ID '{parent_id}'.")
@@ -430,12 +486,14 @@ class GoogleDriveStorageService(StorageServiceInterface):
     def _download_file_content(self, file_id):
         """Downloads the content of a file from Google Drive."""
         try:
-            request = self.service.files().get_media(fileId=file_id)
             fh = BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
+            # the request keeps the service's connection, hold it until the last chunk is in
+            with self._checkout_service() as service:
+                request = service.files().get_media(fileId=file_id)
+                downloader = MediaIoBaseDownload(fh, request)
+                done = False
+                while not done:
+                    status, done = downloader.next_chunk()
             fh.seek(0)
             file_contents = fh.read().decode('utf-8')
             logger.debug(f"Downloaded file content for file ID: {file_id}")
@@ -447,12 +505,14 @@ class GoogleDriveStorageService(StorageServiceInterface):
     def _download_file_content_as_bytes(self, file_id):
         """Downloads the content of a file as bytes from Google Drive."""
         try:
-            request = self.service.files().get_media(fileId=file_id)
             fh = BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
+            # the request keeps the service's connection, hold it until the last chunk is in
+            with self._checkout_service() as service:
+                request = service.files().get_media(fileId=file_id)
+                downloader = MediaIoBaseDownload(fh, request)
+                done = False
+                while not done:
+                    status, done = downloader.next_chunk()
             fh.seek(0)
             file_contents = fh.read()
             logger.debug(f"Downloaded bytes for file ID: {file_id}")
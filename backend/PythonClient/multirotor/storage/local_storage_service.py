@@ -108,6 +108,7 @@ class LocalStorageService(StorageServiceInterface):
                 "OrderedWaypointMonitor": [],
                 "PointDeviationMonitor": [],
                 "MinSepDistMonitor": [],
+                "ConflictPredictionMonitor": [],
                 "NoFlyZoneMonitor": [],
                 "MockMonitor": [],
                 "htmlFiles": [],
@@ -1,29 +1,50 @@
 import os
+import threading
+
+_storage_services = {}
+_storage_services_lock = threading.Lock()
+
 
 def get_storage_service():
-    """Return an instance of the configured storage service.
+    """Return the shared instance of the configured storage service.
 
     Supported storage types (env `STORAGE_TYPE`):
     - `local` (default): writes under `$LOCAL_STORAGE_ROOT/reports` or `~/reports`.
     - `gcs`: Google Cloud Storage bucket defined by `GCS_BUCKET_NAME`.
     - `gdrive`: Google Drive folder defined by `GDRIVE_FOLDER_ID`.
+
+    The service is created on first use and then shared by every caller in the process, so clients,
+    credentials and HTTP connection pools are not rebuilt for each mission and monitor.
     """
 
     storage_type = os.getenv('STORAGE_TYPE', 'local').lower()
 
+    if storage_type == 'local':
+        config = (storage_type, os.getenv('LOCAL_STORAGE_ROOT'))
+    elif storage_type == 'gcs':
+        config = (storage_type, os.getenv('GCS_BUCKET_NAME', 'droneworld'))
+    elif storage_type == 'gdrive':
+        config = (storage_type, os.getenv('GDRIVE_FOLDER_ID', 'google drive folder ID'))
+    else:
+        raise ValueError(f"Unsupported STORAGE_TYPE '{storage_type}'")
+
+    service = _storage_services.get(config)
+    if service is None:
+        with _storage_services_lock:
+            service = _storage_services.get(config)
+            if service is None:
+                service = _storage_services[config] = _create_storage_service(*config)
+    return service
+
+
+def _create_storage_service(storage_type, location):
     if storage_type == 'local':
         from .local_storage_service import LocalStorageService
-        storage_root = os.getenv('LOCAL_STORAGE_ROOT')
-        return LocalStorageService(storage_root=storage_root)
+        return LocalStorageService(storage_root=location)
 
     if storage_type == 'gcs':
         from .gcs_storage_service import GCSStorageService
-        bucket_name = os.getenv('GCS_BUCKET_NAME', 'droneworld')
-        return GCSStorageService(bucket_name=bucket_name)
-
-    if storage_type == 'gdrive':
-        from .gd_storage_service import GoogleDriveStorageService
-        folder_id = os.getenv('GDRIVE_FOLDER_ID', 'google drive folder ID')
-        return GoogleDriveStorageService(folder_id=folder_id)
+        return GCSStorageService(bucket_name=location)
 
-    raise ValueError(f"Unsupported STORAGE_TYPE '{storage_type}'")
+    from .gd_storage_service import GoogleDriveStorageService
+    return GoogleDriveStorageService(folder_id=location)
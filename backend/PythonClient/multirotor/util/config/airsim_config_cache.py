@@ -0,0 +1,107 @@
+import json
+import math
+import os
+import threading
+
+
+class AirSimConfigCache:
+    """
+    Process wide cache of settings.json and cesium.json in ~/Documents/AirSim
+
+    Every mission and monitor reads the same configuration, so each file is parsed once and its derived values
+    (drone names, wind text, cesium origin) computed once, until the file changes on disk (mtime or size) or
+    the generation is bumped after the task manager wrote a new configuration.
+    The parsed dicts are shared between all callers and must not be modified.
+    """
+
+    SETTINGS_FILE = 'settings.json'
+    CESIUM_FILE = 'cesium.json'
+
+    def __init__(self, directory=None):
+        """
+        :param directory: folder holding the json files, ~/Documents/AirSim if None
+        """
+        self.directory = directory if directory is not None else \
+            os.path.join(os.path.expanduser('~'), "Documents", "AirSim")
+        self.generation = 0
+        self.__entries = {}  # file name -> (file version, parsed json, {derived value name: value})
+        self.__lock = threading.Lock()
+
+    def bump_generation(self):
+        """
+        Drop every cached value, call after writing settings.json or cesium.json
+        """
+        with self.__lock:
+            self.generation += 1
+            self.__entries.clear()
+
+    def __load(self, file_name):
+        path = os.path.join(self.directory, file_name)
+        stat = os.stat(path)
+        version = (self.generation, stat.st_mtime_ns, stat.st_size)
+        with self.__lock:
+            entry = self.__entries.get(file_name)
+            if entry is not None and entry[0] == version:
+                return entry
+        with open(path, 'r') as f:
+            parsed = json.load(f)
+        entry = (version, parsed, {})
+        with self.__lock:
+            if version[0] == self.generation:
+                self.__entries[file_name] = entry
+        return entry
+
+    def __derived(self, file_name, name, compute):
+        _, parsed, derived = self.__load(file_name)
+        if name not in derived:
+            derived[name] = compute(parsed)
+        return derived[name]
+
+    def get_settings(self):
+        return self.__load(self.SETTINGS_FILE)[1]
+
+    def get_cesium_setting(self):
+        return self.__load(self.CESIUM_FILE)[1]
+
+    def get_drone_names(self):
+        return list(self.__derived(self.SETTINGS_FILE, 'drone_names', lambda settings: list(settings['Vehicles'])))
+
+    def get_wind_speed_text(self):
+        return self.__derived(self.SETTINGS_FILE, 'wind_speed_text', self.wind_speed_text)
+
+    def get_cesium_origin(self):
+        return list(self.__derived(self.CESIUM_FILE, 'cesium_origin',
+                                   lambda data: [data["latitude"], data["longitude"], data["height"]]))
+
+    @staticmethod
+    def wind_speed_text(settings):
+        """
+        :param settings: parsed settings.json
+        :return: direction and speed of the configured wind for reports
+        """
+        if "Wind" in settings:
+            wind = settings["Wind"]
+            wind_vector = [round(wind["X"], 2), round(wind["Y"], 2), round(wind["Z"], 2)]
+            # given wind_vector is in NED coordinate, return the direction and speed in ENU coordinate
+            magnitude = math.sqrt(wind_vector[0] ** 2 + wind_vector[1] ** 2 + wind_vector[2] ** 2)
+            if magnitude == 0:
+                return "No wind"
+            unit_vector = [wind_vector[0] / magnitude, wind_vector[1] / magnitude, wind_vector[2] / magnitude]
+            # calculate angle in degrees between wind and x-axis
+            degree = math.degrees(math.atan2(unit_vector[1], unit_vector[0]))
+            if degree < 0:
+                degree += 360
+
+            return f"{round(degree, 1)} degrees clock wise from north, speed {round(magnitude, 2)} m/s"
+        else:
+            return "No wind"
+
+
+_config_cache = AirSimConfigCache()
+
+
+def get_config_cache():
+    """
+    Return the process wide AirSimConfigCache
+    """
+    return _config_cache
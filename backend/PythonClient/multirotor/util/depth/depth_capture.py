@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+
+from PythonClient import airsim
+
+
+class DepthCapturePipeline:
+    """
+    Captures float depth frames of many drones with one pipelined simGetImages round trip per capture
+    and streams every frame straight from the RPC response into a pfm file
+    """
+
+    DEPTH_IMAGE_TYPES = (airsim.ImageType.DepthPerspective, airsim.ImageType.DepthPlanar)
+
+    def __init__(self, drone_names, output_dir, camera_name='0', image_types=(airsim.ImageType.DepthPerspective,),
+                 client=None):
+        """
+        :param drone_names: drones to capture
+        :param output_dir: local directory, frames go to output_dir/<drone>/<camera>_<image type>_<timestamp>.pfm
+        :param camera_name: camera of every drone to capture
+        :param image_types: subset of DEPTH_IMAGE_TYPES
+        :param client: MultirotorClient to use, a pooled client if None
+        """
+        unsupported = set(image_types) - set(self.DEPTH_IMAGE_TYPES)
+        if unsupported:
+            raise ValueError(f"Not a float depth image type: {unsupported}")
+        self.drone_names = list(drone_names)
+        self.output_dir = output_dir
+        self.camera_name = camera_name
+        self.image_types = list(image_types)
+        self.client = client if client is not None else airsim.get_client_pool().get_client()
+        self.requests = [airsim.ImageRequest(camera_name, image_type, pixels_as_float=True, compress=False)
+                         for image_type in self.image_types]
+        self.frames_written = 0
+        for drone_name in self.drone_names:
+            os.makedirs(os.path.join(output_dir, drone_name), exist_ok=True)
+
+    def capture(self):
+        """
+        Capture and save one frame of every requested image type for every drone
+        :return: list of written pfm paths
+        """
+        # raw responses: the float lists go to disk without building ImageResponse objects
+        responses = self.client.callBatch([('simGetImages', (self.requests, drone_name, False))
+                                           for drone_name in self.drone_names])
+        paths = []
+        for drone_name, drone_responses in zip(self.drone_names, responses):
+            for image_type, response in zip(self.image_types, drone_responses):
+                width, height = response['width'], response['height']
+                if width * height == 0:
+                    print(f"Depth capture of {drone_name} returned an empty image:", response.get('message'))
+                    continue
+                path = os.path.join(self.output_dir, drone_name,
+                                    f"{self.camera_name}_{image_type}_{response['time_stamp']}.pfm")
+                with airsim.PfmWriter(path, width, height) as writer:
+                    writer.write(response['image_data_float'])
+                paths.append(path)
+        self.frames_written += len(paths)
+        return paths
+
+    def run(self, period, stop_event=None, duration=None):
+        """
+        Capture every period seconds until stop_event is set or duration elapsed
+        :param period: seconds between two captures
+        :param stop_event: threading.Event ending the capture, e.g. set when the mission ends
+        :param duration: seconds to capture for, None to capture until stop_event is set
+        :return: list of written pfm paths
+        """
+        stop_event = stop_event if stop_event is not None else threading.Event()
+        deadline = None if duration is None else time.monotonic() + duration
+        paths = []
+        while not stop_event.is_set() and (deadline is None or time.monotonic() < deadline):
+            started = time.monotonic()
+            paths.extend(self.capture())
+            stop_event.wait(max(0.0, period - (time.monotonic() - started)))
+        return paths
+
+    @staticmethod
+    def load(path):
+        """
+        Lazily load a captured frame
+        :param path: pfm path returned by capture()
+        :return: (H, W) read-only np.memmap of depths in meters
+        """
+        return airsim.read_pfm_memmap(path)[0]
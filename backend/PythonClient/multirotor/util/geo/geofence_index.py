@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+
+from PythonClient.multirotor.util.geo.half_space_zones import HalfSpaceZones
+
+
+class GeofenceIndex:
+    """
+    Read-only spatial index of convex no-fly zones, safe to share between the monitors of all drones.
+    Zone bounding boxes are bulk loaded into a packed R-tree in Sort-Tile-Recursive order, a query walks
+    the tree level by level and only runs the half-space test on the few zones whose box holds the point
+    """
+
+    def __init__(self, zone_polyhedra, tolerance=0.0, node_capacity=16):
+        """
+        :param zone_polyhedra: list of zones, each a list of at least 4 cartesian [x, y, z] corners
+        :param tolerance: meters a point may be outside a zone and still count as inside, see HalfSpaceZones
+        :param node_capacity: 16 boxes per tree node
+        :raise ValueError: a zone is not a 3D convex volume
+        """
+        self.zone_polyhedra = zone_polyhedra
+        self.zones = HalfSpaceZones(zone_polyhedra, tolerance)
+        self.margin = max(tolerance, 0.0)
+        self.node_capacity = node_capacity
+        centers = (self.zones.lower + self.zones.upper) / 2
+        # zone indices in STR order, leaves group node_capacity consecutive zones
+        self.order = self.__sort_tile(np.arange(len(self.zones)), centers, 0)
+        lower = self.zones.lower[self.order]
+        upper = self.zones.upper[self.order]
+        # levels[0] are the zone boxes, each upper level boxes node_capacity consecutive boxes of the level below
+        self.levels = [(lower, upper)]
+        while len(lower) > node_capacity:
+            starts = np.arange(0, len(lower), node_capacity)
+            lower = np.minimum.reduceat(lower, starts, axis=0)
+            upper = np.maximum.reduceat(upper, starts, axis=0)
+            self.levels.append((lower, upper))
+
+    def __len__(self):
+        return len(self.zones)
+
+    def __sort_tile(self, indices, centers, axis):
+        """
+        Sort-Tile-Recursive: sort by the center along axis, cut into slabs and sort every slab by the next axis
+        """
+        indices = indices[np.argsort(centers[indices, axis], kind='stable')]
+        if axis == 2 or len(indices) <= self.node_capacity:
+            return indices
+        leaves = math.ceil(len(indices) / self.node_capacity)
+        slabs = math.ceil(leaves ** (1 / (3 - axis)))
+        slab_size = math.ceil(leaves / slabs) * self.node_capacity
+        return np.concatenate([self.__sort_tile(indices[start:start + slab_size], centers, axis + 1)
+                               for start in range(0, len(indices), slab_size)])
+
+    def candidates(self, point):
+        """
+        :param point: [x, y, z]
+        :return: indices of the zones whose bounding box, grown by the tolerance, holds point
+        """
+        point = np.asarray(point, dtype=float)
+        if len(self.zones) == 0:
+            return np.empty(0, dtype=int)
+        nodes = np.arange(len(self.levels[-1][0]))
+        for level in range(len(self.levels) - 1, -1, -1):
+            lower, upper = self.levels[level]
+            hit = np.all((lower[nodes] - self.margin <= point) & (point <= upper[nodes] + self.margin), axis=1)
+            nodes = nodes[hit]
+            if level > 0 and len(nodes) > 0:
+                children = (nodes[:, None] * self.node_capacity + np.arange(self.node_capacity)).ravel()
+                nodes = children[children < len(self.levels[level - 1][0])]
+        return self.order[nodes]
+
+    def zones_containing(self, point):
+        """
+        :param point: [x, y, z]
+        :return: sorted indices of the zones containing point within the tolerance
+        """
+        candidates = self.candidates(point)
+        if len(candidates) == 0:
+            return []
+        inside = self.zones.contains(point, candidates)[0]
+        return sorted(candidates[inside].tolist())
@@ -0,0 +1,70 @@
+import numpy as np
+from scipy.spatial import ConvexHull
+
+
+class HalfSpaceZones:
+    """
+    Convex 3D zones stored as the stacked half-space inequalities n . p + d <= 0 of their hulls.
+    Qhull runs once per zone at construction, containment of any number of points in all zones is then
+    a single NumPy product
+    """
+
+    def __init__(self, zones, tolerance=0.0):
+        """
+        :param zones: list of zones, each a list of at least 4 [x, y, z] corners spanning a 3D volume
+        :param tolerance: meters a point may be outside a zone and still count as inside, negative to shrink zones
+        :raise ValueError: a zone is not a 3D convex volume, Qhull error in the message
+        """
+        self.tolerance = tolerance
+        self.hulls = []
+        for index, zone in enumerate(zones):
+            try:
+                self.hulls.append(ConvexHull(np.asarray(zone, dtype=float)))
+            except Exception as e:
+                raise ValueError(f"zone {index} is not a valid 3D space, {type(e).__name__}") from e
+        face_count = max((len(hull.equations) for hull in self.hulls), default=0)
+        # zones with fewer faces are padded with 0 . p - 1 <= 0, which holds for every point
+        self.normals = np.zeros((len(self.hulls), face_count, 3))
+        self.offsets = np.full((len(self.hulls), face_count), -1.0)
+        for index, hull in enumerate(self.hulls):
+            # Qhull normals are unit length, so n . p + d is the signed distance to the face plane
+            self.normals[index, :len(hull.equations)] = hull.equations[:, :3]
+            self.offsets[index, :len(hull.equations)] = hull.equations[:, 3]
+        self.lower = np.array([hull.min_bound for hull in self.hulls]).reshape(-1, 3)
+        self.upper = np.array([hull.max_bound for hull in self.hulls]).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.hulls)
+
+    def signed_distances(self, points):
+        """
+        :param points: (P, 3) points, or a single [x, y, z]
+        :return: (P, Z) largest signed face distance of each point to each zone, <= 0 inside the zone.
+            Outside, the value is a lower bound of the Euclidean distance to the zone
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if len(self.hulls) == 0:
+            return np.empty((len(points), 0))
+        return (np.einsum('pk,zfk->pzf', points, self.normals) + self.offsets).max(axis=2)
+
+    def contains(self, points, zone_indices=None):
+        """
+        :param points: (P, 3) points, or a single [x, y, z]
+        :param zone_indices: only test these zones, all zones if None
+        :return: (P, Z) boolean matrix, True where the point is inside the zone within the tolerance
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if zone_indices is None:
+            normals, offsets = self.normals, self.offsets
+        else:
+            normals, offsets = self.normals[zone_indices], self.offsets[zone_indices]
+        if len(normals) == 0:
+            return np.zeros((len(points), 0), dtype=bool)
+        return ((np.einsum('pk,zfk->pzf', points, normals) + offsets) <= self.tolerance).all(axis=2)
+
+    def zones_containing(self, point):
+        """
+        :param point: [x, y, z]
+        :return: indices of the zones containing the point
+        """
+        return np.flatnonzero(self.contains(point)[0]).tolist()
@@ -0,0 +1,69 @@
+import itertools
+
+import numpy as np
+
+# up to this many points every pair is measured, the uniform grid only pays off for larger sets
+BRUTE_FORCE_LIMIT = 64
+
+
+def find_close_pairs(points, radius, brute_force_limit=BRUTE_FORCE_LIMIT):
+    """
+    Find all pairs of points closer than radius, each unordered pair once.
+    Small sets measure every pair, larger ones hash the points into a uniform grid of radius sized cells and
+    only measure pairs in the same or adjacent cells, all with NumPy array operations
+    :param points: (N, D) array of coordinates, e.g. (N, 2) for horizontal distances
+    :param radius: pairs at a distance strictly below radius are returned
+    :param brute_force_limit: largest N measured pair by pair
+    :return: (first, second, distances) arrays of the pairs, first < second, sorted by first then second
+    """
+    points = np.asarray(points, dtype=float)
+    count = len(points)
+    if count < 2 or radius <= 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+    if count <= brute_force_limit:
+        first, second = np.triu_indices(count, 1)
+    else:
+        first, second = _grid_candidate_pairs(points, radius)
+    distances = np.linalg.norm(points[first] - points[second], axis=1)
+    close = distances < radius
+    first, second, distances = first[close], second[close], distances[close]
+    order = np.lexsort((second, first))
+    return first[order], second[order], distances[order]
+
+
+def _grid_candidate_pairs(points, radius):
+    """
+    :return: (first, second) of every pair in the same or adjacent grid cells, first < second
+    """
+    dimensions = points.shape[1]
+    cells = np.floor(points / radius).astype(np.int64)
+    # one empty cell of margin on each side so neighbour keys never wrap around
+    cells -= cells.min(axis=0) - 1
+    extents = cells.max(axis=0) + 2
+    strides = np.ones(dimensions, dtype=np.int64)
+    for axis in range(dimensions - 2, -1, -1):
+        strides[axis] = strides[axis + 1] * extents[axis + 1]
+    keys = cells @ strides
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    firsts = []
+    seconds = []
+    for offset in itertools.product((-1, 0, 1), repeat=dimensions):
+        neighbour_keys = keys + np.asarray(offset, dtype=np.int64) @ strides
+        begin = np.searchsorted(sorted_keys, neighbour_keys, side='left')
+        counts = np.searchsorted(sorted_keys, neighbour_keys, side='right') - begin
+        total = counts.sum()
+        if total == 0:
+            continue
+        # expand each point's [begin, begin + count) range of sorted neighbours without a Python loop
+        first = np.repeat(np.arange(len(points)), counts)
+        ends = np.cumsum(counts)
+        positions = np.repeat(begin - ends + counts, counts) + np.arange(total)
+        second = order[positions]
+        # a pair is found once from each side, keep one
+        keep = first < second
+        firsts.append(first[keep])
+        seconds.append(second[keep])
+    if not firsts:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    return np.concatenate(firsts), np.concatenate(seconds)
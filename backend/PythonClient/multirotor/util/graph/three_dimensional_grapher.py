@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from matplotlib import pyplot as plt
 import matplotlib
@@ -14,13 +15,20 @@ class ThreeDimensionalGrapher:
     def __init__(self, storage_service):
         self.storage_service = storage_service
 
+    @staticmethod
+    def split_axes(position_list):
+        """
+        :param position_list: list of [x, y, z] points in NED or an (N, 3) array, e.g. TrajectoryStore.get_positions()
+        :return: x, y and height (-z) columns, x and y are views when position_list is already an array
+        """
+        positions = np.asarray(position_list).reshape(-1, 3)
+        return positions[:, 0], positions[:, 1], -positions[:, 2]
+
     def draw_trace(self, actual_position_list, drone_name, title, folder_path):
         with lock:
             fig = plt.figure()
             ax = fig.add_subplot(111, projection='3d')
-            x1 = [point[0] for point in actual_position_list]
-            y1 = [point[1] for point in actual_position_list]
-            z1 = [-point[2] for point in actual_position_list]
+            x1, y1, z1 = self.split_axes(actual_position_list)
             ax.plot(x1, y1, z1, label="Position trace")
             ax.legend()
             ax.set_box_aspect([1, 1, 1])
@@ -44,13 +52,9 @@ class ThreeDimensionalGrapher:
         with lock:
             fig = plt.figure()
             ax = fig.add_subplot(111, projection='3d')
-            x1 = [point[0] for point in planed_position_list]
-            y1 = [point[1] for point in planed_position_list]
-            z1 = [-point[2] for point in planed_position_list]
+            x1, y1, z1 = self.split_axes(planed_position_list)
             ax.plot(x1, y1, z1, label="Planned")
-            x2 = [point[0] for point in actual_position_list]
-            y2 = [point[1] for point in actual_position_list]
-            z2 = [-point[2] for point in actual_position_list]
+            x2, y2, z2 = self.split_axes(actual_position_list)
             ax.plot(x2, y2, z2, label="Actual")
             ax.set_box_aspect([1, 1, 1])
             ax.set_xlabel('North (+X) axis')
@@ -78,9 +82,7 @@ class ThreeDimensionalGrapher:
             y1 = destination_point[1]
             z1 = -destination_point[2]
             ax.plot(x1, y1, z1, marker="o", markersize=10, label="Destination")
-            x2 = [point[0] for point in actual_position_list]
-            y2 = [point[1] for point in actual_position_list]
-            z2 = [-point[2] for point in actual_position_list]
+            x2, y2, z2 = self.split_axes(actual_position_list)
             ax.plot(x2, y2, z2, label="Actual")
             ax.set_xlabel('North (+X) axis')
             ax.set_ylabel('East (+Y) axis')
@@ -102,9 +104,7 @@ class ThreeDimensionalGrapher:
 
     def draw_interactive_trace(self, actual_position, drone_name, title, folder_path):
         with lock:
-            x1 = [point[0] for point in actual_position]
-            y1 = [point[1] for point in actual_position]
-            z1 = [-point[2] for point in actual_position]
+            x1, y1, z1 = self.split_axes(actual_position)
             fig = px.scatter_3d(title=title)
             fig.add_scatter3d(x=x1, y=y1, z=z1, name=drone_name + " path")
             fig.update_layout(
@@ -124,9 +124,7 @@ class ThreeDimensionalGrapher:
 
     def draw_interactive_trace_vs_point(self, destination, actual_position, drone_name, title, folder_path):
         with lock:
-            x1 = [point[0] for point in actual_position]
-            y1 = [point[1] for point in actual_position]
-            z1 = [-point[2] for point in actual_position]
+            x1, y1, z1 = self.split_axes(actual_position)
             fig = px.scatter_3d(x=x1, y=y1, z=z1, title=title)
             fig.add_scatter3d(
                 x=[destination[0]],
@@ -152,12 +150,8 @@ class ThreeDimensionalGrapher:
 
     def draw_interactive_trace_vs_planned(self, planed_position_list, actual_position_list, drone_name, title, folder_path):
         with lock:
-            x1 = [point[0] for point in actual_position_list]
-            y1 = [point[1] for point in actual_position_list]
-            z1 = [-point[2] for point in actual_position_list]
-            x2 = [point[0] for point in planed_position_list]
-            y2 = [point[1] for point in planed_position_list]
-            z2 = [-point[2] for point in planed_position_list]
+            x1, y1, z1 = self.split_axes(actual_position_list)
+            x2, y2, z2 = self.split_axes(planed_position_list)
             fig = px.scatter_3d(title=title)
             fig.add_scatter3d(x=x1, y=y1, z=z1, name="Actual")
             fig.add_scatter3d(x=x2, y=y2, z=z2, name="Planned")
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class LidarUtil:
+    """
+    Vectorized helpers for AirSim LidarData point clouds
+    """
+
+    @staticmethod
+    def point_cloud_to_array(point_cloud):
+        """
+        Convert the flat point_cloud of a LidarData response to an array of points
+        :param point_cloud: flat [x0, y0, z0, x1, ...] list or buffer of floats
+        :return: (N, 3) float32 array, (0, 3) when the scan returned no points
+        """
+        if isinstance(point_cloud, (bytes, bytearray, memoryview)):
+            points = np.frombuffer(point_cloud, dtype=np.float32)
+        elif isinstance(point_cloud, np.ndarray):
+            points = point_cloud.astype(np.float32, copy=False).ravel()
+        else:
+            # msgpack decodes the cloud to a list, one pass straight into a float32 buffer
+            points = np.fromiter(point_cloud, dtype=np.float32, count=len(point_cloud))
+        # AirSim sends [0.0] for an empty scan
+        usable = points.size - points.size % 3
+        return points[:usable].reshape(-1, 3)
+
+    @staticmethod
+    def quaternion_to_rotation_matrix(orientation):
+        """
+        :param orientation: airsim Quaternionr
+        :return: 3x3 rotation matrix
+        """
+        w, x, y, z = orientation.w_val, orientation.x_val, orientation.y_val, orientation.z_val
+        norm = np.sqrt(w * w + x * x + y * y + z * z)
+        if norm == 0:
+            return np.eye(3)
+        w, x, y, z = w / norm, x / norm, y / norm, z / norm
+        return np.array([
+            [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+            [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+            [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+        ])
+
+    @staticmethod
+    def transform_points(points, pose):
+        """
+        Move points from the frame described by pose to its parent frame
+        :param points: (N, 3) array
+        :param pose: airsim Pose of the point frame, e.g. LidarData.pose for clouds in SensorLocalFrame
+        :return: (N, 3) float32 array
+        """
+        rotation = LidarUtil.quaternion_to_rotation_matrix(pose.orientation).astype(np.float32)
+        translation = np.array([pose.position.x_val, pose.position.y_val, pose.position.z_val], dtype=np.float32)
+        return points @ rotation.T + translation
+
+    @staticmethod
+    def voxel_downsample(points, voxel_size):
+        """
+        Replace the points of every occupied voxel by their centroid
+        :param points: (N, 3) array
+        :param voxel_size: voxel edge length in meters
+        :return: (M, 3) float32 array, M <= N
+        """
+        if voxel_size <= 0:
+            raise ValueError("voxel_size must be positive")
+        if len(points) == 0:
+            return np.empty((0, 3), dtype=np.float32)
+        voxels = np.floor(points / voxel_size).astype(np.int64)
+        voxels -= voxels.min(axis=0)
+        extent = voxels.max(axis=0) + 1
+        # one int64 key per voxel, a 1D unique is much faster than np.unique(axis=0)
+        keys = (voxels[:, 0] * extent[1] + voxels[:, 1]) * extent[2] + voxels[:, 2]
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        centroids = np.zeros((len(counts), 3), dtype=np.float64)
+        for axis in range(3):
+            centroids[:, axis] = np.bincount(inverse, weights=points[:, axis], minlength=len(counts))
+        return (centroids / counts[:, None]).astype(np.float32)
+
+    @staticmethod
+    def lidar_data_to_points(lidar_data, world_frame=False, voxel_size=None):
+        """
+        Full ingestion of one LidarData response
+        :param lidar_data: airsim LidarData
+        :param world_frame: transform the points with lidar_data.pose (for Lidars using DataFrame SensorLocalFrame)
+        :param voxel_size: downsample to this voxel size, None to keep every point
+        :return: (N, 3) float32 array
+        """
+        points = LidarUtil.point_cloud_to_array(lidar_data.point_cloud)
+        if world_frame and len(points):
+            points = LidarUtil.transform_points(points, lidar_data.pose)
+        if voxel_size:
+            points = LidarUtil.voxel_downsample(points, voxel_size)
+        return points
+
+
+class LidarPointCloudBuffer:
+    """
+    Rolling per-drone point clouds: the scans of the last `window` seconds, voxel downsampled on insert
+    """
+
+    def __init__(self, window=1.0, voxel_size=None, max_scans=100):
+        """
+        :param window: seconds of scans kept per drone
+        :param voxel_size: voxel edge length applied to every scan, None to keep every point
+        :param max_scans: upper bound of scans kept per drone regardless of the window
+        """
+        self.window = window
+        self.voxel_size = voxel_size
+        self.max_scans = max_scans
+        self.scans = {}
+        self.lock = threading.Lock()
+
+    def add_scan(self, drone_name, lidar_data, world_frame=False, timestamp=None):
+        """
+        :param drone_name: drone the scan belongs to
+        :param lidar_data: airsim LidarData
+        :param world_frame: see LidarUtil.lidar_data_to_points
+        :param timestamp: scan time in seconds, defaults to the LidarData time stamp
+        :return: the (downsampled) points of the scan
+        """
+        points = LidarUtil.lidar_data_to_points(lidar_data, world_frame, self.voxel_size)
+        if timestamp is None:
+            timestamp = lidar_data.time_stamp / 1e9 if lidar_data.time_stamp else time.time()
+        with self.lock:
+            scans = self.scans.setdefault(drone_name, deque(maxlen=self.max_scans))
+            scans.append((timestamp, points))
+            while scans and scans[0][0] < timestamp - self.window:
+                scans.popleft()
+        return points
+
+    def get_points(self, drone_name, voxel_size=None):
+        """
+        :param drone_name: drone to get the buffered cloud of
+        :param voxel_size: downsample the merged scans again, e.g. to merge overlapping scans
+        :return: (N, 3) float32 array of every buffered point of the drone
+        """
+        with self.lock:
+            clouds = [points for _, points in self.scans.get(drone_name, ())]
+        if not clouds:
+            return np.empty((0, 3), dtype=np.float32)
+        points = np.concatenate(clouds)
+        if voxel_size:
+            points = LidarUtil.voxel_downsample(points, voxel_size)
+        return points
+
+    def clear(self, drone_name=None):
+        with self.lock:
+            if drone_name is None:
+                self.scans.clear()
+            else:
+                self.scans.pop(drone_name, None)
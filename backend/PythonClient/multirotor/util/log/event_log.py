@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import deque
+
+
+class LogEvent:
+    """
+    One report log line, formatted only when the log is serialized
+    """
+    __slots__ = ('level', 'timestamp', 'message')
+
+    def __init__(self, level, timestamp, message):
+        self.level = level
+        self.timestamp = timestamp  # epoch seconds of the log clock when the event was logged
+        self.message = message
+
+    @property
+    def drone(self):
+        """
+        Drone the message is about, by convention the message starts with "<drone>;"
+        """
+        return self.message.split(";", 1)[0] if ";" in self.message else None
+
+
+class EventLog:
+    """
+    Append-only log of PASS/FAIL/INFO events serialized to the "LEVEL;HH:MM:SS;drone;message" report format
+
+    Appending only stores a record, timestamps are formatted and lines joined when the text is requested.
+    At most max_events records are kept, older ones are serialized to text when they are evicted so the
+    report stays complete. Serialized text is cached, and flush() hands over only the text of the events
+    added since the previous flush, so flushing a long running log repeatedly stays linear in its size.
+    """
+
+    INFO = "INFO"
+    FAIL = "FAIL"
+    PASS = "PASS"
+
+    def __init__(self, max_events=1024, clock=None):
+        """
+        :param max_events: records kept before they are serialized
+        :param clock: callable returning the event time in epoch seconds, monotonic host time if None
+        """
+        self.events = deque()
+        self.max_events = max_events
+        self.event_count = 0
+        self.flushed_count = 0
+        self.flushed_parts = 0
+        self.__text_chunks = []
+        self.__text_length = 0
+        self.__flushed_length = 0
+        wall_offset = time.time() - time.monotonic()
+        self.clock = clock if clock is not None else lambda: wall_offset + time.monotonic()
+        self.__time_cache = (None, "")
+        self.__lock = threading.Lock()
+        self.__flush_lock = threading.Lock()
+
+    def append(self, level, message):
+        event = LogEvent(level, self.clock(), message)
+        with self.__lock:
+            self.events.append(event)
+            self.event_count += 1
+            if len(self.events) > self.max_events:
+                self.__serialize(len(self.events) // 2)
+        return event
+
+    def info(self, message):
+        return self.append(self.INFO, message)
+
+    def fail(self, message):
+        return self.append(self.FAIL, message)
+
+    def passed(self, message):
+        return self.append(self.PASS, message)
+
+    def __format_time(self, timestamp):
+        second = int(timestamp)
+        if self.__time_cache[0] != second:
+            # consecutive events mostly share a second
+            self.__time_cache = (second, time.strftime("%H:%M:%S", time.localtime(second)))
+        return self.__time_cache[1]
+
+    def __serialize(self, count):
+        lines = []
+        for _ in range(count):
+            event = self.events.popleft()
+            lines.append(event.level + ";" + self.__format_time(event.timestamp) + ";" + event.message + "\n")
+        if lines:
+            chunk = "".join(lines)
+            self.__text_chunks.append(chunk)
+            self.__text_length += len(chunk)
+        if len(self.__text_chunks) > 64:
+            self.__text_chunks = ["".join(self.__text_chunks)]
+
+    def to_text(self):
+        """
+        :return: the whole log in report format
+        """
+        with self.__lock:
+            self.__serialize(len(self.events))
+            return "".join(self.__text_chunks)
+
+    def __text_since(self, offset):
+        # chunks are only appended or merged, so the text before offset never changes
+        tail = []
+        remaining = self.__text_length - offset
+        for chunk in reversed(self.__text_chunks):
+            if remaining <= 0:
+                break
+            tail.append(chunk[-remaining:] if len(chunk) > remaining else chunk)
+            remaining -= len(chunk)
+        return "".join(reversed(tail))
+
+    def has_unflushed_events(self):
+        return self.event_count != self.flushed_count
+
+    def flush(self, upload):
+        """
+        Hand the text of the events added since the last flush to upload, nothing if there are none.
+        Parts are not the report: concatenated in order they are the log so far, to_text() is the whole log
+        :param upload: callable taking the part text and its 1-based part number, e.g. a storage service
+            upload of a numbered part object
+        :return: True if a part was uploaded
+        """
+        with self.__flush_lock:
+            with self.__lock:
+                if self.event_count == self.flushed_count:
+                    return False
+                self.__serialize(len(self.events))
+                count = self.event_count
+                length = self.__text_length
+                text = self.__text_since(self.__flushed_length)
+            # a failed upload leaves the events unflushed, the next flush retries them
+            upload(text, self.flushed_parts + 1)
+            self.flushed_parts += 1
+            self.flushed_count = count
+            self.__flushed_length = length
+            return True
+
+    def __len__(self):
+        return self.event_count
+
+    def __str__(self):
+        return self.to_text()
@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+
+class TrajectoryStore:
+    """
+    Columnar trajectory of one drone, appended sample by sample into preallocated NumPy columns
+
+    A sample takes 44 bytes (float64 time and float32 estimated position, velocity and ground truth position)
+    instead of the few hundred bytes of nested Python lists. Columns double in size when full. Once more than
+    max_samples_in_memory samples are held, they are spilled to .npy chunks in a temporary directory and
+    memory mapped back when the whole trajectory is read.
+    Reads of an unspilled trajectory are zero-copy views, only valid until the next append.
+    """
+
+    COLUMNS = ('x', 'y', 'z', 'vx', 'vy', 'vz', 'gx', 'gy', 'gz')
+    POSITION = slice(0, 3)
+    VELOCITY = slice(3, 6)
+    GROUND_TRUTH = slice(6, 9)
+
+    def __init__(self, drone_name, capacity=1024, max_samples_in_memory=None):
+        """
+        :param drone_name: drone of the trajectory, used to name spilled chunks
+        :param capacity: samples preallocated
+        :param max_samples_in_memory: samples kept in memory before spilling a chunk to disk, None never spills,
+            defaults to env TRAJECTORY_MAX_SAMPLES_IN_MEMORY
+        """
+        if max_samples_in_memory is None and os.getenv('TRAJECTORY_MAX_SAMPLES_IN_MEMORY'):
+            max_samples_in_memory = int(os.getenv('TRAJECTORY_MAX_SAMPLES_IN_MEMORY'))
+        self.drone_name = drone_name
+        self.max_samples_in_memory = max_samples_in_memory
+        if max_samples_in_memory is not None:
+            capacity = min(capacity, max_samples_in_memory)
+        self.times = np.empty(capacity, dtype=np.float64)
+        self.values = np.full((len(self.COLUMNS), capacity), np.nan, dtype=np.float32)
+        self.size = 0  # samples in memory
+        self.spilled_size = 0
+        self.spill_dir = None
+        self.spilled_chunks = []
+        self.spill_cleanup = None
+
+    def __len__(self):
+        return self.spilled_size + self.size
+
+    def append(self, t, position, velocity=None, ground_truth=None):
+        """
+        :param t: sample time in seconds
+        :param position: estimated [x, y, z] in NED
+        :param velocity: estimated [vx, vy, vz], NaN if None
+        :param ground_truth: ground truth [x, y, z] in NED, NaN if None
+        """
+        if self.size == self.times.size:
+            self.__make_room()
+        index = self.size
+        self.times[index] = t
+        self.values[0:3, index] = position
+        self.values[3:6, index] = np.nan if velocity is None else velocity
+        self.values[6:9, index] = np.nan if ground_truth is None else ground_truth
+        self.size += 1
+
+    def append_snapshot(self, snapshot):
+        """
+        Append a TelemetrySnapshot of the MonitorDataDistributor, state and pose are used when sampled
+        """
+        position = velocity = ground_truth = None
+        if snapshot.state is not None:
+            kinematics = snapshot.state.kinematics_estimated
+            position = (kinematics.position.x_val, kinematics.position.y_val, kinematics.position.z_val)
+            velocity = (kinematics.linear_velocity.x_val, kinematics.linear_velocity.y_val,
+                        kinematics.linear_velocity.z_val)
+        if snapshot.pose is not None:
+            ground_truth = (snapshot.pose.position.x_val, snapshot.pose.position.y_val, snapshot.pose.position.z_val)
+        if position is None:
+            position = ground_truth
+        self.append(snapshot.timestamp, position, velocity, ground_truth)
+
+    def __make_room(self):
+        if self.max_samples_in_memory is not None and self.size >= self.max_samples_in_memory:
+            self.__spill()
+            return
+        capacity = self.times.size * 2
+        if self.max_samples_in_memory is not None:
+            capacity = min(capacity, self.max_samples_in_memory)
+        capacity = max(capacity, self.size + 1)
+        times = np.empty(capacity, dtype=np.float64)
+        values = np.full((len(self.COLUMNS), capacity), np.nan, dtype=np.float32)
+        times[:self.size] = self.times[:self.size]
+        values[:, :self.size] = self.values[:, :self.size]
+        self.times, self.values = times, values
+
+    def __spill(self):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix=f"trajectory_{self.drone_name}_")
+            # chunks outlive neither the store nor the process
+            self.spill_cleanup = weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        path = os.path.join(self.spill_dir, f"chunk_{len(self.spilled_chunks):05d}.npy")
+        chunk = np.empty((len(self.COLUMNS) + 1, self.size), dtype=np.float64)
+        chunk[0] = self.times[:self.size]
+        chunk[1:] = self.values[:, :self.size]
+        np.save(path, chunk)
+        self.spilled_chunks.append(path)
+        self.spilled_size += self.size
+        self.size = 0
+
+    def __columns(self, rows):
+        """
+        :param rows: slice of COLUMNS
+        :return: (N, k) array, a view when nothing was spilled
+        """
+        in_memory = self.values[rows, :self.size].T
+        if not self.spilled_chunks:
+            return in_memory
+        start = rows.start + 1
+        stop = rows.stop + 1
+        parts = [np.load(path, mmap_mode='r')[start:stop].T for path in self.spilled_chunks]
+        parts.append(in_memory)
+        return np.concatenate(parts).astype(np.float32, copy=False)
+
+    def get_times(self):
+        """
+        :return: (N,) sample times
+        """
+        if not self.spilled_chunks:
+            return self.times[:self.size]
+        parts = [np.load(path, mmap_mode='r')[0] for path in self.spilled_chunks]
+        parts.append(self.times[:self.size])
+        return np.concatenate(parts)
+
+    def get_positions(self, ground_truth=False):
+        """
+        :param ground_truth: ground truth positions instead of the estimated ones
+        :return: (N, 3) array of [x, y, z] rows, usable wherever a list of points is expected
+        """
+        return self.__columns(self.GROUND_TRUTH if ground_truth else self.POSITION)
+
+    def get_velocities(self):
+        """
+        :return: (N, 3) array of estimated [vx, vy, vz] rows
+        """
+        return self.__columns(self.VELOCITY)
+
+    def get_path_length(self, ground_truth=False):
+        """
+        :return: length in meters of the polyline through all positions
+        """
+        positions = self.get_positions(ground_truth)
+        if len(positions) < 2:
+            return 0.0
+        return float(np.linalg.norm(np.diff(positions.astype(np.float64), axis=0), axis=1).sum())
+
+    def get_distances_to(self, point, ground_truth=False):
+        """
+        :return: (N,) distances in meters of every position to point
+        """
+        return np.linalg.norm(self.get_positions(ground_truth) - np.asarray(point, dtype=np.float32), axis=1)
+
+    def close(self):
+        """
+        Delete spilled chunks, the store is empty afterwards
+        """
+        if self.spill_cleanup is not None:
+            self.spill_cleanup()
+            self.spill_cleanup = None
+            self.spill_dir = None
+        self.spilled_chunks = []
+        self.spilled_size = 0
+        self.size = 0
@@ -17,7 +17,7 @@ class AirSimWindController:
         :param reader: str, "csv" or "foam", "csv" reads the data from csv files,
         "foam" reads from the openfoam data directly, abandoned, too slow.
         """
-        self.client = airsim.MultirotorClient()
+        self.client = airsim.get_client_pool().get_client()
         self.client.confirmConnection()
         foam_data_root = openfoam_data_root
         if foam_data_root is not None:
@@ -18,6 +18,7 @@ from PythonClient.server.error_handling import (
 )
 # Import the SimulationTaskManager
 # Import the SimulationTaskManager and MockTaskManager
+from PythonClient import airsim
 from PythonClient.multirotor.control.simulation_task_manager import SimulationTaskManager
 from mock_simulator.mock_task_manager import MockTaskManager
 
@@ -273,6 +274,14 @@ def get_map():
     """
     return task_dispatcher.load_cesium_setting(), 200
 
+@app.route('/api/rpc-metrics', methods=['GET'])
+def get_rpc_metrics():
+    """
+    Returns per-method simulator RPC counters and latency percentiles since the server started.
+    Enable collection with AIRSIM_RPC_METRICS=true.
+    """
+    return jsonify(airsim.get_rpc_metrics().summary()), 200
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "ok", "message": "Backend is reachable!"})
@@ -0,0 +1,651 @@
+"""
+Stand-in for the DroneWorld/AirSim RPC server, for running the real SimulationTaskManager, missions and
+monitors without Unreal.
+
+Implements the subset of the AirSim RPC API used by PythonClient on top of a point-mass kinematic model
+(acceleration limited velocity tracking, wind drift, ground contact, drone-drone contact) for any number of
+vehicles. Vehicles, their spawn offsets, the origin geopoint and the wind are read from the same settings.json
+the task manager writes, which is reloaded on every `reset()`. Simulated time can run faster than real time.
+
+Usage, from backend/:
+    python -m mock_simulator.mock_airsim_server --time-scale 10
+    AIRSIM_HOST=127.0.0.1 FLASK_APP=PythonClient/server/simulation_server.py flask run
+"""
+import argparse
+import json
+import math
+import os
+import re
+import struct
+import types
+import zlib
+
+import msgpack
+import msgpackrpc
+from msgpackrpc.server import AsyncResult
+from msgpackrpc.transport import tcp
+
+from PythonClient.multirotor.util.geo.geo_util import GeoUtil, EQUATORIAL_RATIO
+
+DEFAULT_SETTINGS_PATH = os.path.join(os.path.expanduser("~"), "Documents", "AirSim", "settings.json")
+DEFAULT_ORIGIN = (41.980381, -87.934524, 200)  # lat, lon, alt, used when settings.json has no OriginGeopoint
+
+MAX_ACCELERATION = 8.0  # m/s^2
+POSITION_GAIN = 1.0  # 1/s, commanded speed = min(speed, distance * gain) when closing in on a target
+ACCEPTANCE_RADIUS = 0.3  # m, distance at which a position target counts as reached
+TAKEOFF_ALTITUDE = 3.0  # m above spawn
+WIND_DRIFT = 0.3  # fraction of the wind velocity added to the drone's ground velocity
+COLLISION_RADIUS = 0.5  # m, two drones closer than this collide
+HOVER_POWER = 150.0  # W
+DRAG_POWER = 2.0  # W per (m/s)^2
+FULL_VOLTAGE = 12.6  # V
+BATTERY_CAPACITY = 80.0  # Wh
+IMAGE_WIDTH = 256
+IMAGE_HEIGHT = 144
+
+
+def vector3r(x=0.0, y=0.0, z=0.0):
+    return {'x_val': x, 'y_val': y, 'z_val': z}
+
+
+def quaternionr_from_yaw(yaw):
+    return {'w_val': math.cos(yaw / 2), 'x_val': 0.0, 'y_val': 0.0, 'z_val': math.sin(yaw / 2)}
+
+
+def nan_pose():
+    nan = float('nan')
+    return {'position': vector3r(nan, nan, nan), 'orientation': {'w_val': nan, 'x_val': nan, 'y_val': nan, 'z_val': nan}}
+
+
+def encode_png(width, height, rgb):
+    """
+    Minimal RGB8 PNG encoder, enough for cv2.imdecode on the streaming path
+    """
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+    stride = width * 3
+    raw = b''.join(b'\x00' + rgb[row * stride:(row + 1) * stride] for row in range(height))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+
+class PathCommand:
+    """
+    Fly through waypoints (vehicle frame, NED) at a given speed, used for every position based command
+    """
+
+    def __init__(self, result, waypoints, speed, timeout, yaw_mode=None, land=False):
+        self.result = result
+        self.waypoints = waypoints
+        self.speed = max(speed, 0.1)
+        self.timeout = timeout
+        self.yaw_mode = yaw_mode
+        self.land = land
+        self.index = 0
+        self.elapsed = 0.0
+
+    def desired_velocity(self, vehicle, dt):
+        while True:
+            target = self.waypoints[self.index]
+            delta = [t - p for t, p in zip(target, vehicle.position)]
+            distance = math.sqrt(sum(d * d for d in delta))
+            if distance > ACCEPTANCE_RADIUS or self.index == len(self.waypoints) - 1:
+                break
+            self.index += 1
+        if distance < 1e-9:
+            return [0.0, 0.0, 0.0]
+        speed = min(self.speed, distance * POSITION_GAIN) if self.index == len(self.waypoints) - 1 else self.speed
+        return [d / distance * speed for d in delta]
+
+    def is_done(self, vehicle):
+        if self.land:
+            return vehicle.landed
+        target = self.waypoints[-1]
+        return self.index == len(self.waypoints) - 1 and vehicle.distance_to(target) <= ACCEPTANCE_RADIUS
+
+
+class VelocityCommand:
+    """
+    Hold a velocity (or a horizontal velocity at a fixed altitude) for a duration
+    """
+
+    def __init__(self, result, velocity, duration, z=None, yaw_mode=None):
+        self.result = result
+        self.velocity = velocity
+        self.timeout = duration
+        self.z = z
+        self.yaw_mode = yaw_mode
+        self.elapsed = 0.0
+
+    def desired_velocity(self, vehicle, dt):
+        vx, vy, vz = self.velocity
+        if self.z is not None:
+            vz = (self.z - vehicle.position[2]) * POSITION_GAIN
+        return [vx, vy, vz]
+
+    def is_done(self, vehicle):
+        return self.elapsed >= self.timeout
+
+
+class MockVehicle:
+    """
+    Point mass drone, positions are NED meters relative to the spawn point like AirSim's kinematics_estimated
+    """
+
+    def __init__(self, name, spawn):
+        self.name = name
+        self.spawn = spawn
+        self.api_control = False
+        self.armed = False
+        self.reset()
+
+    def reset(self):
+        self.position = [0.0, 0.0, 0.0]
+        self.velocity = [0.0, 0.0, 0.0]
+        self.ground_velocity = [0.0, 0.0, 0.0]
+        self.acceleration = [0.0, 0.0, 0.0]
+        self.yaw = 0.0
+        self.yaw_rate = 0.0
+        self.landed = True
+        self.hold = None
+        self.command = None
+        self.collision = None
+        self.colliding_with = set()
+        self.collision_count = 0
+        self.distance_traveled = 0.0
+        self.flight_time = 0.0
+        self.energy_consumed = 0.0
+
+    @property
+    def world_position(self):
+        return [s + p for s, p in zip(self.spawn, self.position)]
+
+    def distance_to(self, point):
+        return math.sqrt(sum((a - b) ** 2 for a, b in zip(self.position, point)))
+
+    def set_command(self, command):
+        self.finish_command(False)
+        self.command = command
+        self.hold = None
+        if command is not None and command.yaw_mode is not None:
+            self.apply_yaw_mode(command.yaw_mode)
+
+    def finish_command(self, success):
+        if self.command is not None:
+            command, self.command = self.command, None
+            command.result.set_result(success)
+            self.hold = list(self.position)
+
+    def apply_yaw_mode(self, yaw_mode):
+        if yaw_mode.get('is_rate', True):
+            self.yaw_rate = math.radians(yaw_mode.get('yaw_or_rate', 0.0))
+        else:
+            self.yaw_rate = 0.0
+            self.yaw = math.radians(yaw_mode.get('yaw_or_rate', 0.0))
+
+    def step(self, dt, wind):
+        if self.command is not None:
+            desired = self.command.desired_velocity(self, dt)
+            self.command.elapsed += dt
+        elif self.landed:
+            self.velocity = [0.0, 0.0, 0.0]
+            self.ground_velocity = [0.0, 0.0, 0.0]
+            self.acceleration = [0.0, 0.0, 0.0]
+            return
+        else:
+            if self.hold is None:
+                self.hold = list(self.position)
+            desired = [(h - p) * POSITION_GAIN for h, p in zip(self.hold, self.position)]
+
+        # acceleration limited tracking of the commanded velocity, the controller leans into the wind it
+        # drifts with, so wind shows up as drift while the velocity settles (take off, wind changes)
+        air_velocity = [d - w * WIND_DRIFT for d, w in zip(desired, wind)]
+        delta = [a - v for a, v in zip(air_velocity, self.velocity)]
+        norm = math.sqrt(sum(d * d for d in delta))
+        limit = MAX_ACCELERATION * dt
+        if norm > limit:
+            delta = [d * limit / norm for d in delta]
+        self.velocity = [v + d for v, d in zip(self.velocity, delta)]
+        self.acceleration = [d / dt for d in delta]
+        ground_velocity = [v + w * WIND_DRIFT for v, w in zip(self.velocity, wind)]
+        self.position = [p + v * dt for p, v in zip(self.position, ground_velocity)]
+
+        if self.position[2] >= 0.0:
+            # ground contact: touching down while descending lands the drone
+            self.position[2] = 0.0
+            ground_velocity[2] = min(ground_velocity[2], 0.0)
+            if desired[2] >= 0.0:
+                self.landed = True
+                self.velocity = [0.0, 0.0, 0.0]
+                ground_velocity = [0.0, 0.0, 0.0]
+        elif self.position[2] < -0.1:
+            self.landed = False
+        self.ground_velocity = ground_velocity
+        self.yaw += self.yaw_rate * dt
+
+        speed = math.sqrt(sum(v * v for v in ground_velocity))
+        self.distance_traveled += speed * dt
+        if not self.landed:
+            self.flight_time += dt
+            self.energy_consumed += (HOVER_POWER + DRAG_POWER * speed * speed) * dt / 3600.0
+
+        if self.command is not None:
+            if self.command.is_done(self):
+                self.finish_command(True)
+            elif self.command.elapsed >= self.command.timeout:
+                self.finish_command(False)
+
+
+class MockAirSim:
+    """
+    RPC dispatcher, public camelCase methods are the AirSim RPC methods served
+    """
+
+    def __init__(self, settings_path=DEFAULT_SETTINGS_PATH, time_scale=1.0, tick=0.01, physics_dt=0.01):
+        """
+        :param settings_path: AirSim settings.json to read vehicles, origin and wind from
+        :param time_scale: simulated seconds per wall clock second
+        :param tick: wall clock seconds between two simulation updates
+        :param physics_dt: simulated seconds of one integration step
+        """
+        self._settings_path = settings_path
+        self._settings_mtime = None
+        self._settings = {}
+        self._time_scale = time_scale
+        self._tick = tick
+        self._physics_dt = physics_dt
+        self._vehicles = {}
+        self._origin = DEFAULT_ORIGIN
+        self._wind = [0.0, 0.0, 0.0]
+        self._paused = False
+        self._sim_time = 0.0
+        self._scene_rgb = bytes(bytearray((x * 255 // IMAGE_WIDTH, y * 255 // IMAGE_HEIGHT, 128)[c]
+                                          for y in range(IMAGE_HEIGHT) for x in range(IMAGE_WIDTH) for c in range(3)))
+        self._scene_png = encode_png(IMAGE_WIDTH, IMAGE_HEIGHT, self._scene_rgb)
+        self._load_settings()
+
+    # simulation
+
+    def _load_settings(self):
+        try:
+            mtime = os.path.getmtime(self._settings_path)
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime == self._settings_mtime and self._vehicles:
+            return
+        self._settings_mtime = mtime
+        self._settings = {}
+        if mtime is not None:
+            try:
+                with open(self._settings_path, 'r') as f:
+                    self._settings = json.load(f)
+            except (OSError, ValueError) as e:
+                print("Mock simulator could not read", self._settings_path, e)
+        origin = self._settings.get('OriginGeopoint')
+        if origin:
+            self._origin = (origin['Latitude'], origin['Longitude'], origin['Altitude'])
+        wind = self._settings.get('Wind', {})
+        self._wind = [float(wind.get('X', 0)), float(wind.get('Y', 0)), float(wind.get('Z', 0))]
+        for vehicle in self._vehicles.values():
+            vehicle.finish_command(False)
+        self._vehicles = {}
+        for name, vehicle in self._settings.get('Vehicles', {}).items():
+            spawn = [float(vehicle.get(axis, 0) or 0) for axis in ('X', 'Y', 'Z')]
+            self._vehicles[name] = MockVehicle(name, spawn)
+        print("Mock simulator loaded vehicles:", list(self._vehicles))
+
+    def _vehicle(self, vehicle_name):
+        if vehicle_name == '' and self._vehicles:
+            return next(iter(self._vehicles.values()))
+        vehicle = self._vehicles.get(vehicle_name)
+        if vehicle is None:
+            # unknown vehicles are spawned at the origin so ad-hoc scripts work without a settings.json
+            vehicle = MockVehicle(vehicle_name or 'SimpleFlight', [0.0, 0.0, 0.0])
+            self._vehicles[vehicle.name] = vehicle
+        return vehicle
+
+    def _on_tick(self):
+        if not self._paused:
+            self._advance(self._tick * self._time_scale)
+
+    def _advance(self, seconds):
+        steps = max(1, int(round(seconds / self._physics_dt)))
+        dt = seconds / steps
+        for _ in range(steps):
+            for vehicle in list(self._vehicles.values()):
+                vehicle.step(dt, self._wind)
+            self._sim_time += dt
+            self._detect_collisions()
+
+    def _detect_collisions(self):
+        # spatial hash with COLLISION_RADIUS cells, only neighbouring cells are compared
+        cells = {}
+        for vehicle in self._vehicles.values():
+            if vehicle.landed:
+                vehicle.colliding_with.clear()
+                continue
+            position = vehicle.world_position
+            cells.setdefault(tuple(int(math.floor(c / COLLISION_RADIUS)) for c in position), []).append((vehicle, position))
+        contacts = {vehicle.name: set() for vehicle in self._vehicles.values()}
+        for (cx, cy, cz), members in cells.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        for vehicle, position in members:
+                            for other, other_position in cells.get((cx + dx, cy + dy, cz + dz), ()):
+                                if other is vehicle:
+                                    continue
+                                if math.dist(position, other_position) < COLLISION_RADIUS:
+                                    contacts[vehicle.name].add(other.name)
+        for vehicle in self._vehicles.values():
+            for other_name in contacts[vehicle.name] - vehicle.colliding_with:
+                other = self._vehicles[other_name]
+                vehicle.collision_count += 1
+                vehicle.collision = {
+                    'has_collided': True,
+                    'normal': vector3r(*self._unit(vehicle.world_position, other.world_position)),
+                    'impact_point': vector3r(*other.world_position),
+                    'position': vector3r(*vehicle.world_position),
+                    'penetration_depth': COLLISION_RADIUS - math.dist(vehicle.world_position, other.world_position),
+                    'time_stamp': self._timestamp(),
+                    'object_name': other_name,
+                    'object_id': -1,
+                }
+            vehicle.colliding_with = contacts[vehicle.name]
+
+    @staticmethod
+    def _unit(a, b):
+        delta = [x - y for x, y in zip(a, b)]
+        norm = math.sqrt(sum(d * d for d in delta)) or 1.0
+        return [d / norm for d in delta]
+
+    def _timestamp(self):
+        return int(self._sim_time * 1e9)
+
+    def _geo_point(self, world_position):
+        # inverse of GeoUtil.geo_to_cartesian_coordinates: x east, y north, z down
+        lat_o, lon_o, alt_o = self._origin
+        return {'latitude': lat_o + world_position[1] / GeoUtil.geo_to_cartesian_ratio(lat_o),
+                'longitude': lon_o + world_position[0] / EQUATORIAL_RATIO,
+                'altitude': alt_o - world_position[2]}
+
+    def _kinematics(self, vehicle, world_frame=False):
+        position = vehicle.world_position if world_frame else vehicle.position
+        return {
+            'position': vector3r(*position),
+            'orientation': quaternionr_from_yaw(vehicle.yaw),
+            'linear_velocity': vector3r(*vehicle.ground_velocity),
+            'angular_velocity': vector3r(0.0, 0.0, vehicle.yaw_rate),
+            'linear_acceleration': vector3r(*vehicle.acceleration),
+            'angular_acceleration': vector3r(),
+        }
+
+    def _pose(self, vehicle, world_frame=True):
+        position = vehicle.world_position if world_frame else vehicle.position
+        return {'position': vector3r(*position), 'orientation': quaternionr_from_yaw(vehicle.yaw)}
+
+    def _collision_info(self, vehicle):
+        if vehicle.collision is not None:
+            return vehicle.collision
+        return {'has_collided': False, 'normal': vector3r(), 'impact_point': vector3r(), 'position': vector3r(),
+                'penetration_depth': 0.0, 'time_stamp': 0, 'object_name': '', 'object_id': -1}
+
+    def _move(self, vehicle_name, waypoints, speed, timeout, yaw_mode=None, land=False):
+        result = AsyncResult()
+        vehicle = self._vehicle(vehicle_name)
+        vehicle.set_command(PathCommand(result, waypoints, speed, timeout, yaw_mode, land))
+        return result
+
+    def _move_velocity(self, vehicle_name, velocity, duration, z=None, yaw_mode=None):
+        result = AsyncResult()
+        vehicle = self._vehicle(vehicle_name)
+        vehicle.set_command(VelocityCommand(result, velocity, duration, z, yaw_mode))
+        return result
+
+    def _image_response(self, vehicle, camera_name, image_type, pixels_as_float, compress):
+        response = {
+            'image_data_uint8': b'', 'image_data_float': [],
+            'camera_position': vector3r(*vehicle.world_position), 'camera_orientation': quaternionr_from_yaw(vehicle.yaw),
+            'time_stamp': self._timestamp(), 'message': '', 'pixels_as_float': pixels_as_float, 'compress': compress,
+            'width': IMAGE_WIDTH, 'height': IMAGE_HEIGHT, 'image_type': image_type, 'camera_name': camera_name,
+        }
+        if pixels_as_float:
+            # flat ground seen from the drone's altitude
+            response['image_data_float'] = [max(-vehicle.world_position[2], 0.1)] * (IMAGE_WIDTH * IMAGE_HEIGHT)
+        elif compress:
+            response['image_data_uint8'] = self._scene_png
+        else:
+            response['image_data_uint8'] = self._scene_rgb
+        return response
+
+    # common vehicle APIs
+
+    def ping(self):
+        return True
+
+    def getServerVersion(self):
+        return 1
+
+    def getMinRequiredClientVersion(self):
+        return 1
+
+    def reset(self):
+        self._load_settings()
+        for vehicle in self._vehicles.values():
+            vehicle.finish_command(False)
+            vehicle.reset()
+
+    def listVehicles(self):
+        return list(self._vehicles)
+
+    def getSettingsString(self):
+        return json.dumps(self._settings)
+
+    def enableApiControl(self, is_enabled, vehicle_name=''):
+        self._vehicle(vehicle_name).api_control = is_enabled
+
+    def isApiControlEnabled(self, vehicle_name=''):
+        return self._vehicle(vehicle_name).api_control
+
+    def armDisarm(self, arm, vehicle_name=''):
+        self._vehicle(vehicle_name).armed = arm
+        return True
+
+    def simPause(self, is_paused):
+        self._paused = is_paused
+
+    def simIsPaused(self):
+        return self._paused
+
+    def simContinueForTime(self, seconds):
+        self._advance(seconds)
+
+    def simContinueForFrames(self, frames):
+        self._advance(frames * self._physics_dt)
+
+    def simGetVehiclePose(self, vehicle_name=''):
+        # vehicle local NED like the kinematics of getMultirotorState, only simGetObjectPose is world frame
+        return self._pose(self._vehicle(vehicle_name), world_frame=False)
+
+    def simSetVehiclePose(self, pose, ignore_collision, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        position = pose['position']
+        vehicle.position = [position['x_val'] - vehicle.spawn[0], position['y_val'] - vehicle.spawn[1],
+                            position['z_val'] - vehicle.spawn[2]]
+        vehicle.hold = None
+
+    def simGetObjectPose(self, object_name):
+        vehicle = self._vehicles.get(object_name)
+        return self._pose(vehicle) if vehicle is not None else nan_pose()
+
+    def simListSceneObjects(self, name_regex='.*'):
+        return [name for name in self._vehicles if re.match(name_regex, name)]
+
+    def simGetCollisionInfo(self, vehicle_name=''):
+        return self._collision_info(self._vehicle(vehicle_name))
+
+    def simGetGroundTruthKinematics(self, vehicle_name=''):
+        return self._kinematics(self._vehicle(vehicle_name))
+
+    def simSetWind(self, wind):
+        self._wind = [wind['x_val'], wind['y_val'], wind['z_val']]
+
+    def getHomeGeoPoint(self, vehicle_name=''):
+        return self._geo_point(self._vehicle(vehicle_name).spawn)
+
+    def getGpsData(self, gps_name='', vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        return {
+            'time_stamp': self._timestamp(),
+            'gnss': {'geo_point': self._geo_point(vehicle.world_position), 'eph': 0.1, 'epv': 0.1,
+                     'velocity': vector3r(*vehicle.ground_velocity), 'fix_type': 3, 'time_utc': self._timestamp() // 1000},
+            'is_valid': True,
+        }
+
+    def simGetImage(self, camera_name, image_type, vehicle_name='', external=False):
+        self._vehicle(vehicle_name)
+        return self._scene_png
+
+    def simGetImages(self, requests, vehicle_name='', external=False):
+        vehicle = self._vehicle(vehicle_name)
+        return [self._image_response(vehicle, request['camera_name'], request['image_type'],
+                                     request.get('pixels_as_float', False), request.get('compress', True))
+                for request in requests]
+
+    def cancelLastTask(self, vehicle_name=''):
+        self._vehicle(vehicle_name).finish_command(False)
+
+    # multirotor APIs
+
+    def takeoff(self, timeout_sec=20, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        x, y, z = vehicle.position
+        return self._move(vehicle_name, [[x, y, min(z, -TAKEOFF_ALTITUDE)]], 1.0, timeout_sec)
+
+    def land(self, timeout_sec=60, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        x, y, _ = vehicle.position
+        return self._move(vehicle_name, [[x, y, 1.0]], 1.0, timeout_sec, land=True)
+
+    def goHome(self, timeout_sec=3e+38, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        return self._move(vehicle_name, [[0.0, 0.0, vehicle.position[2]]], 5.0, timeout_sec)
+
+    def hover(self, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        vehicle.set_command(None)
+        vehicle.hold = list(vehicle.position)
+        return True
+
+    def moveToPosition(self, x, y, z, velocity, timeout_sec=3e+38, drivetrain=0, yaw_mode=None, lookahead=-1,
+                       adaptive_lookahead=1, vehicle_name=''):
+        return self._move(vehicle_name, [[x, y, z]], velocity, timeout_sec, yaw_mode)
+
+    def moveOnPath(self, path, velocity, timeout_sec=3e+38, drivetrain=0, yaw_mode=None, lookahead=-1,
+                   adaptive_lookahead=1, vehicle_name=''):
+        waypoints = [[point['x_val'], point['y_val'], point['z_val']] for point in path]
+        if not waypoints:
+            return True
+        return self._move(vehicle_name, waypoints, velocity, timeout_sec, yaw_mode)
+
+    def moveToZ(self, z, velocity, timeout_sec=3e+38, yaw_mode=None, lookahead=-1, adaptive_lookahead=1, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        return self._move(vehicle_name, [[vehicle.position[0], vehicle.position[1], z]], velocity, timeout_sec, yaw_mode)
+
+    def moveByVelocity(self, vx, vy, vz, duration, drivetrain=0, yaw_mode=None, vehicle_name=''):
+        return self._move_velocity(vehicle_name, [vx, vy, vz], duration, yaw_mode=yaw_mode)
+
+    def moveByVelocityZ(self, vx, vy, z, duration, drivetrain=0, yaw_mode=None, vehicle_name=''):
+        return self._move_velocity(vehicle_name, [vx, vy, 0.0], duration, z=z, yaw_mode=yaw_mode)
+
+    def rotateToYaw(self, yaw, timeout_sec=3e+38, margin=5, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        vehicle.yaw = math.radians(yaw)
+        vehicle.yaw_rate = 0.0
+        return True
+
+    def rotateByYawRate(self, yaw_rate, duration, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        return self._move_velocity(vehicle_name, [0.0, 0.0, 0.0], duration, z=vehicle.position[2],
+                                   yaw_mode={'is_rate': True, 'yaw_or_rate': yaw_rate})
+
+    def getMultirotorState(self, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        return {
+            'collision': self._collision_info(vehicle),
+            'kinematics_estimated': self._kinematics(vehicle),
+            'gps_location': self._geo_point(vehicle.world_position),
+            'timestamp': self._timestamp(),
+            'landed_state': 0 if vehicle.landed else 1,
+            'rc_data': {'timestamp': 0, 'pitch': 0.0, 'roll': 0.0, 'throttle': 0.0, 'yaw': 0.0, 'left_z': 0.0,
+                        'right_z': 0.0, 'switch1': 0, 'switch2': 0, 'switch3': 0, 'switch4': 0, 'switch5': 0,
+                        'switch6': 0, 'switch7': 0, 'switch8': 0, 'is_initialized': False, 'is_valid': False},
+            'ready': True,
+            'ready_message': '',
+            'can_arm': True,
+        }
+
+    def getRotorStates(self, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        speed = 0.0 if vehicle.landed else 600.0 + 20.0 * math.sqrt(sum(v * v for v in vehicle.velocity))
+        rotor = {'speed': speed, 'thrust': 0.0 if vehicle.landed else 2.5, 'torque_scaler': 0.0 if vehicle.landed else 0.05}
+        return {'timestamp': self._timestamp(), 'rotors': [dict(rotor) for _ in range(4)]}
+
+    def getTripStats(self, vehicle_name=''):
+        vehicle = self._vehicle(vehicle_name)
+        remaining = max(0.0, 1.0 - vehicle.energy_consumed / BATTERY_CAPACITY)
+        return {'voltage': FULL_VOLTAGE * (0.8 + 0.2 * remaining), 'energy_consume': vehicle.energy_consumed,
+                'flight_time': vehicle.flight_time, 'distance_traveled': vehicle.distance_traveled,
+                'collision_count': vehicle.collision_count}
+
+
+class _BinaryServerSocket(tcp.ServerSocket):
+    # AirSim sends image buffers as msgpack bin, the stock server socket would pack them as (utf-8) str
+    def __init__(self, stream, transport, encodings):
+        tcp.BaseSocket.__init__(self, stream, encodings)
+        self._packer = msgpack.Packer(encoding=encodings[0], use_bin_type=True, default=lambda x: x.to_msgpack())
+        self._transport = transport
+        self._stream.read_until_close(self.on_read, self.on_read)
+
+
+class _BinaryMessagePackServer(tcp.MessagePackServer):
+    def handle_stream(self, stream, address):
+        _BinaryServerSocket(stream, self._transport, self._encodings)
+
+
+class _BinaryServerTransport(tcp.ServerTransport):
+    def listen(self, server):
+        self._server = server
+        self._mp_server = _BinaryMessagePackServer(self, io_loop=self._server._loop._ioloop, encodings=self._encodings)
+        self._mp_server.listen(self._address.port, self._address.host)
+
+
+def serve(port=41451, host='127.0.0.1', **kwargs):
+    """
+    Run the mock simulator on the calling thread until interrupted
+    :param kwargs: forwarded to MockAirSim
+    """
+    simulator = MockAirSim(**kwargs)
+    server = msgpackrpc.Server(simulator, builder=types.SimpleNamespace(ServerTransport=_BinaryServerTransport),
+                               unpack_encoding='utf-8')
+    server.listen(msgpackrpc.Address(host, port))
+    # every RPC and every simulation step runs on the server loop, so the model needs no locking
+    server._loop.attach_periodic_callback(simulator._on_tick, simulator._tick * 1000)
+    print(f"Mock AirSim server listening on {host}:{port}, time scale {simulator._time_scale}")
+    try:
+        server.start()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kinematic stand-in for the DroneWorld AirSim RPC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=41451)
+    parser.add_argument("--settings", default=DEFAULT_SETTINGS_PATH, help="AirSim settings.json with the vehicles")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="simulated seconds per wall clock second")
+    parser.add_argument("--tick", type=float, default=0.01, help="wall clock seconds between simulation updates")
+    parser.add_argument("--physics-dt", type=float, default=0.01, help="simulated seconds per integration step")
+    args = parser.parse_args()
+    serve(args.port, args.host, settings_path=args.settings, time_scale=args.time_scale, tick=args.tick,
+          physics_dt=args.physics_dt)